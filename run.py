@@ -118,4 +118,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Nötig für Prozess-Pools (Thumbnails) in der PyInstaller-Version
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -13,10 +13,16 @@ from .pending_video_cut import PendingVideoCut
 from ..video.cutter_service import VideoCutterService
 from ..model.kunde import Kunde
 
+from ..utils.bounded_cache import DEFAULT_IMAGE_CACHE_BUDGET_MB, set_image_cache_budget_mb
 from ..utils.config import ConfigManager
 from ..utils.validation import validate_form_data
 from ..utils.natural_sort import sort_paths_by_basename
-from ..utils.dji_media_paths import collect_media_from_backup_folder
+from ..utils.dji_media_paths import (
+    collect_media_from_backup_folder,
+    manifest_identity_by_dest,
+    read_backup_manifest,
+    resolve_manifest_identity,
+)
 from ..installer.ffmpeg_installer import ensure_ffmpeg_installed
 from ..utils.file_utils import test_server_connection
 from ..installer.updater import initialize_updater
@@ -47,6 +53,7 @@ class VideoGeneratorApp:
         self.root = root if root is not None else TkinterDnD.Tk()
         self.splash_callback = splash_callback
         self.config = ConfigManager()
+        self._apply_image_cache_budget()
         self.video_processor = None
         self.erstellen_button = None
         self.combined_video_path = None
@@ -70,6 +77,7 @@ class VideoGeneratorApp:
         # Für Threading und Ladefenster ---
         self.analysis_queue = None
         self.loading_window = None
+        self._early_qr_scan = None
         self._session_reset_in_progress = False
         self._last_video_wm_visible = None
         self._last_photo_wm_visible = None
@@ -77,6 +85,9 @@ class VideoGeneratorApp:
         # SD-Karten Monitor
         self.sd_card_monitor = None
         self.sd_status_indicator = None
+        # Backups mehrerer Karten werden nacheinander importiert
+        self._sd_import_queue: List[str] = []
+        self._sd_import_running = False
 
         # Speichern der Button-Originalzustände
         self.old_button_text = ""
@@ -165,6 +176,7 @@ class VideoGeneratorApp:
 
         from .components.drag_drop import DragDropFrame
         self.drag_drop = DragDropFrame(self.left_frame, self)
+        self.drag_drop.add_import_event_listener(self._on_import_event)
 
         self._schedule_init_chunk(self._setup_gui_step_4)
 
@@ -490,6 +502,7 @@ class VideoGeneratorApp:
         # Linke Spalte: Formular und Drag & Drop
         self.form_fields = FormFields(self.left_frame, self.config, self)
         self.drag_drop = DragDropFrame(self.left_frame, self)
+        self.drag_drop.add_import_event_listener(self._on_import_event)
 
         # Rechte Spalte: Tab-View für Vorschau-Inhalte
         # Tab-View erstellen mit gleichem Style wie Drag-and-Drop
@@ -743,6 +756,7 @@ class VideoGeneratorApp:
         """
         # Config neu laden für aktuelle Einstellungen
         self.config.reload_settings()
+        self._apply_image_cache_budget()
 
         # Hardware-Beschleunigung in VideoPreview neu laden
         if hasattr(self, 'video_preview') and self.video_preview:
@@ -761,6 +775,13 @@ class VideoGeneratorApp:
         if hasattr(self, 'form_fields') and self.form_fields:
             self.form_fields.reload_current_layout()
 
+    def _apply_image_cache_budget(self):
+        """Überträgt das Speicherbudget der Bild-Caches aus den Einstellungen."""
+        settings = self.config.get_settings()
+        set_image_cache_budget_mb(
+            settings.get("image_cache_budget_mb", DEFAULT_IMAGE_CACHE_BUDGET_MB)
+        )
+
     def pack_components(self):
         # Linke Spalte
         self.form_fields.pack(pady=10, fill="x")
@@ -1074,7 +1095,7 @@ class VideoGeneratorApp:
                 self.video_preview.update_preview(video_paths)
 
             # 2. QR-Analyse starten (läuft ebenfalls in eigenem Thread)
-            self.run_qr_analysis(qr_scan_paths)
+            self._run_qr_analysis_after_early_scan(qr_scan_paths)
         else:
             # Keine QR-Prüfung, nur Vorschau aktualisieren
             print("QR-Prüfung übersprungen - keine neuen Clips für Auto-Scan.")
@@ -1118,6 +1139,7 @@ class VideoGeneratorApp:
             "scan_all_clips": scan_all_clips,
             "parallel_enabled": parallel_enabled and scan_all_clips,
             "parallel_workers": self._qr_parallel_worker_count(),
+            "ranking_enabled": bool(settings.get("qr_video_ranking_enabled", True)),
         }
 
     def _qr_photo_scan_kwargs(self) -> dict:
@@ -1128,6 +1150,105 @@ class VideoGeneratorApp:
             "parallel_workers": self._qr_parallel_worker_count(),
         }
 
+    def _on_import_event(self, event: str, payload: dict) -> None:
+        """
+        Import-Ereignisse aus DragDropFrame: startet die frühe QR-Suche im ersten
+        Clip, während die restlichen Dateien noch kopiert werden.
+        """
+        from src.video.qr_early_scan import IMPORT_EVENT_BATCH_STARTED
+
+        if event == IMPORT_EVENT_BATCH_STARTED:
+            self._start_early_qr_scan()
+            return
+
+        early_scan = self._early_qr_scan
+        if early_scan is not None:
+            early_scan.on_import_event(event, payload)
+
+    def _start_early_qr_scan(self) -> None:
+        """Bereitet die frühe QR-Suche für einen neuen Import vor (UI-Thread)."""
+        if self._early_qr_scan is not None:
+            self._early_qr_scan.cancel()
+            self._early_qr_scan = None
+
+        settings = self.config.get_settings() if self.config else {}
+        if not settings.get("qr_early_scan_enabled", True):
+            return
+        if not (self.drag_drop and self.drag_drop.qr_check_enabled.get()):
+            return
+        if self.form_fields and self.form_fields.has_qr_kunde_layout():
+            return
+
+        from src.video.qr_early_scan import DEFAULT_EARLY_QR_PREFIX_MB, EarlyImportQrScan
+
+        try:
+            prefix_mb = float(settings.get("qr_early_scan_prefix_mb", DEFAULT_EARLY_QR_PREFIX_MB))
+        except (TypeError, ValueError):
+            prefix_mb = DEFAULT_EARLY_QR_PREFIX_MB
+        scan_opts = self._qr_video_scan_kwargs()
+
+        early_scan = None
+
+        def _on_hit(kunde: Kunde, path: str) -> None:
+            self.root.after(0, lambda: self._apply_early_qr_hit(early_scan))
+
+        early_scan = EarlyImportQrScan(
+            on_hit=_on_hit,
+            scan_seconds=scan_opts["scan_seconds"],
+            frame_step=scan_opts["frame_step"],
+            prefix_bytes=int(prefix_mb * 1024 * 1024),
+        )
+        self._early_qr_scan = early_scan
+
+    def _apply_early_qr_hit(self, early_scan) -> None:
+        """Füllt das Formular mit dem frühen QR-Treffer, während der Import weiterläuft."""
+        if early_scan.kunde is None or early_scan.hit_applied or early_scan.is_cancelled():
+            return
+        early_scan.hit_applied = True
+        kunde = early_scan.kunde
+        print(
+            f"QR-Code während Import gefunden ({os.path.basename(early_scan.hit_path)}): "
+            f"{kunde.vorname} {kunde.nachname}"
+        )
+        self.form_fields.update_form_layout(True, kunde)
+
+    def _run_qr_analysis_after_early_scan(self, video_paths: list[str]) -> None:
+        """
+        Startet die reguläre QR-Analyse nach dem Import. Clips, die die frühe
+        Suche bereits geprüft hat, werden übersprungen; bei einem frühen Treffer
+        entfällt die Analyse ganz.
+        """
+        early_scan = self._early_qr_scan
+        if early_scan is None:
+            self.run_qr_analysis(video_paths)
+            return
+
+        if early_scan.is_running():
+            self.root.after(100, self._run_qr_analysis_after_early_scan, video_paths)
+            return
+
+        self._early_qr_scan = None
+        if early_scan.kunde is not None:
+            print("QR-Analyse übersprungen: Kunde bereits während des Imports erkannt.")
+            early_scan.hit_applied = True
+            self._record_early_qr_ranking_hit(video_paths, early_scan.hit_path)
+            # Gleiche Nachbearbeitung wie bei einem Treffer der regulären Analyse
+            self._process_analysis_result(
+                early_scan.kunde, True, video_paths, source_path=early_scan.hit_path
+            )
+            return
+
+        # Einstellung "nur erster Clip" gilt vor dem Abgleich mit der frühen Suche,
+        # sonst würde nach einem frühen Fehlschlag der zweite Clip gescannt
+        remaining = [
+            path for path in self._video_paths_for_qr_scan(video_paths)
+            if not early_scan.covers(path)
+        ]
+        if remaining:
+            self.run_qr_analysis(remaining)
+        else:
+            self._process_analysis_result(None, False, video_paths)
+
     def _qr_media_labels(self, media: Literal["video", "photo"]) -> tuple[str, str]:
         if media == "video":
             return "Video", "Videos"
@@ -1406,14 +1527,19 @@ class VideoGeneratorApp:
                 "scan_seconds": scan_opts["scan_seconds"],
                 "frame_step": scan_opts["frame_step"],
             }
+            # Hybrid auch für einen einzelnen Clip: mehrere Worker teilen sich dessen Zeitfenster
             use_hybrid = (
                 scan_opts.get("parallel_enabled")
-                and len(video_paths) >= 2
+                and (len(video_paths) >= 2 or scan_opts["parallel_workers"] >= 2)
             )
 
             _progress = self._make_qr_progress_callback("video")
 
-            if len(video_paths) == 1:
+            ranking = []
+            if len(video_paths) > 1 and scan_opts.get("ranking_enabled"):
+                video_paths, ranking = self._rank_video_paths_for_qr(video_paths)
+
+            if len(video_paths) == 1 and not use_hybrid:
                 kunde, qr_scan_success = analysiere_ersten_clip(
                     video_paths[0],
                     cancel_check=cancel_check,
@@ -1451,6 +1577,8 @@ class VideoGeneratorApp:
             if cancelled:
                 result_queue.put(("cancelled", None))
             else:
+                if ranking and qr_scan_success and source_path:
+                    self._record_qr_ranking_hit(ranking, source_path)
                 result_queue.put(("success", (kunde, qr_scan_success, source_path)))
 
         except Exception as e:
@@ -1460,6 +1588,45 @@ class VideoGeneratorApp:
             traceback.print_exc()
             result_queue.put(("error", e))
 
+    def _rank_video_paths_for_qr(self, video_paths: list[str]):
+        """Sortiert Clips nach QR-Wahrscheinlichkeit; bei Fehlern bleibt die Reihenfolge."""
+        try:
+            from src.video.qr_scan_ranking import rank_clips_for_qr_scan
+
+            source_epochs = {
+                p: self.drag_drop.get_source_import_epoch(p) for p in video_paths
+            }
+            ranked, ranking = rank_clips_for_qr_scan(video_paths, source_epochs=source_epochs)
+            if ranked != video_paths:
+                print(
+                    "QR-Reihenfolge: "
+                    + ", ".join(os.path.basename(p) for p in ranked)
+                )
+            return ranked, ranking
+        except Exception as e:
+            print(f"QR-Reihenfolge konnte nicht bestimmt werden: {e}")
+            return list(video_paths), []
+
+    def _record_early_qr_ranking_hit(self, video_paths: list[str], hit_path: str) -> None:
+        """Verbucht einen Treffer der frühen Suche in der QR-Statistik (im Hintergrund)."""
+        if len(video_paths) < 2 or not self._qr_video_scan_kwargs().get("ranking_enabled"):
+            return
+
+        def _record():
+            _, ranking = self._rank_video_paths_for_qr(video_paths)
+            if ranking:
+                self._record_qr_ranking_hit(ranking, hit_path)
+
+        threading.Thread(target=_record, daemon=True).start()
+
+    def _record_qr_ranking_hit(self, ranking, source_path: str) -> None:
+        try:
+            from src.video.qr_scan_ranking import QrScanStats
+
+            QrScanStats().record_hit(ranking, source_path)
+        except Exception as e:
+            print(f"QR-Statistik konnte nicht aktualisiert werden: {e}")
+
     def _run_photo_analysis_thread(self, photo_path: str, result_queue: queue.Queue):
         """
         Diese Funktion läuft im separaten Thread für Foto-QR-Code-Analyse.
@@ -2950,7 +3117,7 @@ class VideoGeneratorApp:
                 self.progress_handler.set_status(f"Status: SD-Karte erkannt ({data})")
 
             elif status_type == 'backup_started':
-                self.sd_status_indicator.set_backup_active(True)
+                self.sd_status_indicator.set_backup_active(True, data)
                 self.sd_status_indicator.set_sd_detected(False)
                 if data is not None:
                     self.sd_status_indicator.set_active_drive(data)
@@ -2958,10 +3125,13 @@ class VideoGeneratorApp:
                 self.progress_handler.set_status("Status: SD-Karten Backup läuft...")
 
             elif status_type == 'backup_finished':
-                self.sd_status_indicator.set_backup_active(False)
+                finished_drive = data.get('drive') if isinstance(data, dict) else None
+                self.sd_status_indicator.set_backup_active(False, finished_drive)
                 self.sd_status_indicator.set_sd_detected(False)
-                self.sd_status_indicator.set_waiting_size_limit(False)
-                self.sd_status_indicator.set_active_drive(None)
+                if not self.sd_status_indicator.backup_active:
+                    # Andere Karten laufen noch: deren Dialog/Laufwerk nicht zurücksetzen
+                    self.sd_status_indicator.set_waiting_size_limit(False)
+                    self.sd_status_indicator.set_active_drive(None)
 
                 # Prüfe Backup-Typ aus data
                 if data and isinstance(data, dict):
@@ -2986,14 +3156,14 @@ class VideoGeneratorApp:
                         self.progress_handler.set_status("Status: Backup fehlgeschlagen")
 
             elif status_type == 'clearing_started':
-                self.sd_status_indicator.set_clearing_active(True)
+                self.sd_status_indicator.set_clearing_active(True, data)
                 if data is not None:
                     self.sd_status_indicator.set_active_drive(data)
                 self.sd_status_indicator.show_clearing_progress()
                 self.progress_handler.set_status("Status: SD-Karte wird geleert...")
 
             elif status_type == 'clearing_finished':
-                self.sd_status_indicator.set_clearing_active(False)
+                self.sd_status_indicator.set_clearing_active(False, data)
                 self.progress_handler.set_status("Status: SD-Karte geleert")
 
             elif status_type == 'clearing_skipped_selective':
@@ -3044,7 +3214,9 @@ class VideoGeneratorApp:
                 fg="#f44336").pack(pady=(0, 15))
 
         # Info
+        drive_line = f"SD-Karte: {data['drive']}\n" if data.get('drive') else ""
         info_text = (
+            f"{drive_line}"
             f"Gefundene Dateien: {len(files_info)}\n"
             f"Gesamtgröße: {total_size_mb:.0f} MB\n"
             f"Eingestelltes Limit: {limit_mb} MB\n\n"
@@ -3134,7 +3306,7 @@ class VideoGeneratorApp:
             if self.sd_status_indicator:
                 self.sd_status_indicator.set_waiting_size_limit(False)
 
-    def on_sd_progress_update(self, current_mb, total_mb, speed_mbps):
+    def on_sd_progress_update(self, current_mb, total_mb, speed_mbps, drive=None):
         """
         Callback für SD-Backup Progress-Updates
 
@@ -3142,13 +3314,15 @@ class VideoGeneratorApp:
             current_mb: Bereits kopierte MB
             total_mb: Gesamt MB
             speed_mbps: Kopiergeschwindigkeit in MB/s
+            drive: Laufwerk der Karte (mehrere Karten laufen parallel)
         """
         def update_ui():
             if self.sd_status_indicator:
-                self.sd_status_indicator.update_backup_progress(current_mb, total_mb, speed_mbps)
+                self.sd_status_indicator.update_backup_progress(current_mb, total_mb, speed_mbps, drive)
             progress_percent = (current_mb / total_mb * 100) if total_mb > 0 else 0
+            drive_part = f" ({drive})" if drive else ""
             self.progress_handler.set_status(
-                f"Status: SD-Backup {progress_percent:.0f}% ({current_mb:.0f}/{total_mb:.0f} MB, {speed_mbps:.1f} MB/s)"
+                f"Status: SD-Backup{drive_part} {progress_percent:.0f}% ({current_mb:.0f}/{total_mb:.0f} MB, {speed_mbps:.1f} MB/s)"
             )
         self.root.after(0, update_ui)
 
@@ -3225,8 +3399,9 @@ class VideoGeneratorApp:
 
         # Prüfe ob automatischer Import aktiviert ist
         if settings.get("sd_auto_import", False):
-            # Starte automatischen Import
-            self.import_from_backup(backup_path)
+            # Starte automatischen Import (parallel gesicherte Karten nacheinander)
+            self._sd_import_queue.append(backup_path)
+            self._start_next_sd_import()
         else:
             # Zeige nur Erfolgs-Benachrichtigung
             info_text = f"SD-Karten Backup wurde erfolgreich erstellt:\n{backup_path}"
@@ -3238,6 +3413,12 @@ class VideoGeneratorApp:
                 parent=self.root
             )
 
+    def _start_next_sd_import(self):
+        """Startet den nächsten wartenden Auto-Import, sofern gerade keiner läuft."""
+        if self._sd_import_running or not self._sd_import_queue:
+            return
+        self.import_from_backup(self._sd_import_queue.pop(0))
+
     def import_from_backup(self, backup_path):
         """
         Importiert Dateien aus dem Backup-Ordner in die Anwendung
@@ -3253,6 +3434,9 @@ class VideoGeneratorApp:
             ind = self.sd_status_indicator
             if ind:
                 ind.set_auto_import_active(active)
+            self._sd_import_running = active
+            if not active:
+                self.root.after(0, self._start_next_sd_import)
 
         _notify_import_active(True)
 
@@ -3321,40 +3505,30 @@ class VideoGeneratorApp:
                 from ..utils.media_history import MediaHistoryStore
 
                 history_store = MediaHistoryStore.instance()
+                # Identitäten wurden beim Backup berechnet; Backup-Dateien nicht erneut lesen
+                manifest_identities = manifest_identity_by_dest(read_backup_manifest(backup_path))
 
-                filtered_videos = []
-                filtered_photos = []
-                skipped_count = 0
+                def _backup_file_identity(path):
+                    return (resolve_manifest_identity(path, manifest_identities)
+                            or history_store.compute_identity(path))
 
                 print("Prüfe auf bereits importierte Dateien...")
 
-                # Videos filtern - nur importierte überspringen, nicht nur gesicherte
-                for file_path in video_files:
-                    identity = history_store.compute_identity(file_path)
+                backup_identities = {}
+                for file_path in video_files + photo_files:
+                    identity = _backup_file_identity(file_path)
                     if identity:
-                        identity_hash, _ = identity
-                        # Prüfe ob bereits IMPORTIERT (nicht nur gesichert)
-                        if not history_store.was_imported(identity_hash):
-                            filtered_videos.append(file_path)
-                        else:
-                            skipped_count += 1
-                    else:
-                        # Bei Hash-Fehler: Datei trotzdem importieren
-                        filtered_videos.append(file_path)
-
-                # Fotos filtern - nur importierte überspringen, nicht nur gesicherte
-                for file_path in photo_files:
-                    identity = history_store.compute_identity(file_path)
-                    if identity:
-                        identity_hash, _ = identity
-                        # Prüfe ob bereits IMPORTIERT (nicht nur gesichert)
-                        if not history_store.was_imported(identity_hash):
-                            filtered_photos.append(file_path)
-                        else:
-                            skipped_count += 1
-                    else:
-                        # Bei Hash-Fehler: Datei trotzdem importieren
-                        filtered_photos.append(file_path)
+                        backup_identities[file_path] = identity
+                history_store.upgrade_legacy_identities(backup_identities)
+                backup_hashes = {path: identity[0] for path, identity in backup_identities.items()}
+                # Nur importierte überspringen, nicht nur gesicherte (eine Abfrage für alle)
+                imported_hashes = history_store.was_imported_many(backup_hashes.values())
+
+                # Bei Hash-Fehler: Datei trotzdem importieren
+                filtered_videos = [p for p in video_files if backup_hashes.get(p) not in imported_hashes]
+                filtered_photos = [p for p in photo_files if backup_hashes.get(p) not in imported_hashes]
+                skipped_count = (len(video_files) + len(photo_files)
+                                 - len(filtered_videos) - len(filtered_photos))
 
                 print(f"Import-Filter: {len(video_files) + len(photo_files)} Dateien, "
                       f"{len(filtered_videos) + len(filtered_photos)} neu, {skipped_count} übersprungen")
@@ -3374,6 +3548,8 @@ class VideoGeneratorApp:
                         on_complete=_on_import_complete,
                         record_history_after_import=skip_processed,
                     )
+                else:
+                    _notify_import_active(False)
                 print(
                     f"Auto-Import gestartet: {pending_video_count} Videos, "
                     f"{pending_photo_count} Fotos"
@@ -3381,6 +3557,7 @@ class VideoGeneratorApp:
             else:
                 # Keine neuen Dateien gefunden
                 print("Keine neuen Dateien zum Importieren gefunden")
+                _notify_import_active(False)
                 if skip_processed:
                     messagebox.showinfo(
                         "Keine neuen Dateien",
@@ -13,15 +13,18 @@ import shutil
 from typing import List, Optional
 
 from src.gui.components.error_dialog import ErrorDialog
+from src.utils.bounded_cache import SHARE_IMPORT_THUMB_PIL, ByteBudgetCache
 from src.utils.constants import LOG_FILE, SUBPROCESS_CREATE_NO_WINDOW
-from src.utils.media_history import MediaHistoryStore
+from src.utils.media_history import IdentityHasher, MediaHistoryStore
 from src.utils.natural_sort import natural_sort_key, sort_paths_by_basename
 from src.utils.dji_media_paths import (
     collect_media_from_backup_folder,
     collect_media_paths_from_tree,
     filter_collected_media_for_timelapse,
+    manifest_identity_by_dest,
     read_backup_manifest,
     resolve_dcim_root,
+    resolve_manifest_identity,
     resolve_manifest_source_path,
     resolve_timelapse_photo_import_name,
     resolve_timelapse_session_active_for_paths,
@@ -36,13 +39,15 @@ from src.utils.file_times import (
 from src.utils.media_datetime import (
     format_epoch_date,
     format_epoch_time,
-    format_photo_table_datetime,
     get_photo_display_epoch,
+    get_photo_display_epochs,
     resolve_video_display_epoch,
 )
 from src.utils.photo_thumbnail import (
+    PROCESS_POOL_MIN_PHOTOS,
     THUMB_MAX_SIZE,
     build_pil_thumbnail,
+    build_pil_thumbnails_multiprocess,
     build_pil_thumbnails_parallel,
 )
 
@@ -195,6 +200,8 @@ class DragDropFrame:
         self._video_reorder_drag_active = False
         self._video_row_highlight_after_id = None
         self._video_drop_indicator = None
+        # Listener für Import-Ereignisse (z. B. frühe QR-Suche während des Kopierens)
+        self._import_event_listeners: list = []
         self.create_widgets()
 
     def create_widgets(self):
@@ -648,11 +655,26 @@ class DragDropFrame:
             time.sleep(_TEMP_DIR_POLL_INTERVAL_SEC)
         return video_preview.temp_dir if video_preview.temp_dir and os.path.isdir(video_preview.temp_dir) else None
 
+    def add_import_event_listener(self, listener) -> None:
+        """
+        Registriert listener(event, payload) für Import-Ereignisse.
+        batch_started kommt aus dem UI-Thread, alle übrigen aus dem Import-Worker.
+        """
+        if listener not in self._import_event_listeners:
+            self._import_event_listeners.append(listener)
+
+    def _notify_import_event(self, event: str, **payload) -> None:
+        for listener in list(self._import_event_listeners):
+            try:
+                listener(event, payload)
+            except Exception as e:
+                self._log_import_message(f"Import-Listener fehlgeschlagen ({event})", e)
+
     def _generate_import_photo_thumbnails(
         self,
         photo_paths: List[str],
         dialog: "ImportProgressDialog",
-        pil_photo_cache: dict,
+        pil_photo_cache: ByteBudgetCache,
     ) -> None:
         """Erzeugt PIL-Thumbnails für importierte Fotos (parallel oder sequentiell)."""
         settings = self.app.config.get_settings()
@@ -677,6 +699,17 @@ class DragDropFrame:
 
             self.parent.after(0, ui)
 
+        if parallel_enabled and n_thumb >= PROCESS_POOL_MIN_PHOTOS:
+            # Große Foto-Importe: Prozess-Pool nach Kernanzahl (kein GIL-Engpass)
+            batch = build_pil_thumbnails_multiprocess(
+                photo_paths,
+                THUMB_MAX_SIZE,
+                cancel_check=dialog.cancel_requested.is_set,
+                on_progress=_update_thumb_ui,
+            )
+            pil_photo_cache.update(batch)
+            return
+
         if parallel_enabled and n_thumb > 1:
             batch = build_pil_thumbnails_parallel(
                 photo_paths,
@@ -713,6 +746,7 @@ class DragDropFrame:
         on_complete=None,
         record_history_after_import: bool = False,
         history_source_paths: Optional[List[str]] = None,
+        history_identities: Optional[dict] = None,
     ) -> None:
         self.parent.after(
             0,
@@ -730,6 +764,7 @@ class DragDropFrame:
                 on_complete=on_complete,
                 record_history_after_import=record_history_after_import,
                 history_source_paths=history_source_paths or [],
+                history_identities=history_identities,
             ),
         )
 
@@ -755,6 +790,8 @@ class DragDropFrame:
 
         dialog = ImportProgressDialog(self.parent)
         history_sources = list(new_videos) + list(new_photos)
+        if new_videos:
+            self._notify_import_event("batch_started")
         t = threading.Thread(
             target=self._async_add_files,
             args=(new_videos, new_photos, dialog),
@@ -780,10 +817,11 @@ class DragDropFrame:
         new_videos_added = False
         new_photos_added = False
         imported_paths = []
-        imported_history_hashes = []
+        imported_history: dict[str, tuple[str, int]] = {}
         photo_batch_paths = []
-        pil_photo_cache = {}
+        pil_photo_cache = ByteBudgetCache("import_thumb_pil", share=SHARE_IMPORT_THUMB_PIL)
         unreadable_paths: List[str] = []
+        import_failed = False
 
         try:
             new_videos = sort_paths_by_basename(list(new_videos)) if new_videos else []
@@ -806,6 +844,26 @@ class DragDropFrame:
                     import_manifest_cache[cache_key] = read_backup_manifest(parent)
                 return import_manifest_cache[cache_key]
 
+            manifest_identity_cache: dict[str, dict[str, tuple[str, int]]] = {}
+            known_identities: dict[str, Optional[tuple[str, int]]] = {}
+
+            def _get_source_identity(path: str, compute: bool = True) -> Optional[tuple[str, int]]:
+                """Identität aus Vorprüfung oder Backup-Manifest; sonst (optional) hashen."""
+                if path in known_identities:
+                    return known_identities[path]
+                cache_key = os.path.normcase(os.path.dirname(path))
+                if cache_key not in manifest_identity_cache:
+                    manifest_identity_cache[cache_key] = manifest_identity_by_dest(
+                        _get_import_manifest(path)
+                    )
+                identity = resolve_manifest_identity(path, manifest_identity_cache[cache_key])
+                if identity is None and not compute:
+                    return None
+                if identity is None:
+                    identity = MediaHistoryStore.instance().compute_identity(path)
+                known_identities[path] = identity
+                return identity
+
             for existing_photo in self.photo_paths:
                 timelapse_used_names.add(os.path.basename(existing_photo).lower())
 
@@ -818,6 +876,7 @@ class DragDropFrame:
                         f"({os.environ.get('TEMP', '%TEMP%')})."
                     )
 
+            candidates = []
             # Prepare videos
             if new_videos:
                 for path in new_videos:
@@ -831,32 +890,36 @@ class DragDropFrame:
                             f"{os.path.basename(path)}"
                         )
                         continue
-                    if skip_processed and skip_processed_manual:
-                        history_store = MediaHistoryStore.instance()
-                        identity = history_store.compute_identity(path)
-                        if identity and history_store.was_imported(identity[0]):
-                            continue
-                    try:
-                        total_bytes += os.path.getsize(path)
-                        files_to_process.append(('video', path))
-                    except OSError as e:
-                        unreadable_paths.append(path)
-                        self._log_import_message(f"Import: Datei nicht lesbar: {path}", e)
+                    candidates.append(('video', path))
 
             # Prepare photos
             if new_photos:
-                for path in new_photos:
-                    if skip_processed and skip_processed_manual:
-                        history_store = MediaHistoryStore.instance()
-                        identity = history_store.compute_identity(path)
-                        if identity and history_store.was_imported(identity[0]):
-                            continue
-                    try:
-                        total_bytes += os.path.getsize(path)
-                        files_to_process.append(('photo', path))
-                    except OSError as e:
-                        unreadable_paths.append(path)
-                        self._log_import_message(f"Import: Datei nicht lesbar: {path}", e)
+                candidates.extend(('photo', path) for path in new_photos)
+
+            already_imported = set()
+            if skip_processed and skip_processed_manual and candidates:
+                # Eine Abfrage für alle Dateien statt einer je Datei
+                candidate_identities = {}
+                for _, path in candidates:
+                    identity = _get_source_identity(path)
+                    if identity:
+                        candidate_identities[path] = identity
+                history_store = MediaHistoryStore.instance()
+                history_store.upgrade_legacy_identities(candidate_identities)
+                already_imported = history_store.was_imported_many(
+                    identity[0] for identity in candidate_identities.values()
+                )
+
+            for ftype, path in candidates:
+                identity = known_identities.get(path)
+                if identity and identity[0] in already_imported:
+                    continue
+                try:
+                    total_bytes += os.path.getsize(path)
+                    files_to_process.append((ftype, path))
+                except OSError as e:
+                    unreadable_paths.append(path)
+                    self._log_import_message(f"Import: Datei nicht lesbar: {path}", e)
 
             if not files_to_process and (new_videos or new_photos):
                 if unreadable_paths:
@@ -903,6 +966,11 @@ class DragDropFrame:
                     chunk_size = 1024 * 1024 * 5 # 5 MB
                     file_copied_bytes = 0
                     start_time = time.time()
+                    # Identität für die Historie beim Kopieren mitberechnen (kein zweites Lesen)
+                    hasher = None
+                    needs_identity = (skip_processed and skip_processed_manual) or record_history_after_import
+                    if needs_identity and _get_source_identity(source_path, compute=False) is None:
+                        hasher = IdentityHasher(file_size, content_hash=False)
                     
                     with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
                         while True:
@@ -912,9 +980,20 @@ class DragDropFrame:
                             if not chunk:
                                 break
                             dst.write(chunk)
+                            if hasher is not None and hasher.needs_data:
+                                hasher.update(chunk)
                             
                             file_copied_bytes += len(chunk)
                             copied_bytes += len(chunk)
+
+                            if self._import_event_listeners:
+                                dst.flush()
+                                self._notify_import_event(
+                                    "video_progress",
+                                    dest_path=dest_path,
+                                    copied_bytes=file_copied_bytes,
+                                    file_size=file_size,
+                                )
                             
                             elapsed = time.time() - start_time
                             speed = (file_copied_bytes / (1024 * 1024)) / elapsed if elapsed > 0 else 0
@@ -937,8 +1016,16 @@ class DragDropFrame:
                         except:
                             pass
                         break
+
+                    self._notify_import_event(
+                        "video_copied",
+                        dest_path=dest_path,
+                        source_path=source_path,
+                    )
                     
                     imported_path = dest_path
+                    if hasher is not None:
+                        known_identities[source_path] = hasher.identity()
                     
                     is_duplicate = False
                     for existing_path in self.video_paths + imported_paths:
@@ -956,19 +1043,9 @@ class DragDropFrame:
                             self._import_source_ts_by_dest[os.path.normpath(imported_path)] = float(ts_src)
                         new_videos_added = True
                         if skip_processed and skip_processed_manual:
-                            from datetime import datetime
-                            history_store = MediaHistoryStore.instance()
-                            identity = history_store.compute_identity(source_path)
+                            identity = _get_source_identity(source_path)
                             if identity:
-                                identity_hash, size_bytes = identity
-                                history_store.upsert(
-                                    identity_hash=identity_hash,
-                                    filename=filename,
-                                    size_bytes=size_bytes,
-                                    media_type='video',
-                                    imported_at=datetime.now().isoformat()
-                                )
-                                imported_history_hashes.append(identity_hash)
+                                imported_history[source_path] = identity
                     else:
                         try:
                             os.remove(imported_path)
@@ -1024,6 +1101,10 @@ class DragDropFrame:
                     chunk_size = 1024 * 1024 * 5  # 5 MB — gleiche Logik wie Videos
                     file_copied_bytes = 0
                     start_time = time.time()
+                    hasher = None
+                    needs_identity = (skip_processed and skip_processed_manual) or record_history_after_import
+                    if needs_identity and _get_source_identity(source_path, compute=False) is None:
+                        hasher = IdentityHasher(file_size, content_hash=False)
 
                     with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
                         while True:
@@ -1033,6 +1114,8 @@ class DragDropFrame:
                             if not chunk:
                                 break
                             dst.write(chunk)
+                            if hasher is not None and hasher.needs_data:
+                                hasher.update(chunk)
 
                             file_copied_bytes += len(chunk)
                             copied_bytes += len(chunk)
@@ -1059,6 +1142,8 @@ class DragDropFrame:
                         break
 
                     imported_p = dest_path
+                    if hasher is not None:
+                        known_identities[source_path] = hasher.identity()
                     is_duplicate = False
                     for existing_path in self.photo_paths + photo_batch_paths:
                         try:
@@ -1077,19 +1162,9 @@ class DragDropFrame:
                         if ts_src is not None:
                             self._import_source_ts_by_dest[os.path.normpath(imported_p)] = float(ts_src)
                         if skip_processed and skip_processed_manual:
-                            from datetime import datetime
-                            history_store = MediaHistoryStore.instance()
-                            identity = history_store.compute_identity(source_path)
+                            identity = _get_source_identity(source_path)
                             if identity:
-                                identity_hash, size_bytes = identity
-                                history_store.upsert(
-                                    identity_hash=identity_hash,
-                                    filename=filename,
-                                    size_bytes=size_bytes,
-                                    media_type='photo',
-                                    imported_at=datetime.now().isoformat()
-                                )
-                                imported_history_hashes.append(identity_hash)
+                                imported_history[source_path] = identity
                     else:
                         try:
                             os.remove(imported_p)
@@ -1115,15 +1190,19 @@ class DragDropFrame:
                         pass
                     self._unregister_imported_photo(p)
                     self._import_source_ts_by_dest.pop(os.path.normpath(p), None)
-
-                if imported_history_hashes:
-                    MediaHistoryStore.instance().delete_by_hashes(imported_history_hashes)
             else:
                 imported_paths = sort_paths_by_basename(imported_paths)
                 photo_batch_paths = sort_paths_by_basename(photo_batch_paths)
                 self.video_paths.extend(imported_paths)
                 self.photo_paths.extend(photo_batch_paths)
                 added_photo_paths_this_batch = photo_batch_paths
+                if imported_history:
+                    # Alle Import-Vermerke in einer Transaktion
+                    history_store = MediaHistoryStore.instance()
+                    history_store.mark_imported_many(
+                        imported_history, imported_at=datetime.now().isoformat()
+                    )
+                    history_store.remember_identities(imported_history)
 
             # Schwere PIL-Arbeit im Worker, damit der Dialog sichtbar bleibt und der Mainthread nicht einfriert
             if not dialog.cancel_requested.is_set() and added_photo_paths_this_batch:
@@ -1154,9 +1233,11 @@ class DragDropFrame:
                 on_complete=on_complete,
                 record_history_after_import=record_history_after_import,
                 history_source_paths=history_source_paths,
+                history_identities=known_identities,
             )
 
         except Exception as e:
+            import_failed = True
             self._log_import_message("Error during async import", e)
             self._schedule_import_finished(
                 dialog,
@@ -1170,6 +1251,12 @@ class DragDropFrame:
                 record_history_after_import=record_history_after_import,
                 history_source_paths=history_source_paths,
             )
+        finally:
+            if new_videos:
+                self._notify_import_event(
+                    "batch_finished",
+                    cancelled=import_failed or dialog.cancel_requested.is_set(),
+                )
 
     def _update_drop_label_after_import(
         self,
@@ -1213,6 +1300,7 @@ class DragDropFrame:
         on_complete=None,
         record_history_after_import: bool = False,
         history_source_paths: Optional[List[str]] = None,
+        history_identities: Optional[dict] = None,
     ):
         dialog.destroy()
         unreadable_paths = unreadable_paths or []
@@ -1278,7 +1366,9 @@ class DragDropFrame:
 
         if record_history_after_import and history_source_paths:
             try:
-                MediaHistoryStore.instance().mark_imported_batch(history_source_paths)
+                MediaHistoryStore.instance().mark_imported_batch(
+                    history_source_paths, known_identities=history_identities
+                )
             except Exception as hist_err:
                 self._log_import_message("Historie nach Import konnte nicht gesetzt werden", hist_err)
 
@@ -1535,11 +1625,12 @@ class DragDropFrame:
         for item in self.photo_tree.get_children():
             self.photo_tree.delete(item)
 
+        epochs = self._photo_display_epochs(self.photo_paths)
         for i, photo_path in enumerate(self.photo_paths, 1):
             filename = os.path.basename(photo_path)
             size = self._get_file_size_fallback(photo_path)  # Fotos verwenden immer Fallback
-            imp_ep = self.get_source_import_epoch(photo_path)
-            date, timestamp = format_photo_table_datetime(photo_path, imp_ep)
+            epoch = epochs[photo_path]
+            date, timestamp = format_epoch_date(epoch), format_epoch_time(epoch)
 
             # NEU: Wasserzeichen-Status bestimmen
             watermark_value = "☑" if (i - 1) in self.watermark_photo_indices else "☐"
@@ -1653,9 +1744,17 @@ class DragDropFrame:
             pass
         return float("inf")
 
-    def _photo_row_sort_epoch(self, path: str) -> float:
+    def _photo_row_sort_epoch(self, path: str, epochs=None) -> float:
+        if epochs and path in epochs:
+            return epochs[path]
         return get_photo_display_epoch(path, self.get_source_import_epoch(path))
 
+    def _photo_display_epochs(self, paths):
+        """Aufnahmezeiten vieler Fotos parallel (Tabelle, Sortierung)."""
+        return get_photo_display_epochs(
+            paths, {p: self.get_source_import_epoch(p) for p in paths}
+        )
+
     def _video_sort_key(self, path, col, values):
         bn = os.path.basename(path)
         v = values if values else ()
@@ -1676,7 +1775,7 @@ class DragDropFrame:
             return (0, natural_sort_key(str(pr)))
         return (1, natural_sort_key(bn))
 
-    def _photo_sort_key(self, path, col, values):
+    def _photo_sort_key(self, path, col, values, epochs=None):
         bn = os.path.basename(path)
         v = values if values else ()
         if col == "Dateiname":
@@ -1684,7 +1783,7 @@ class DragDropFrame:
         if col == "Größe":
             return (0, self._parse_size_sort_value(v[2] if len(v) > 2 else ""))
         if col in ("Datum", "Uhrzeit"):
-            return (0, self._photo_row_sort_epoch(path))
+            return (0, self._photo_row_sort_epoch(path, epochs))
         return (1, natural_sort_key(bn))
 
     def _refresh_video_heading_arrows(self):
@@ -1788,8 +1887,12 @@ class DragDropFrame:
             else:
                 vals_list = [() for _ in self.photo_paths]
             rows = list(zip(self.photo_paths, vals_list))
+            epochs = (
+                self._photo_display_epochs(self.photo_paths)
+                if col in ("Datum", "Uhrzeit") else None
+            )
             rows.sort(
-                key=lambda r: self._photo_sort_key(r[0], col, r[1]),
+                key=lambda r: self._photo_sort_key(r[0], col, r[1], epochs),
                 reverse=desc,
             )
             self.photo_paths = [r[0] for r in rows]
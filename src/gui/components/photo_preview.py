@@ -1,13 +1,24 @@
 ﻿import os
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk
 
 from PIL import Image, ImageTk
 
-from src.utils.media_datetime import format_photo_table_datetime
+from src.utils.bounded_cache import (
+    SHARE_PREVIEW_LARGE_PHOTOIMAGES,
+    SHARE_PREVIEW_THUMB_PHOTOIMAGES,
+    SHARE_PREVIEW_THUMB_PIL,
+    ByteBudgetCache,
+)
+from src.utils.photo_metadata import PhotoMetadataLoader
+from src.utils.photo_pyramid import LEVEL_PANEL, LEVEL_SCREEN, PhotoPrefetcher, PhotoPyramidCache
+from src.utils.photo_thumbnail import build_pil_thumbnail
 
 _THUMB_BATCH_SIZE = 30
+# Abholintervall für Metadaten aus dem Worker-Pool (ms)
+METADATA_POLL_MS = 50
 
 
 class PhotoPreview:
@@ -21,17 +32,31 @@ class PhotoPreview:
         # Foto-Daten
         self.photo_paths = []
         self.current_photo_index = 0
-        self.photo_images = {}  # Cache: index -> ImageTk für große Vorschau
+        # Bild-Caches mit Byte-Budget (Einstellung "image_cache_budget_mb")
+        # Cache: index -> ImageTk für große Vorschau
+        self.photo_images = ByteBudgetCache(
+            "preview_large_tk", share=SHARE_PREVIEW_LARGE_PHOTOIMAGES
+        )
         # Cache: (path, size_px) -> ImageTk.PhotoImage
-        self.thumbnail_images = {}
+        self.thumbnail_images = ByteBudgetCache(
+            "preview_thumb_tk", share=SHARE_PREVIEW_THUMB_PHOTOIMAGES
+        )
         # Vom Import-Worker vorberechnete Thumbnails (Pfad -> PIL.Image)
-        self._pil_thumbnail_cache = {}
+        self._pil_thumbnail_cache = ByteBudgetCache(
+            "preview_thumb_pil", share=SHARE_PREVIEW_THUMB_PIL
+        )
         self._photo_metadata_cache = {}
         self._thumb_widgets = {}
         self._thumb_build_job = None
-        self._metadata_build_job = None
+        # Metadaten (Auflösung, Größe, Datum) werden im Worker-Pool geladen
+        self._metadata_loader = PhotoMetadataLoader()
+        self._metadata_poll_job = None
         self._large_preview_generation = 0
         self._totals_dirty = True
+        # Dekodierte Fotos (Panel-/Bildschirmgröße) + Vorausladen der Nachbarn
+        self._pyramid = PhotoPyramidCache()
+        self._prefetcher = PhotoPrefetcher(self._pyramid)
+        self._nav_direction = 1
 
         # NEU: Mehrfachauswahl
         self.selected_photos = set()  # Set von ausgewählten Indizes
@@ -297,12 +322,13 @@ class PhotoPreview:
 
         self.photo_images.clear()
         self.thumbnail_images.clear()
-        self._pil_thumbnail_cache = dict(pil_thumbnail_cache) if pil_thumbnail_cache else {}
+        alive = set(photo_paths)
+        self._pil_thumbnail_cache.retain(alive.__contains__)
+        if pil_thumbnail_cache:
+            self._pil_thumbnail_cache.update(pil_thumbnail_cache.items())
+        self._pyramid.retain(photo_paths)
+        self._nav_direction = 1
         self._prune_metadata_cache()
-        if photo_paths and self.current_photo_index >= 0:
-            current_path = photo_paths[self.current_photo_index]
-            if current_path not in self._photo_metadata_cache:
-                self._photo_metadata_cache[current_path] = self._load_photo_metadata(current_path)
         self._schedule_metadata_prefetch(photo_paths)
         self._totals_dirty = True
 
@@ -320,13 +346,13 @@ class PhotoPreview:
                 pass
             self._thumb_build_job = None
 
-    def _cancel_metadata_build_job(self):
-        if self._metadata_build_job is not None:
+    def _cancel_metadata_poll_job(self):
+        if self._metadata_poll_job is not None:
             try:
-                self.frame.after_cancel(self._metadata_build_job)
+                self.frame.after_cancel(self._metadata_poll_job)
             except tk.TclError:
                 pass
-            self._metadata_build_job = None
+            self._metadata_poll_job = None
 
     def _active_thumb_size(self):
         return int(self.thumbnail_size * 1.3)
@@ -341,53 +367,62 @@ class PhotoPreview:
         for path in stale:
             del self._photo_metadata_cache[path]
 
-    def _load_photo_metadata(self, photo_path):
-        meta = {
-            "filename": os.path.basename(photo_path),
-            "resolution": "-",
-            "size": "-",
-            "date": "-",
-            "time": "-",
-        }
-        try:
-            with Image.open(photo_path) as img:
-                width, height = img.size
-            meta["resolution"] = f"{width} × {height} px"
-            size_bytes = os.path.getsize(photo_path)
-            meta["size"] = f"{size_bytes / (1024 * 1024):.2f} MB"
-            imp_ep = None
-            if self.app and hasattr(self.app, "drag_drop"):
-                imp_ep = self.app.drag_drop.get_source_import_epoch(photo_path)
-            date_str, time_str = format_photo_table_datetime(photo_path, imp_ep)
-            meta["date"] = date_str
-            meta["time"] = time_str
-        except Exception as e:
-            print(f"Fehler beim Laden der Foto-Metadaten für {photo_path}: {e}")
-        return meta
+    def _request_photo_metadata(self, paths, priority=False):
+        """Lädt Metadaten im Hintergrund; Ergebnisse kommen über _poll_metadata_results."""
+        paths = [p for p in paths if p not in self._photo_metadata_cache]
+        if not paths:
+            return
+        import_epochs = {}
+        if self.app and hasattr(self.app, "drag_drop"):
+            for path in paths:
+                import_epochs[path] = self.app.drag_drop.get_source_import_epoch(path)
+        self._metadata_loader.request(paths, import_epochs, priority=priority)
+        if self._metadata_poll_job is None:
+            self._metadata_poll_job = self.frame.after(
+                METADATA_POLL_MS, self._poll_metadata_results
+            )
 
     def _schedule_metadata_prefetch(self, paths):
-        self._cancel_metadata_build_job()
-        self._metadata_prefetch_paths = list(paths or [])
-        self._metadata_prefetch_index = 0
-        if self._metadata_prefetch_paths:
-            self._build_metadata_batch()
-
-    def _build_metadata_batch(self):
-        paths = getattr(self, "_metadata_prefetch_paths", [])
-        start = self._metadata_prefetch_index
-        end = min(start + 15, len(paths))
-
-        for path in paths[start:end]:
-            if path not in self._photo_metadata_cache:
-                self._photo_metadata_cache[path] = self._load_photo_metadata(path)
-
-        if end < len(paths):
-            self._metadata_prefetch_index = end
-            self._metadata_build_job = self.frame.after(1, self._build_metadata_batch)
-            return
+        self._metadata_loader.cancel()
+        self._cancel_metadata_poll_job()
+        paths = list(paths or [])
+        if 0 <= self.current_photo_index < len(paths):
+            self._request_photo_metadata([paths[self.current_photo_index]], priority=True)
+        self._request_photo_metadata(paths)
+
+    def _poll_metadata_results(self):
+        """Übernimmt alle bis jetzt fertigen Metadaten in einem UI-Durchlauf."""
+        self._metadata_poll_job = None
+        generation = self._metadata_loader.generation
+        current_path = None
+        if self.photo_paths and 0 <= self.current_photo_index < len(self.photo_paths):
+            current_path = self.photo_paths[self.current_photo_index]
 
-        self._metadata_build_job = None
-        self._totals_dirty = True
+        received = False
+        current_updated = False
+        while True:
+            try:
+                result_generation, path, meta = self._metadata_loader.results.get_nowait()
+            except queue.Empty:
+                break
+            if result_generation != generation:
+                continue
+            display = meta.as_display_dict()
+            display["size_bytes"] = meta.size_bytes
+            self._photo_metadata_cache[path] = display
+            received = True
+            current_updated = current_updated or path == current_path
+
+        if current_updated:
+            self._update_current_photo_info()
+        if received:
+            self._totals_dirty = True
+            self._update_totals_info()
+
+        if self._metadata_loader.has_pending() or not self._metadata_loader.results.empty():
+            self._metadata_poll_job = self.frame.after(
+                METADATA_POLL_MS, self._poll_metadata_results
+            )
 
     def _selection_style_for_index(self, idx):
         is_current = idx == self.current_photo_index
@@ -420,9 +455,9 @@ class PhotoPreview:
                 if img.width > size or img.height > size:
                     img.thumbnail((size, size), Image.LANCZOS)
             else:
-                with Image.open(photo_path) as opened:
-                    img = opened.copy()
-                img.thumbnail((size, size), Image.LANCZOS)
+                img = build_pil_thumbnail(photo_path, size)
+                if img is None:
+                    return None
 
             thumbnail = ImageTk.PhotoImage(img)
             self.thumbnail_images[cache_key] = thumbnail
@@ -537,6 +572,8 @@ class PhotoPreview:
 
         old_index = self.current_photo_index
         self.current_photo_index = new_index
+        if old_index is not None and old_index >= 0:
+            self._nav_direction = 1 if new_index > old_index else -1
 
         if self._can_incremental_navigate(old_index, new_index):
             self._refresh_thumbnail_at_index(old_index)
@@ -689,18 +726,20 @@ class PhotoPreview:
             return
 
         photo_path = self.photo_paths[self.current_photo_index]
+        panel_size = (self.large_preview_width, self.large_preview_height)
+        self._schedule_neighbor_prefetch(LEVEL_PANEL, panel_size)
+
+        cached = self._pyramid.get(photo_path, LEVEL_PANEL)
+        if cached is not None:
+            self._apply_large_preview_result(generation, photo_path, cached)
+            return
+
         self._show_large_preview_quick(photo_path)
         self._draw_navigation_arrows()
 
         def worker():
             try:
-                with Image.open(photo_path) as opened:
-                    img = opened.copy()
-                img.thumbnail(
-                    (self.large_preview_width, self.large_preview_height),
-                    Image.LANCZOS,
-                )
-                payload = img.copy()
+                payload = self._pyramid.get_or_load(photo_path, LEVEL_PANEL, panel_size)
             except Exception as e:
                 print(f"Fehler beim Laden des Fotos {photo_path}: {e}")
                 payload = None
@@ -714,6 +753,18 @@ class PhotoPreview:
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _schedule_neighbor_prefetch(self, level, size):
+        """Lädt die nächsten Fotos in Navigationsrichtung im Hintergrund vor."""
+        if len(self.photo_paths) <= 1 or self.current_photo_index < 0:
+            return
+        self._prefetcher.schedule(
+            list(self.photo_paths),
+            self.current_photo_index,
+            self._nav_direction,
+            level,
+            size,
+        )
+
     def _show_large_preview_quick(self, photo_path):
         quick = self._get_thumbnail_photoimage(photo_path, is_active=True)
         if quick is None:
@@ -721,6 +772,7 @@ class PhotoPreview:
         x = self.large_preview_width // 2
         y = self.large_preview_height // 2
         self.large_preview_canvas.create_image(x, y, image=quick, anchor="center", tags="preview_image")
+        self.large_preview_canvas.image = quick
 
     def _apply_large_preview_result(self, generation, photo_path, pil_image):
         if generation != self._large_preview_generation:
@@ -745,6 +797,8 @@ class PhotoPreview:
 
         photo_image = ImageTk.PhotoImage(pil_image)
         self.photo_images[self.current_photo_index] = photo_image
+        # Eigene Referenz: der Cache darf das angezeigte Bild jederzeit verdrängen
+        self.large_preview_canvas.image = photo_image
         x = self.large_preview_width // 2
         y = self.large_preview_height // 2
         self.large_preview_canvas.create_image(x, y, image=photo_image, anchor="center")
@@ -1114,14 +1168,14 @@ class PhotoPreview:
 
         photo_path = self.photo_paths[self.current_photo_index]
         try:
-            img = Image.open(photo_path)
-
             # Bildschirmgröße
             screen_width = self.fullscreen_window.winfo_screenwidth()
             screen_height = self.fullscreen_window.winfo_screenheight()
 
-            # Skaliere Bild auf Bildschirmgröße (Aspect Ratio beibehalten)
-            img.thumbnail((screen_width, screen_height), Image.LANCZOS)
+            # Skaliert auf Bildschirmgröße (Aspect Ratio beibehalten)
+            screen_size = (screen_width, screen_height)
+            img = self._pyramid.get_or_load(photo_path, LEVEL_SCREEN, screen_size)
+            self._schedule_neighbor_prefetch(LEVEL_SCREEN, screen_size)
             photo_image = ImageTk.PhotoImage(img)
 
             # Aktualisiere das Bild im Canvas
@@ -1172,10 +1226,11 @@ class PhotoPreview:
             return
 
         photo_path = self.photo_paths[self.current_photo_index]
-        if photo_path not in self._photo_metadata_cache:
-            self._photo_metadata_cache[photo_path] = self._load_photo_metadata(photo_path)
-
-        meta = self._photo_metadata_cache.get(photo_path, {})
+        meta = self._photo_metadata_cache.get(photo_path)
+        if meta is None:
+            # Noch nicht geladen: vorziehen, Labels folgen mit dem Ergebnis
+            self._request_photo_metadata([photo_path], priority=True)
+            meta = {"resolution": "…", "size": "…", "date": "…", "time": "…"}
         truncated_filename = self._truncate_filename(
             meta.get("filename", os.path.basename(photo_path)),
             max_chars=30,
@@ -1200,23 +1255,21 @@ class PhotoPreview:
             self.update_wm_button_state()
             return
 
+        # Nur aus dem Metadaten-Cache (kein Dateizugriff im UI-Thread)
         total_size = 0
+        missing = 0
         for path in self.photo_paths:
             meta = self._photo_metadata_cache.get(path)
-            if meta and meta.get("size") != "-":
-                try:
-                    total_size += os.path.getsize(path)
-                    continue
-                except OSError:
-                    pass
-            try:
-                total_size += os.path.getsize(path)
-            except OSError:
-                pass
+            if meta is None:
+                missing += 1
+            elif meta.get("size_bytes", -1) > 0:
+                total_size += meta["size_bytes"]
 
         total_size_mb = total_size / (1024 * 1024)
-        self.info_labels["total_size"].config(text=f"{total_size_mb:.2f} MB")
-        self._totals_dirty = False
+        suffix = " …" if missing else ""
+        self.info_labels["total_size"].config(text=f"{total_size_mb:.2f} MB{suffix}")
+        # Unvollständig: neu berechnen, sobald weitere Metadaten eintreffen
+        self._totals_dirty = bool(missing)
         self.update_wm_button_state()
 
     def _update_delete_button(self):
@@ -1308,6 +1361,7 @@ class PhotoPreview:
         self.photo_images.clear()
         self.thumbnail_images.clear()
         self._prune_metadata_cache()
+        self._pyramid.retain(self.photo_paths)
 
         self.selected_photos.clear()
         self.explicitly_selected = False
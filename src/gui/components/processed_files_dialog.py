@@ -1,6 +1,11 @@
 ﻿import tkinter as tk
 from tkinter import ttk, messagebox
-from src.utils.media_history import MediaHistoryStore
+from src.utils.media_history import HISTORY_PAGE_SIZE, MediaHistoryStore
+
+# Verzögerung der Suche nach dem letzten Tastendruck
+SEARCH_DEBOUNCE_MS = 200
+# Nächste Seite laden, sobald das sichtbare Ende diesen Anteil der Liste erreicht
+LOAD_MORE_THRESHOLD = 0.9
 
 class ProcessedFilesDialog:
     """Dialog zur Anzeige und Verwaltung bereits verarbeiteter Dateien."""
@@ -17,6 +22,12 @@ class ProcessedFilesDialog:
         # Filter-Variablen
         self.filter_type_var = tk.StringVar(value="Alle")
         self.filter_period_var = tk.StringVar(value="Alle Zeit")
+        # Keyset-Pagination: Cursor der nächsten Seite (None = alles geladen)
+        self._next_cursor = None
+        self._query = {}
+        self._page_pending = False
+        self._search_after_id = None
+        self._scrollbar = None
 
     def _center_dialog_fast(self):
         """Zentriert den Dialog über dem Parent-Fenster ohne teure Layout-Updates."""
@@ -107,8 +118,9 @@ class ProcessedFilesDialog:
 
         # Treeview links (füllt restlichen Platz)
         columns = ("filename", "media_type", "size", "first_seen", "backed_up", "imported")
+        self._scrollbar = scrollbar
         self.tree = ttk.Treeview(tree_container, columns=columns, show='headings',
-                                 selectmode='extended', yscrollcommand=scrollbar.set)
+                                 selectmode='extended', yscrollcommand=self._on_tree_scrolled)
         self.tree.pack(side='left', fill='both', expand=True)
 
         # Verbinde Scrollbar mit Treeview
@@ -159,14 +171,28 @@ class ProcessedFilesDialog:
         self.dialog.grab_set()
 
     def _load_entries(self, search: str = None):
-        """Lädt Einträge in die Treeview mit optionaler Suche und Filtern."""
+        """Lädt die erste Seite in die Treeview; weitere Seiten folgen beim Scrollen."""
         for row in self.tree.get_children():
             self.tree.delete(row)
 
-        entries = self.store.list_entries(limit=2000, search=search)
+        self._query = {"search": search, **self._filter_query()}
+        self._next_cursor = None
+        self._load_next_page(first=True)
+
+        # Aktualisiere Statistiken
+        is_filtered = search is not None or self._has_active_filters()
+        self._update_statistics(self.store.count_entries(**self._query), is_filtered)
 
-        # Filtere Einträge
-        entries = self._apply_filters_to_entries(entries)
+    def _load_next_page(self, first: bool = False):
+        """Hängt die nächste Seite (Keyset-Cursor) an die Treeview an."""
+        self._page_pending = False
+        if not first and self._next_cursor is None:
+            return
+        if not self.tree.winfo_exists():
+            return
+        entries, self._next_cursor = self.store.list_entries_page(
+            limit=HISTORY_PAGE_SIZE, after=None if first else self._next_cursor, **self._query
+        )
 
         for e in entries:
             size_mb = e['size_bytes'] / (1024*1024)
@@ -185,22 +211,27 @@ class ProcessedFilesDialog:
                 imported
             ))
 
-        # Aktualisiere Statistiken
-        is_filtered = search is not None or self._has_active_filters()
-        self._update_statistics(len(entries), is_filtered)
+    def _on_tree_scrolled(self, first, last):
+        """Scrollbar nachführen und kurz vor dem Listenende die nächste Seite laden."""
+        self._scrollbar.set(first, last)
+        if (self._next_cursor is not None and not self._page_pending
+                and float(last) >= LOAD_MORE_THRESHOLD):
+            # Nicht innerhalb des Scroll-Callbacks einfügen
+            self._page_pending = True
+            self.dialog.after_idle(self._load_next_page)
 
-    def _apply_filters_to_entries(self, entries):
-        """Wendet Typ- und Zeitraum-Filter auf Einträge an."""
-        filtered = entries
+    def _filter_query(self):
+        """Typ- und Zeitraum-Filter als Parameter für die Datenbankabfrage."""
+        query = {"media_type": None, "imported_since": None}
 
         # Typ-Filter
         filter_type = self.filter_type_var.get()
         if filter_type == "Videos":
-            filtered = [e for e in filtered if e['media_type'].lower() == 'video']
+            query["media_type"] = 'video'
         elif filter_type == "Fotos":
-            filtered = [e for e in filtered if e['media_type'].lower() == 'photo']
+            query["media_type"] = 'photo'
 
-        # Zeitraum-Filter (basierend auf imported_at)
+        # Zeitraum-Filter (basierend auf imported_at, ISO-Zeitstempel sind lexikographisch sortierbar)
         filter_period = self.filter_period_var.get()
         if filter_period != "Alle Zeit":
             from datetime import datetime, timedelta
@@ -218,28 +249,9 @@ class ProcessedFilesDialog:
                 start_date = None
 
             if start_date:
-                filtered_by_date = []
-                for e in filtered:
-                    if e['imported_at']:
-                        try:
-                            # Parse ISO timestamp
-                            imported_dt = datetime.fromisoformat(e['imported_at'].replace('Z', '+00:00'))
-                            # Naive datetime als Lokalzeit behandeln
-                            if imported_dt.tzinfo is None:
-                                imported_dt = imported_dt.replace(tzinfo=None)
-                                # Vergleiche mit naive datetime
-                                if imported_dt >= start_date:
-                                    filtered_by_date.append(e)
-                            else:
-                                # Mit Timezone-aware datetime
-                                if imported_dt.astimezone() >= start_date.astimezone():
-                                    filtered_by_date.append(e)
-                        except:
-                            # Bei Fehler trotzdem anzeigen
-                            filtered_by_date.append(e)
-                filtered = filtered_by_date
-
-        return filtered
+                query["imported_since"] = start_date.isoformat(timespec='seconds')
+
+        return query
 
     def _has_active_filters(self):
         """Prüft ob Filter aktiv sind."""
@@ -295,7 +307,17 @@ class ProcessedFilesDialog:
             self.stats_label.config(text=f"Gesamt: {count}")
 
     def _on_search_changed(self, *args):
-        """Wird aufgerufen wenn sich der Suchtext ändert."""
+        """Wird aufgerufen wenn sich der Suchtext ändert (entprellt)."""
+        if self.dialog is None or self.tree is None:
+            return
+        if self._search_after_id is not None:
+            self.dialog.after_cancel(self._search_after_id)
+        self._search_after_id = self.dialog.after(SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_after_id = None
+        if not self.dialog.winfo_exists():
+            return
         search_text = self.search_var.get().strip()
         if search_text:
             self._load_entries(search=search_text)
@@ -310,7 +332,7 @@ class ProcessedFilesDialog:
             return
         ids = [int(iid) for iid in selection]
         self.store.delete_by_ids(ids)
-        self._load_entries()
+        self._load_entries(search=self.search_var.get().strip() or None)
 
     def _purge_all(self):
         if not messagebox.askyesno("Bestätigen", "Wirklich alle Einträge löschen?", parent=self.dialog):
@@ -11,7 +11,17 @@ import queue
 import math
 from collections import deque
 
-from src.utils.constants import SUBPROCESS_CREATE_NO_WINDOW
+from src.utils.bounded_cache import (
+    SHARE_SD_THUMB_PHOTOIMAGES,
+    SHARE_SD_THUMB_PIL,
+    ByteBudgetCache,
+)
+from src.utils.photo_thumbnail import decode_pil_thumbnail, load_display_image
+from src.utils.thumbnail_store import get_or_build_thumbnail
+from src.video.video_thumbnail import extract_video_thumbnail
+
+SD_THUMB_WIDTH = 180
+SD_THUMB_HEIGHT = 135
 
 
 class SDFileSelectorDialog:
@@ -45,9 +55,13 @@ class SDFileSelectorDialog:
         # Standardmäßig KEINE Dateien ausgewählt (User muss explizit auswählen)
         # self.selected_paths bleibt leer
 
-        # Thumbnail-Cache
-        self.thumbnail_cache = {}  # path -> PhotoImage
-        self.thumbnail_pil_cache = {}  # path -> PIL.Image
+        # Thumbnail-Cache (LRU mit Byte-Budget; angezeigte Labels halten eigene Referenzen)
+        self.thumbnail_cache = ByteBudgetCache(  # path -> PhotoImage
+            "sd_thumb_tk", share=SHARE_SD_THUMB_PHOTOIMAGES
+        )
+        self.thumbnail_pil_cache = ByteBudgetCache(  # path -> PIL.Image
+            "sd_thumb_pil", share=SHARE_SD_THUMB_PIL
+        )
         self._prepare_file_metadata()
 
         # NEU: Drag-Selection Variablen
@@ -1072,15 +1086,17 @@ class SDFileSelectorDialog:
 
         # JETZT anzeigen: Loading-Spinner oder Icon (wird später ersetzt)
         # Prüfe ob bereits im Cache
-        if path in self.thumbnail_cache:
+        cached_tk = self.thumbnail_cache.get(path)
+        cached_pil = self.thumbnail_pil_cache.get(path) if cached_tk is None else None
+        if cached_tk is not None:
             # Aus Cache laden
-            thumbnail_img = self.thumbnail_cache[path]
+            thumbnail_img = cached_tk
             thumb_label = tk.Label(thumb_frame, image=thumbnail_img, bg='#f0f0f0')
             thumb_label.image = thumbnail_img
             thumb_label._file_path = path
             thumb_label.place(relx=0.5, rely=0.5, anchor='center')
-        elif path in self.thumbnail_pil_cache:
-            thumbnail_img = ImageTk.PhotoImage(self.thumbnail_pil_cache[path])
+        elif cached_pil is not None:
+            thumbnail_img = ImageTk.PhotoImage(cached_pil)
             self.thumbnail_cache[path] = thumbnail_img
             thumb_label = tk.Label(thumb_frame, image=thumbnail_img, bg='#f0f0f0')
             thumb_label.image = thumbnail_img
@@ -1282,64 +1298,28 @@ class SDFileSelectorDialog:
     def generate_thumbnail(self, file_info):
         """Generiert PIL-Thumbnail für Datei (ohne Tk-Aufrufe im Worker-Thread)."""
         path = file_info['path']
-        if path in self.thumbnail_pil_cache:
+        cached = self.thumbnail_pil_cache.get(path)
+        if cached is not None:
             try:
-                return self.thumbnail_pil_cache[path].copy()
+                return cached.copy()
             except Exception:
                 pass
 
         try:
             if file_info['is_video']:
-                # Video-Thumbnail: Extrahiere ersten Frame mit FFmpeg
-                import tempfile
-                import subprocess
-
-                # Erstelle temporäres Bild
-                with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                    tmp_path = tmp.name
-
-                try:
-                    # FFmpeg-Kommando: Extrahiere Frame bei 1 Sekunde
-                    cmd = [
-                        'ffmpeg',
-                        '-ss', '1',  # Springe zu 1 Sekunde
-                        '-i', path,  # Input-Video
-                        '-vframes', '1',  # Nur 1 Frame
-                        '-vf', 'scale=180:135:force_original_aspect_ratio=decrease',  # Skaliere
-                        '-y',  # Überschreibe
-                        tmp_path
-                    ]
-
-                    # Führe FFmpeg aus (leise)
-                    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5, creationflags=SUBPROCESS_CREATE_NO_WINDOW)
-
-                    # Lade generiertes Bild als PIL-Objekt
-                    img = Image.open(tmp_path)
-                    img_copy = img.copy()
-                    img.close()
-                    self.thumbnail_pil_cache[path] = img_copy.copy()
-
-                    # Lösche temporäre Datei
-                    import os
-                    os.unlink(tmp_path)
-
-                    return img_copy
-                except Exception as e:
-                    print(f"FFmpeg-Fehler für {file_info['filename']}: {e}")
-                    # Cleanup
-                    try:
-                        import os
-                        os.unlink(tmp_path)
-                    except:
-                        pass
-                    return None
+                builder = lambda edge: extract_video_thumbnail(
+                    path, edge, cancel_check=lambda: self.loading_cancelled
+                )
             else:
-                # Foto-Thumbnail
-                img = Image.open(path)
-                img.thumbnail((180, 135), Image.Resampling.LANCZOS)
-                img_copy = img.copy()
-                self.thumbnail_pil_cache[path] = img_copy.copy()
-                return img_copy
+                builder = lambda edge: decode_pil_thumbnail(path, edge)
+
+            # Persistenter Speicher: gleiche Karte/Backup erneut öffnen -> sofort da
+            img = get_or_build_thumbnail(path, SD_THUMB_WIDTH, builder)
+            if img is None:
+                return None
+            img.thumbnail((SD_THUMB_WIDTH, SD_THUMB_HEIGHT), Image.Resampling.LANCZOS)
+            self.thumbnail_pil_cache[path] = img.copy()
+            return img
         except Exception as e:
             print(f"Fehler beim Thumbnail-Generieren für {file_info['filename']}: {e}")
             return None
@@ -1544,9 +1524,8 @@ class SDFileSelectorDialog:
         preview_window.geometry("800x600")
 
         try:
-            img = Image.open(file_info['path'])
-            # Skaliere auf maximal 780x580
-            img.thumbnail((780, 580), Image.Resampling.LANCZOS)
+            # Skaliert auf maximal 780x580
+            img = load_display_image(file_info['path'], 780, 580)
             photo = ImageTk.PhotoImage(img)
 
             label = tk.Label(preview_window, image=photo)
@@ -1989,11 +1968,13 @@ class SDFileSelectorDialog:
             self.inflight_thumbnail_paths.add(path)
 
             # Bereits gerendertes Tk-Thumbnail wiederverwenden
-            if path in self.thumbnail_cache:
-                self.thumbnail_result_queue.put((thumb_label, thumb_frame, self.thumbnail_cache[path], None, on_click, on_double_click))
+            cached_tk = self.thumbnail_cache.get(path)
+            if cached_tk is not None:
+                self.thumbnail_result_queue.put((thumb_label, thumb_frame, cached_tk, None, on_click, on_double_click))
                 continue
-            if path in self.thumbnail_pil_cache:
-                self.thumbnail_result_queue.put((thumb_label, thumb_frame, None, self.thumbnail_pil_cache[path].copy(), on_click, on_double_click))
+            cached_pil = self.thumbnail_pil_cache.get(path)
+            if cached_pil is not None:
+                self.thumbnail_result_queue.put((thumb_label, thumb_frame, None, cached_pil.copy(), on_click, on_double_click))
                 continue
 
             # Generiere PIL-Thumbnail im Worker
@@ -1,7 +1,9 @@
 """
 SD-Karten Status Anzeige
 Zeigt den Status der SD-Karten Überwachung und Backup-Fortschritt
+(je gesicherter Karte ein eigener Eintrag, da mehrere Karten parallel laufen)
 """
+import os
 import tkinter as tk
 from tkinter import ttk
 
@@ -22,6 +24,9 @@ class SDStatusIndicator:
         self.monitoring_active = False
         self.backup_active = False
         self.clearing_active = False  # SD-Karte wird geleert
+        # Laufende Backups: Laufwerk -> Widgets und letzter Fortschritt
+        self.device_entries = {}
+        self.clearing_drives = set()
         self.sd_detected = False
         self.active_drive_str = ""  # z. B. "E:" oder Linux-Mountpfad
         self.waiting_size_limit_dialog = False
@@ -30,6 +35,7 @@ class SDStatusIndicator:
         # Tooltip-Verwaltung
         self.tooltip = None
         self.tooltip_timer = None
+        self._tooltip_handlers = None
 
     def create_widgets(self):
         """Erstellt die Status-Widgets"""
@@ -56,7 +62,7 @@ class SDStatusIndicator:
         )
         self.status_label.pack(side="left", padx=2)
 
-        # Progress Frame (nur sichtbar während Backup)
+        # Progress Frame (nur sichtbar während der Leerung; Backups haben eigene Einträge)
         self.progress_frame = tk.Frame(self.container, bg="#f0f0f0")
 
         # Kleine Progress Bar
@@ -85,8 +91,13 @@ class SDStatusIndicator:
         """Mehrzeiliger Tooltip: Kontext, aktuelle Phase, typischer Ablauf."""
         lines = ["SD-Karten Überwachung aktiv"]
         drive = (self.active_drive_str or "").strip()
-        if drive:
+        if drive and len(self.device_entries) <= 1:
             lines.append(f"Laufwerk / Pfad: {drive}")
+        for entry_drive, entry in self.device_entries.items():
+            lines.append(
+                f"Backup {entry_drive or '?'}: {entry['current_mb']:.0f} / "
+                f"{entry['total_mb']:.0f} MB ({entry['speed_mbps']:.1f} MB/s)"
+            )
 
         if self.clearing_active:
             phase = (
@@ -142,6 +153,7 @@ class SDStatusIndicator:
             # Tooltip sofort entfernen
             self.hide_tooltip()
 
+        self._tooltip_handlers = (show_tooltip, on_leave)
         widgets = [
             self.container,
             self.icon_label,
@@ -151,9 +163,14 @@ class SDStatusIndicator:
             self.progress_label,
         ]
         for widget in widgets:
-            if widget:
-                widget.bind("<Enter>", show_tooltip)
-                widget.bind("<Leave>", on_leave)
+            self._bind_tooltip(widget)
+
+    def _bind_tooltip(self, widget):
+        """Verbindet ein Widget mit dem Status-Tooltip."""
+        if widget and self._tooltip_handlers:
+            show_tooltip, on_leave = self._tooltip_handlers
+            widget.bind("<Enter>", show_tooltip)
+            widget.bind("<Leave>", on_leave)
 
     def _create_tooltip_window(self, event, text):
         """Erstellt das Tooltip-Fenster"""
@@ -219,15 +236,66 @@ class SDStatusIndicator:
         self.sd_detected = detected
         self.update_display()
 
-    def set_backup_active(self, active):
-        """Setzt den Backup-Status"""
-        self.backup_active = active
-        if not active:
+    def set_backup_active(self, active, drive=None):
+        """Setzt den Backup-Status einer Karte (drive); aktiv solange eine Karte läuft"""
+        key = self._drive_key(drive)
+        if active:
+            self._ensure_device_entry(key)
+        else:
+            self._remove_device_entry(key)
+        self.backup_active = bool(self.device_entries)
+        if not self.backup_active:
             self.waiting_size_limit_dialog = False
-            # Reset Progress wenn Backup beendet
-            self.progress_frame.pack_forget()
         self.update_display()
 
+    @staticmethod
+    def _drive_key(drive):
+        return "" if drive is None else str(drive).strip()
+
+    @staticmethod
+    def _short_drive_name(drive):
+        """Kurzname für die Anzeige: "E:" bleibt, Mountpfade werden auf den Kartennamen gekürzt."""
+        return os.path.basename(drive.rstrip("/\\")) or drive
+
+    def _ensure_device_entry(self, drive):
+        """Eintrag (Name, Balken, Text) für eine laufende Karte; wird beim ersten Fortschritt angezeigt."""
+        entry = self.device_entries.get(drive)
+        if entry is not None:
+            return entry
+        frame = tk.Frame(self.container, bg="#f0f0f0")
+        name_label = tk.Label(
+            frame,
+            text=self._short_drive_name(drive),
+            font=("Arial", 8, "bold"),
+            bg="#f0f0f0",
+            fg="#ff9800"
+        )
+        name_label.pack(side="left")
+        bar = ttk.Progressbar(frame, orient='horizontal', mode='determinate', length=70)
+        bar.pack(side="left", padx=3)
+        text_label = tk.Label(frame, text="", font=("Arial", 8), bg="#f0f0f0", fg="#555")
+        text_label.pack(side="left")
+        for widget in (frame, name_label, bar, text_label):
+            self._bind_tooltip(widget)
+        entry = {
+            'frame': frame,
+            'bar': bar,
+            'text': text_label,
+            'current_mb': 0.0,
+            'total_mb': 0.0,
+            'speed_mbps': 0.0,
+        }
+        self.device_entries[drive] = entry
+        return entry
+
+    def _remove_device_entry(self, drive):
+        entry = self.device_entries.pop(drive, None)
+        if entry is not None:
+            try:
+                entry['frame'].destroy()
+            except tk.TclError:
+                pass
+
     def set_active_drive(self, drive):
         """Merkt sich das aktuelle Laufwerk für Tooltip und Kontext."""
         if drive is None or drive is False:
@@ -245,10 +313,15 @@ class SDStatusIndicator:
         self.auto_import_active = bool(active)
         self.update_display()
 
-    def set_clearing_active(self, active):
-        """Setzt den Status für SD-Karten Leerung"""
-        self.clearing_active = active
-        if not active:
+    def set_clearing_active(self, active, drive=None):
+        """Setzt den Status für SD-Karten Leerung (aktiv solange eine Karte geleert wird)"""
+        key = self._drive_key(drive)
+        if active:
+            self.clearing_drives.add(key)
+        else:
+            self.clearing_drives.discard(key)
+        self.clearing_active = bool(self.clearing_drives)
+        if not self.clearing_active:
             # Reset Progress wenn Leerung beendet
             self.progress_frame.pack_forget()
         self.update_display()
@@ -269,31 +342,35 @@ class SDStatusIndicator:
         if not self.progress_frame.winfo_ismapped():
             self.progress_frame.pack(side="left", padx=5)
 
-    def update_backup_progress(self, current_mb, total_mb, speed_mbps):
+    def update_backup_progress(self, current_mb, total_mb, speed_mbps, drive=None):
         """
-        Aktualisiert den Backup-Fortschritt
+        Aktualisiert den Backup-Fortschritt einer Karte
 
         Args:
             current_mb: Bereits kopierte MB
             total_mb: Gesamt MB
             speed_mbps: Kopiergeschwindigkeit in MB/s
+            drive: Laufwerk der Karte (eigener Eintrag je Karte)
         """
-        if not self.backup_active or self.auto_import_active:
+        entry = self.device_entries.get(self._drive_key(drive))
+        if entry is None:
+            # Backup dieser Karte ist bereits beendet
             return
+        entry['current_mb'] = current_mb
+        entry['total_mb'] = total_mb
+        entry['speed_mbps'] = speed_mbps
 
         # Progress Bar aktualisieren
         if total_mb > 0:
             progress = (current_mb / total_mb) * 100
-            self.progress_bar['value'] = progress
+            entry['bar']['value'] = progress
 
-        # Progress Text aktualisieren
-        self.progress_label.config(
-            text=f"{current_mb:.1f} / {total_mb:.1f} MB ({speed_mbps:.1f} MB/s)"
-        )
+        # Progress Text aktualisieren (Details im Tooltip)
+        entry['text'].config(text=f"{current_mb:.0f}/{total_mb:.0f} MB {speed_mbps:.1f} MB/s")
 
-        # Progress Frame anzeigen
-        if not self.progress_frame.winfo_ismapped():
-            self.progress_frame.pack(side="left", padx=5)
+        # Eintrag anzeigen
+        if not entry['frame'].winfo_ismapped():
+            entry['frame'].pack(side="left", padx=5)
 
     def update_display(self):
         """Aktualisiert die Anzeige basierend auf dem aktuellen Status"""
@@ -325,7 +402,9 @@ class SDStatusIndicator:
             self.progress_bar.stop()
         elif self.backup_active:
             self.icon_label.config(text="📥", fg="#ff9800")  # Orange für Backup
-            self.status_label.config(text="Backup läuft...", fg="#ff9800")
+            backup_count = len(self.device_entries)
+            backup_text = "Backup läuft..." if backup_count <= 1 else f"{backup_count} Backups laufen..."
+            self.status_label.config(text=backup_text, fg="#ff9800")
             # Stelle sicher dass Progress-Bar im determinate mode ist
             self.progress_bar.config(mode='determinate')
             self.progress_bar.stop()
@@ -342,6 +421,11 @@ class SDStatusIndicator:
         self.active_drive_str = ""
         self.waiting_size_limit_dialog = False
         self.auto_import_active = False
+        for drive in list(self.device_entries):
+            self._remove_device_entry(drive)
+        self.backup_active = False
+        self.clearing_drives.clear()
+        self.clearing_active = False
         self.hide_tooltip()  # Cleanup Tooltip
         self.update_display()
 
@@ -5,6 +5,11 @@ import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
 import webbrowser
 
+from src.utils.bounded_cache import (
+    DEFAULT_IMAGE_CACHE_BUDGET_MB,
+    MAX_IMAGE_CACHE_BUDGET_MB,
+    MIN_IMAGE_CACHE_BUDGET_MB,
+)
 from src.utils.constants import APP_VERSION, PAYPAL_LOGO_PATH
 from src.gui.components.circular_spinner import CircularSpinner
 from src.gui.components.warning_dialog import WarningDialog
@@ -65,6 +70,7 @@ class SettingsDialog:
         self.encoding_strategy_var = tk.StringVar(value="per_clip")
         self.reencode_matching_clips_var = tk.BooleanVar(value=False)
         self.preview_encode_crf_var = tk.StringVar(value="18")
+        self.image_cache_budget_mb_var = tk.StringVar(value="512")
         # Session-Zurücksetzen: Tandemmaster / Videospringer optional beibehalten
         self.keep_tandemmaster_on_session_reset_var = tk.BooleanVar()
         self.keep_videospringer_on_session_reset_var = tk.BooleanVar()
@@ -74,6 +80,8 @@ class SettingsDialog:
         self.qr_video_scan_scope_var = tk.StringVar(value="all")
         self.qr_video_parallel_enabled_var = tk.BooleanVar()
         self.qr_video_parallel_workers_var = tk.StringVar(value="2")
+        self.qr_early_scan_enabled_var = tk.BooleanVar(value=True)
+        self.qr_video_ranking_enabled_var = tk.BooleanVar(value=True)
         self.qr_photo_parallel_enabled_var = tk.BooleanVar()
         self.import_photo_parallel_enabled_var = tk.BooleanVar()
         self.clear_hw_cache_var = tk.BooleanVar(value=False)
@@ -977,6 +985,58 @@ class SettingsDialog:
         )
         self.reencode_matching_clips_hint_label.grid(row=16, column=0, sticky="w", padx=20, pady=(0, 5))
 
+        # --- Arbeitsspeicher für Bild-Caches ---
+        separator4 = ttk.Separator(advanced_frame, orient='horizontal')
+        separator4.grid(row=17, column=0, sticky="ew", pady=10)
+
+        cache_header = tk.Label(
+            advanced_frame,
+            text="Speicher für Vorschaubilder:",
+            font=("Arial", 10, "bold"),
+            anchor="w",
+        )
+        cache_header.grid(row=18, column=0, sticky="w", padx=5, pady=(0, 5))
+
+        cache_container = tk.Frame(advanced_frame)
+        cache_container.grid(row=19, column=0, sticky="w", padx=20, pady=2)
+
+        tk.Label(
+            cache_container,
+            text="Budget (MB):",
+            font=("Arial", 10),
+        ).pack(side="left")
+
+        self.image_cache_budget_spinbox = tk.Spinbox(
+            cache_container,
+            from_=MIN_IMAGE_CACHE_BUDGET_MB,
+            to=MAX_IMAGE_CACHE_BUDGET_MB,
+            increment=64,
+            width=6,
+            textvariable=self.image_cache_budget_mb_var,
+            font=("Arial", 10),
+        )
+        self.image_cache_budget_spinbox.pack(side="left", padx=(8, 0))
+
+        tk.Label(
+            cache_container,
+            text=f"({MIN_IMAGE_CACHE_BUDGET_MB}–{MAX_IMAGE_CACHE_BUDGET_MB}; "
+                 f"Standard: {DEFAULT_IMAGE_CACHE_BUDGET_MB})",
+            font=("Arial", 9),
+            fg="gray",
+        ).pack(side="left", padx=(10, 0))
+
+        tk.Label(
+            advanced_frame,
+            text="Gemeinsame Obergrenze für Thumbnails und dekodierte Fotos in Foto-Vorschau "
+                 "und SD-Dialog. Ältere Bilder werden bei Überschreitung verworfen und bei "
+                 "Bedarf neu geladen.",
+            font=("Arial", 9),
+            fg="gray",
+            wraplength=650,
+            justify="left",
+            anchor="w",
+        ).grid(row=20, column=0, sticky="w", padx=20, pady=(0, 5))
+
     def _update_encoding_strategy_state(self):
         """Aktiviert/deaktiviert Encoding-Strategie abhängig von Codec-Auswahl."""
         is_auto = self.codec_var.get() == "auto"
@@ -1269,14 +1329,48 @@ class SettingsDialog:
         self.qr_parallel_checkbox.grid(row=5, column=0, columnspan=2, sticky="w", padx=5, pady=(0, 4))
         tk.Label(
             video_qr_frame,
-            text="Clip 1 wird zuerst allein geprüft. Danach werden die übrigen Clips parallel "
-                 "durchsucht (nur bei „Alle Clips“).",
+            text="Clip 1 wird zuerst geprüft, danach die übrigen Clips parallel (nur bei "
+                 "„Alle Clips“). Bei wenigen Clips teilen sich die Worker Zeitfenster eines Clips.",
             font=("Arial", 9),
             fg="gray",
             justify="left",
             wraplength=580,
         ).grid(row=6, column=0, columnspan=2, sticky="w", padx=20, pady=(0, 4))
 
+        self.qr_early_scan_checkbox = tk.Checkbutton(
+            video_qr_frame,
+            text="QR-Suche schon während des Imports starten",
+            variable=self.qr_early_scan_enabled_var,
+            font=("Arial", 10, "bold"),
+        )
+        self.qr_early_scan_checkbox.grid(row=7, column=0, columnspan=2, sticky="w", padx=5, pady=(4, 4))
+        tk.Label(
+            video_qr_frame,
+            text="Der erste Clip wird geprüft, sobald er kopiert ist. Das Formular wird "
+                 "ausgefüllt, während die übrigen Dateien noch kopiert werden.",
+            font=("Arial", 9),
+            fg="gray",
+            justify="left",
+            wraplength=580,
+        ).grid(row=8, column=0, columnspan=2, sticky="w", padx=20, pady=(0, 4))
+
+        self.qr_video_ranking_checkbox = tk.Checkbutton(
+            video_qr_frame,
+            text="Wahrscheinlichsten QR-Clip zuerst prüfen",
+            variable=self.qr_video_ranking_enabled_var,
+            font=("Arial", 10, "bold"),
+        )
+        self.qr_video_ranking_checkbox.grid(row=9, column=0, columnspan=2, sticky="w", padx=5, pady=(4, 4))
+        tk.Label(
+            video_qr_frame,
+            text="Reihenfolge nach Aufnahmezeit, Dauer, Größe und Dateiname. Die Gewichtung "
+                 "lernt aus bisherigen Treffern auf diesem Rechner.",
+            font=("Arial", 9),
+            fg="gray",
+            justify="left",
+            wraplength=580,
+        ).grid(row=10, column=0, columnspan=2, sticky="w", padx=20, pady=(0, 4))
+
         photo_qr_frame = ttk.LabelFrame(
             qr_root_frame,
             text="Fotos",
@@ -1954,6 +2048,9 @@ class SettingsDialog:
         self.encoding_strategy_var.set(settings.get("encoding_strategy", "per_clip"))
         self.reencode_matching_clips_var.set(settings.get("reencode_matching_clips", False))
         self.preview_encode_crf_var.set(str(settings.get("preview_encode_crf", 18)))
+        self.image_cache_budget_mb_var.set(
+            str(settings.get("image_cache_budget_mb", DEFAULT_IMAGE_CACHE_BUDGET_MB))
+        )
         self._update_encoding_strategy_state()
 
         # Formular beim Session-Zurücksetzen
@@ -1969,6 +2066,8 @@ class SettingsDialog:
         self.qr_video_frame_step_var.set(str(settings.get("qr_video_frame_step", 10)))
         self.qr_video_parallel_enabled_var.set(settings.get("qr_video_parallel_enabled", False))
         self.qr_video_parallel_workers_var.set(str(settings.get("qr_video_parallel_workers", 2)))
+        self.qr_early_scan_enabled_var.set(settings.get("qr_early_scan_enabled", True))
+        self.qr_video_ranking_enabled_var.set(settings.get("qr_video_ranking_enabled", True))
         self.qr_photo_parallel_enabled_var.set(settings.get("qr_photo_parallel_enabled", False))
         self.import_photo_parallel_enabled_var.set(
             settings.get("import_photo_parallel_enabled", True)
@@ -2056,6 +2155,19 @@ class SettingsDialog:
             )
             return
 
+        try:
+            image_cache_budget_mb = int(self.image_cache_budget_mb_var.get().strip())
+            if not MIN_IMAGE_CACHE_BUDGET_MB <= image_cache_budget_mb <= MAX_IMAGE_CACHE_BUDGET_MB:
+                raise ValueError("außerhalb Bereich")
+        except ValueError:
+            messagebox.showwarning(
+                "Ungültige Eingabe",
+                f"Speicher für Vorschaubilder: ganze Zahl zwischen {MIN_IMAGE_CACHE_BUDGET_MB} "
+                f"und {MAX_IMAGE_CACHE_BUDGET_MB} MB.",
+                parent=self.dialog,
+            )
+            return
+
         keep_tandemmaster_on_session_reset = self.keep_tandemmaster_on_session_reset_var.get()
         keep_videospringer_on_session_reset = self.keep_videospringer_on_session_reset_var.get()
         oldschool_mode = bool(self.oldschool_mode_var.get())
@@ -2175,6 +2287,7 @@ class SettingsDialog:
             current_settings["encoding_strategy"] = encoding_strategy
             current_settings["reencode_matching_clips"] = reencode_matching_clips
             current_settings["preview_encode_crf"] = preview_encode_crf
+            current_settings["image_cache_budget_mb"] = image_cache_budget_mb
 
             # Formular beim Session-Zurücksetzen
             current_settings["keep_tandemmaster_on_session_reset"] = keep_tandemmaster_on_session_reset
@@ -2188,6 +2301,10 @@ class SettingsDialog:
             current_settings["qr_video_frame_step"] = qr_video_frame_step
             current_settings["qr_video_parallel_enabled"] = qr_video_parallel_enabled
             current_settings["qr_video_parallel_workers"] = qr_video_parallel_workers
+            current_settings["qr_early_scan_enabled"] = bool(self.qr_early_scan_enabled_var.get())
+            current_settings["qr_video_ranking_enabled"] = bool(
+                self.qr_video_ranking_enabled_var.get()
+            )
             current_settings["qr_photo_parallel_enabled"] = qr_photo_parallel_enabled
             current_settings["import_photo_parallel_enabled"] = import_photo_parallel_enabled
             current_settings["qr_remove_photo_after_scan"] = qr_remove_photo_after_scan
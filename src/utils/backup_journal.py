@@ -0,0 +1,169 @@
+"""
+Journal für fortsetzbare SD-Backups.
+
+Das Journal liegt als JSON-Lines-Datei im Backup-Ordner. Jede Zeile ist ein
+Ereignis (Kopf, fertige Datei, Teilkopie, Abschluss). Eine Datei wird erst
+eingetragen, nachdem ihre Kopie per fsync auf der Platte ist; fertige Dateien
+werden dafür gruppenweise gesichert und gemeinsam eingetragen. Geht eine
+Gruppe beim Absturz verloren, werden nur diese Dateien erneut kopiert. Eine abgeschnittene
+letzte Zeile wird ignoriert.
+Wird dieselbe Karte (Volume-Seriennummer + DCIM-Fingerprint) erneut
+eingesteckt, läuft das Backup im selben Ordner weiter und kopiert nur die
+fehlenden Dateien; eine abgebrochene Datei wird ab dem gesicherten Offset
+fortgesetzt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+JOURNAL_FILENAME = ".aerotandem_backup_journal.jsonl"
+JOURNAL_VERSION = 1
+BACKUP_DIR_PREFIX = "SD_Backup_"
+
+
+def relative_card_path(path: str, dcim_source: str) -> str:
+    """Pfad relativ zum DCIM-Ordner (Laufwerksbuchstabe/Mountpfad kann wechseln)."""
+    return os.path.relpath(path, dcim_source).replace(os.sep, "/")
+
+
+def compute_card_fingerprint(dcim_source: str, media_extensions: Iterable[str]) -> str:
+    """Fingerprint des Karteninhalts aus Dateinamen und -größen (nur Metadaten, kein Lesen)."""
+    media_extensions = frozenset(media_extensions)
+    entries = []
+    for root, dirs, files in os.walk(dcim_source):
+        for name in files:
+            if os.path.splitext(name.lower())[1] not in media_extensions:
+                continue
+            path = os.path.join(root, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            entries.append(f"{relative_card_path(path, dcim_source)}\0{size}")
+    digest = hashlib.blake2b(digest_size=16)
+    for entry in sorted(entries):
+        digest.update(entry.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class BackupJournal:
+    """Fortschritt eines SD-Backups; Schlüssel sind Pfade relativ zum DCIM-Ordner."""
+
+    def __init__(self, backup_path: str, header: dict):
+        self.backup_path = backup_path
+        self.header = header
+        # Relativer Quellpfad -> Manifest-Eintrag (dest, Größe, Hashes, ...)
+        self.completed: Dict[str, dict] = {}
+        # Relativer Quellpfad -> (Zieldateiname, gesicherte Bytes)
+        self.partials: Dict[str, Tuple[str, int]] = {}
+        self.finished = False
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.backup_path, JOURNAL_FILENAME)
+
+    @classmethod
+    def create(cls, backup_path: str, card_serial: Optional[str],
+               card_fingerprint: str) -> "BackupJournal":
+        header = {
+            "op": "header",
+            "version": JOURNAL_VERSION,
+            "card_serial": card_serial,
+            "card_fingerprint": card_fingerprint,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        journal = cls(backup_path, header)
+        journal._append(header, mode="w")
+        return journal
+
+    @classmethod
+    def load(cls, backup_path: str) -> Optional["BackupJournal"]:
+        path = os.path.join(backup_path, JOURNAL_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                content = handle.read()
+            if content and not content.endswith("\n"):
+                # Abgeschnittene Zeile abschließen, damit weitere Einträge nicht an ihr hängen
+                with open(path, "a", encoding="utf-8") as handle:
+                    handle.write("\n")
+        except (OSError, UnicodeDecodeError):
+            return None
+        events = []
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Abgeschnittene letzte Zeile nach Absturz
+                continue
+        if not events or events[0].get("op") != "header" or events[0].get("version") != JOURNAL_VERSION:
+            return None
+        journal = cls(backup_path, events[0])
+        for event in events[1:]:
+            op = event.get("op")
+            rel = event.get("src_rel")
+            if op == "done" and rel:
+                journal.completed[rel] = event.get("entry") or {}
+                journal.partials.pop(rel, None)
+            elif op == "partial" and rel:
+                journal.partials[rel] = (event.get("dest"), int(event.get("offset") or 0))
+            elif op == "complete":
+                journal.finished = True
+        return journal
+
+    @classmethod
+    def find_resumable(cls, backup_folder: str, card_serial: Optional[str],
+                       card_fingerprint: str) -> Optional["BackupJournal"]:
+        """Jüngstes unvollständiges Backup derselben Karte im Backup-Ordner."""
+        try:
+            names = sorted(
+                (name for name in os.listdir(backup_folder) if name.startswith(BACKUP_DIR_PREFIX)),
+                reverse=True,
+            )
+        except OSError:
+            return None
+        for name in names:
+            backup_path = os.path.join(backup_folder, name)
+            if not os.path.isfile(os.path.join(backup_path, JOURNAL_FILENAME)):
+                continue
+            journal = cls.load(backup_path)
+            if journal and not journal.finished and journal.matches(card_serial, card_fingerprint):
+                return journal
+        return None
+
+    def matches(self, card_serial: Optional[str], card_fingerprint: str) -> bool:
+        return (self.header.get("card_serial") == card_serial
+                and self.header.get("card_fingerprint") == card_fingerprint)
+
+    def record_completed(self, src_rel: str, entry: dict) -> None:
+        """Datei vollständig gesichert (Zieldatei muss bereits per fsync geschrieben sein)."""
+        self.record_completed_many([(src_rel, entry)])
+
+    def record_completed_many(self, entries: List[Tuple[str, dict]]) -> None:
+        """Mehrere fertige Dateien mit einem Schreibzugriff eintragen."""
+        if not entries:
+            return
+        for src_rel, entry in entries:
+            self.completed[src_rel] = entry
+            self.partials.pop(src_rel, None)
+        self._append(*({"op": "done", "src_rel": src_rel, "entry": entry} for src_rel, entry in entries))
+
+    def record_partial(self, src_rel: str, dest: str, offset: int) -> None:
+        """Abgebrochene Kopie: die ersten offset Bytes von dest sind gesichert."""
+        self.partials[src_rel] = (dest, offset)
+        self._append({"op": "partial", "src_rel": src_rel, "dest": dest, "offset": offset})
+
+    def mark_complete(self) -> None:
+        self.finished = True
+        self._append({"op": "complete", "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+    def _append(self, *events: dict, mode: str = "a") -> None:
+        with open(self.path, mode, encoding="utf-8") as handle:
+            handle.write("".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events))
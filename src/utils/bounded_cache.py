@@ -0,0 +1,258 @@
+"""
+Speicherbegrenzte Bild-Caches (LRU nach Bytes).
+
+Alle Caches für dekodierte Bilder (PIL.Image, ImageTk.PhotoImage) teilen sich
+ein gemeinsames Budget aus den Einstellungen. Jeder Cache erhält einen festen
+Anteil davon; die Größe eines Eintrags wird als Breite × Höhe × Kanäle
+geschätzt. Über dem Budget werden die am längsten ungenutzten Einträge
+verdrängt.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+DEFAULT_IMAGE_CACHE_BUDGET_MB = 512
+MIN_IMAGE_CACHE_BUDGET_MB = 64
+MAX_IMAGE_CACHE_BUDGET_MB = 8192
+
+# Anteile der einzelnen Caches am Gesamtbudget (Summe 1.0)
+SHARE_PREVIEW_THUMB_PHOTOIMAGES = 0.10
+SHARE_PREVIEW_THUMB_PIL = 0.15
+SHARE_PREVIEW_LARGE_PHOTOIMAGES = 0.05
+SHARE_PREVIEW_PANEL = 0.10
+SHARE_PREVIEW_SCREEN = 0.20
+SHARE_SD_THUMB_PHOTOIMAGES = 0.10
+SHARE_SD_THUMB_PIL = 0.20
+SHARE_IMPORT_THUMB_PIL = 0.10
+
+# Tk speichert PhotoImages intern mit 4 Byte pro Pixel
+_PHOTOIMAGE_BYTES_PER_PIXEL = 4
+
+_budget_lock = threading.Lock()
+_total_budget_bytes = DEFAULT_IMAGE_CACHE_BUDGET_MB * 1024 * 1024
+_live_caches: "weakref.WeakSet[ByteBudgetCache]" = weakref.WeakSet()
+
+
+def image_nbytes(obj: Any) -> int:
+    """Geschätzter Speicherbedarf eines Bildes (Breite × Höhe × Kanäle)."""
+    if obj is None:
+        return 0
+    size = getattr(obj, "size", None)
+    bands = getattr(obj, "getbands", None)
+    if isinstance(size, tuple) and len(size) == 2 and callable(bands):
+        return int(size[0]) * int(size[1]) * len(bands())
+    width = getattr(obj, "width", None)
+    height = getattr(obj, "height", None)
+    if callable(width) and callable(height):
+        try:
+            return int(width()) * int(height()) * _PHOTOIMAGE_BYTES_PER_PIXEL
+        except Exception:
+            return 0
+    return sys.getsizeof(obj)
+
+
+@dataclass
+class CacheStats:
+    name: str
+    entries: int
+    bytes_used: int
+    budget_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ByteBudgetCache:
+    """
+    LRU-Cache mit Byte-Budget; thread-safe, dict-ähnliche Schnittstelle.
+
+    Ist share gesetzt, folgt das Budget dem globalen Bild-Cache-Budget
+    (set_image_cache_budget_mb), sonst gilt budget_bytes fest.
+    """
+
+    def __init__(self, name: str, *, share: Optional[float] = None,
+                 budget_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = image_nbytes):
+        if share is None and budget_bytes is None:
+            raise ValueError("share oder budget_bytes erforderlich")
+        self.name = name
+        self._share = share
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes_used = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+        if share is not None:
+            self._budget_bytes = int(image_cache_budget_bytes() * share)
+            _live_caches.add(self)
+        else:
+            self._budget_bytes = max(0, int(budget_bytes))
+
+    # ---------------- Budget -----------------
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._budget_bytes
+
+    def set_budget(self, budget_bytes: int) -> None:
+        with self._lock:
+            self._budget_bytes = max(0, int(budget_bytes))
+            self._evict_locked()
+
+    def _apply_total_budget(self, total_bytes: int) -> None:
+        if self._share is not None:
+            self.set_budget(int(total_bytes * self._share))
+
+    # ---------------- Zugriff -----------------
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+            return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Wie get, ohne LRU-Reihenfolge und Statistik zu ändern."""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        nbytes = max(0, int(self._sizeof(value)))
+        with self._lock:
+            if key in self._entries:
+                self._bytes_used -= self._sizes.pop(key)
+                del self._entries[key]
+            if nbytes > self._budget_bytes:
+                # Größer als das ganze Budget: nicht aufnehmen
+                return
+            self._entries[key] = value
+            self._sizes[key] = nbytes
+            self._bytes_used += nbytes
+            self._evict_locked()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._bytes_used -= self._sizes.pop(key)
+            return self._entries.pop(key)
+
+    def update(self, items) -> None:
+        if hasattr(items, "items"):
+            items = items.items()
+        for key, value in items:
+            self.put(key, value)
+
+    def keys(self) -> List[Hashable]:
+        """Momentaufnahme der Schlüssel (älteste zuerst)."""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def items(self) -> List[tuple]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def retain(self, keep: Callable[[Hashable], bool]) -> None:
+        """Entfernt alle Einträge, für deren Schlüssel keep(key) False ist."""
+        with self._lock:
+            for key in [k for k in self._entries if not keep(k)]:
+                self._bytes_used -= self._sizes.pop(key)
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes_used = 0
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                raise KeyError(key)
+            return self.get(key)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.put(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        with self._lock:
+            if key not in self._entries:
+                raise KeyError(key)
+            self.pop(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.keys())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    # ---------------- Verdrängung/Statistik -----------------
+
+    def _evict_locked(self) -> None:
+        while self._bytes_used > self._budget_bytes and self._entries:
+            key, _ = self._entries.popitem(last=False)
+            self._bytes_used -= self._sizes.pop(key)
+            self._evictions += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                name=self.name,
+                entries=len(self._entries),
+                bytes_used=self._bytes_used,
+                budget_bytes=self._budget_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+def image_cache_budget_bytes() -> int:
+    with _budget_lock:
+        return _total_budget_bytes
+
+
+def set_image_cache_budget_mb(budget_mb) -> None:
+    """Setzt das Gesamtbudget aller Bild-Caches und passt bestehende Caches an."""
+    global _total_budget_bytes
+    try:
+        budget_mb = int(budget_mb)
+    except (TypeError, ValueError):
+        budget_mb = DEFAULT_IMAGE_CACHE_BUDGET_MB
+    budget_mb = max(MIN_IMAGE_CACHE_BUDGET_MB, min(MAX_IMAGE_CACHE_BUDGET_MB, budget_mb))
+    with _budget_lock:
+        _total_budget_bytes = budget_mb * 1024 * 1024
+        total = _total_budget_bytes
+    for cache in list(_live_caches):
+        cache._apply_total_budget(total)
+
+
+def image_cache_stats() -> List[CacheStats]:
+    """Statistik aller lebenden Caches mit Anteil am Gesamtbudget."""
+    return sorted((cache.stats() for cache in list(_live_caches)), key=lambda s: s.name)
@@ -49,6 +49,14 @@ class ConfigManager:
                         settings["qr_video_parallel_workers"] = 2
                     if "qr_video_scan_all_clips" not in settings:
                         settings["qr_video_scan_all_clips"] = True
+                    if "qr_early_scan_enabled" not in settings:
+                        settings["qr_early_scan_enabled"] = True
+                    if "qr_early_scan_prefix_mb" not in settings:
+                        settings["qr_early_scan_prefix_mb"] = 64
+                    if "qr_video_ranking_enabled" not in settings:
+                        settings["qr_video_ranking_enabled"] = True
+                    if "image_cache_budget_mb" not in settings:
+                        settings["image_cache_budget_mb"] = 512
                     if "qr_photo_parallel_enabled" not in settings:
                         settings["qr_photo_parallel_enabled"] = False
                     if "import_photo_parallel_enabled" not in settings:
@@ -100,8 +108,12 @@ class ConfigManager:
             "qr_video_frame_step": 10,  # Nur jeden N-ten Frame scannen (~3/s bei 30 fps)
             "qr_video_parallel_enabled": False,  # Hybrid: Clip 1 solo, Rest parallel
             "qr_video_parallel_workers": 2,  # Parallele Worker für QR (Video & Foto)
+            "qr_early_scan_enabled": True,  # QR-Suche im ersten Clip schon während des Imports
+            "qr_early_scan_prefix_mb": 64,  # Ab so vielen kopierten MB (faststart-MP4) scannen
+            "qr_video_ranking_enabled": True,  # Clips nach QR-Wahrscheinlichkeit sortiert prüfen
             "qr_photo_parallel_enabled": False,  # Parallel bidirektional über alle Fotos
             "import_photo_parallel_enabled": True,  # Parallele Thumbnail-Erzeugung beim Import
+            "image_cache_budget_mb": 512,  # Arbeitsspeicher für Vorschau-/Thumbnail-Caches (MB)
             "qr_video_scan_all_clips": True,  # False = nur erster Clip, True = alle bis Treffer
             "qr_remove_photo_after_scan": False,
             "qr_remove_video_after_scan": False,
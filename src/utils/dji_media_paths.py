@@ -8,6 +8,7 @@ from typing import Optional
 
 from src.utils.file_times import get_creation_timestamp
 from src.utils.media_datetime import get_pil_exif_capture_datetime
+from src.utils.media_history import IDENTITY_VERSION
 
 _TIMELAPSE_DIR_NAMES = frozenset({"timelapse"})
 _DJI_DIR_RE = re.compile(r"^dji_", re.IGNORECASE)
@@ -275,6 +276,39 @@ def resolve_manifest_source_path(file_path: str, manifest: Optional[dict]) -> st
     return src or file_path
 
 
+def manifest_identity_by_dest(manifest: Optional[dict]) -> dict[str, tuple[str, int]]:
+    """Beim Backup berechnete Identitäten (identity_hash, Größe) je Backup-Dateiname."""
+    if not manifest:
+        return {}
+    identities = {}
+    for entry in manifest.get("files", []):
+        if entry.get("identity_version") != IDENTITY_VERSION:
+            # Ältere Identitäten passen nicht zum aktuellen Fingerprint
+            continue
+        dest = entry.get("dest")
+        identity_hash = entry.get("identity_hash")
+        size_bytes = entry.get("size_bytes")
+        if dest and identity_hash and isinstance(size_bytes, int):
+            identities[dest.lower()] = (identity_hash, size_bytes)
+    return identities
+
+
+def resolve_manifest_identity(
+    file_path: str,
+    identities: dict[str, tuple[str, int]],
+) -> Optional[tuple[str, int]]:
+    """Identität aus dem Manifest, sofern die Backup-Datei noch dieselbe Größe hat."""
+    known = identities.get(os.path.basename(file_path).lower())
+    if known is None:
+        return None
+    try:
+        if os.path.getsize(file_path) != known[1]:
+            return None
+    except OSError:
+        return None
+    return known
+
+
 def manifest_entry_for_dest(manifest: dict, dest_name: str) -> Optional[dict]:
     """Findet den Manifest-Eintrag zu einem Backup-Dateinamen."""
     key = (dest_name or "").lower()
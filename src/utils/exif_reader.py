@@ -0,0 +1,274 @@
+"""
+Minimaler TIFF/EXIF-Leser.
+
+Liest IFD-Einträge direkt aus den Roh-Bytes (z. B. PIL img.info["exif"]),
+ohne das Bild selbst zu dekodieren. Für Aufnahmezeiten wird bei JPEGs nur
+das APP1-Segment am Dateianfang gelesen (TIFF-basierte RAWs: der Kopf).
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+_EXIF_HEADER = b"Exif\x00\x00"
+
+# TIFF-Feldtypen -> Bytes pro Wert
+_TIFF_TYPE_SIZES = {
+    1: 1,   # BYTE
+    2: 1,   # ASCII
+    3: 2,   # SHORT
+    4: 4,   # LONG
+    5: 8,   # RATIONAL
+    7: 1,   # UNDEFINED
+    9: 4,   # SLONG
+    10: 8,  # SRATIONAL
+    13: 4,  # IFD (Offset, z. B. SubIFDs)
+}
+
+_MAX_IFD_ENTRIES = 1024
+
+# IFD1: eingebettetes JPEG-Thumbnail
+TAG_JPEG_INTERCHANGE_FORMAT = 0x0201
+TAG_JPEG_INTERCHANGE_FORMAT_LENGTH = 0x0202
+
+# Aufnahmezeit: DateTime (IFD0), Exif-IFD mit DateTimeOriginal + SubSec
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_SUBSEC_TIME = 0x9290
+TAG_SUBSEC_TIME_ORIGINAL = 0x9291
+
+# APP1 liegt spätestens nach APP0/JFIF am Dateianfang; weiter wird nicht gesucht
+EXIF_SCAN_BYTES = 64 * 1024
+_JPEG_SOI = b"\xff\xd8"
+_JPEG_APP1 = 0xE1
+_JPEG_SOS = 0xDA
+
+# (Typ, Anzahl, 4 Bytes Wert/Offset)
+IfdEntry = Tuple[int, int, bytes]
+
+
+def strip_exif_header(exif_raw: bytes) -> bytes:
+    """Entfernt das 'Exif\\0\\0'-Präfix des APP1-Segments, falls vorhanden."""
+    if exif_raw.startswith(_EXIF_HEADER):
+        return exif_raw[len(_EXIF_HEADER):]
+    return exif_raw
+
+
+def tiff_byte_order(tiff: bytes) -> Optional[str]:
+    """'<' (Intel) oder '>' (Motorola), None bei ungültigem TIFF-Header."""
+    if len(tiff) < 8:
+        return None
+    if tiff[:4] == b"II*\x00":
+        return "<"
+    if tiff[:4] == b"MM\x00*":
+        return ">"
+    return None
+
+
+def read_ifd(tiff: bytes, offset: int, endian: str) -> Tuple[Dict[int, IfdEntry], int]:
+    """
+    Liest ein IFD ab offset.
+
+    Returns:
+        (Tag -> (Typ, Anzahl, Roh-Wert), Offset des nächsten IFD oder 0)
+    """
+    entries: Dict[int, IfdEntry] = {}
+    if offset <= 0 or offset + 2 > len(tiff):
+        return entries, 0
+    count = struct.unpack_from(endian + "H", tiff, offset)[0]
+    if count > _MAX_IFD_ENTRIES:
+        return entries, 0
+    pos = offset + 2
+    for _ in range(count):
+        if pos + 12 > len(tiff):
+            return entries, 0
+        tag, field_type, value_count = struct.unpack_from(endian + "HHI", tiff, pos)
+        entries[tag] = (field_type, value_count, tiff[pos + 8:pos + 12])
+        pos += 12
+    next_offset = 0
+    if pos + 4 <= len(tiff):
+        next_offset = struct.unpack_from(endian + "I", tiff, pos)[0]
+    return entries, next_offset
+
+
+def ifd_values(tiff: bytes, endian: str, entry: IfdEntry) -> List[int]:
+    """Ganzzahl-Werte eines BYTE/SHORT/LONG/IFD-Eintrags (inline oder per Offset)."""
+    field_type, value_count, raw = entry
+    fmt = {1: "B", 3: "H", 4: "I", 9: "i", 13: "I"}.get(field_type)
+    if fmt is None or value_count <= 0:
+        return []
+    size = _TIFF_TYPE_SIZES[field_type] * value_count
+    if size <= 4:
+        data = raw[:size]
+    else:
+        start = struct.unpack(endian + "I", raw)[0]
+        if start + size > len(tiff):
+            return []
+        data = tiff[start:start + size]
+    return list(struct.unpack(endian + fmt * value_count, data))
+
+
+def ifd_int(tiff: bytes, endian: str, entries: Dict[int, IfdEntry], tag: int) -> Optional[int]:
+    entry = entries.get(tag)
+    if entry is None:
+        return None
+    values = ifd_values(tiff, endian, entry)
+    return values[0] if values else None
+
+
+def ifd_ascii(tiff: bytes, endian: str, entries: Dict[int, IfdEntry], tag: int) -> Optional[str]:
+    """ASCII-Eintrag als String (ohne abschließendes NUL)."""
+    entry = entries.get(tag)
+    if entry is None or entry[0] != 2:
+        return None
+    _, value_count, raw = entry
+    if value_count <= 4:
+        data = raw[:value_count]
+    else:
+        start = struct.unpack(endian + "I", raw)[0]
+        if start + value_count > len(tiff):
+            return None
+        data = tiff[start:start + value_count]
+    text = data.split(b"\x00", 1)[0].decode("ascii", errors="ignore").strip()
+    return text or None
+
+
+def exif_thumbnail_bytes(exif_raw: Optional[bytes]) -> Optional[bytes]:
+    """
+    Liefert das in IFD1 eingebettete JPEG-Thumbnail aus EXIF-Roh-Bytes.
+    None, wenn kein (gültiges) Thumbnail vorhanden ist.
+    """
+    if not exif_raw:
+        return None
+    tiff = strip_exif_header(exif_raw)
+    endian = tiff_byte_order(tiff)
+    if endian is None:
+        return None
+    ifd0_offset = struct.unpack_from(endian + "I", tiff, 4)[0]
+    _, ifd1_offset = read_ifd(tiff, ifd0_offset, endian)
+    if not ifd1_offset:
+        return None
+    ifd1, _ = read_ifd(tiff, ifd1_offset, endian)
+    start = ifd_int(tiff, endian, ifd1, TAG_JPEG_INTERCHANGE_FORMAT)
+    length = ifd_int(tiff, endian, ifd1, TAG_JPEG_INTERCHANGE_FORMAT_LENGTH)
+    if not start or not length or start + length > len(tiff):
+        return None
+    data = tiff[start:start + length]
+    if not data.startswith(b"\xff\xd8"):
+        return None
+    return data
+
+
+# ---------------- Aufnahmezeit direkt aus der Datei -----------------
+
+def read_exif_tiff_block(path: str, scan_bytes: int = EXIF_SCAN_BYTES) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    TIFF-Block mit den EXIF-Daten einer Datei, ohne das Bild zu öffnen.
+
+    JPEG: Inhalt des APP1-Exif-Segments (Marker-Kette ab SOI, nur bis scan_bytes).
+    TIFF-basierte RAWs: die ersten scan_bytes der Datei.
+    Returns:
+        ("jpeg" | "tiff", TIFF-Bytes); b"" nur, wenn ein JPEG bis zum Bilddaten-
+        Beginn (SOS) kein EXIF enthält.
+        (None, None) für nicht unterstützte Formate, Lesefehler, ungültige
+        Marker oder wenn SOS innerhalb von scan_bytes nicht erreicht wurde.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(4)
+            if head[:2] != _JPEG_SOI:
+                if tiff_byte_order(head + b"\x00" * 4) is None:
+                    return None, None
+                return "tiff", head + f.read(scan_bytes - len(head))
+
+            pos = 2
+            while pos < scan_bytes:
+                f.seek(pos)
+                marker = f.read(4)
+                if len(marker) < 4 or marker[0] != 0xFF:
+                    # Kaputte Marker-Kette: hier nicht entscheidbar, PIL versucht es
+                    return None, None
+                marker_type = marker[1]
+                if marker_type == 0xFF:
+                    # Füllbyte
+                    pos += 1
+                    continue
+                if marker_type == _JPEG_SOS or 0xD0 <= marker_type <= 0xD9:
+                    return "jpeg", b""
+                segment_length = struct.unpack(">H", marker[2:])[0]
+                if marker_type == _JPEG_APP1:
+                    payload = f.read(segment_length - 2)
+                    if payload.startswith(_EXIF_HEADER):
+                        return "jpeg", payload[len(_EXIF_HEADER):]
+                pos += 2 + segment_length
+    except (OSError, struct.error):
+        return None, None
+    # scan_bytes erreicht, ohne auf APP1 oder SOS zu stoßen (z. B. große APP-Segmente)
+    return None, None
+
+
+def _normalize_subsec_to_ms(subsec: Optional[str]) -> str:
+    """EXIF SubSecTime(Original) als 3-stellige Millisekunden."""
+    if not subsec:
+        return "000"
+    digits = re.sub(r"\D", "", subsec)[:3]
+    return digits.ljust(3, "0") if digits else "000"
+
+
+def exif_capture_datetime(tiff: bytes) -> Tuple[Optional[datetime], str]:
+    """
+    DateTimeOriginal (+ SubSecTimeOriginal) aus einem TIFF-Block, sonst
+    DateTime (+ SubSecTime) aus IFD0.
+    Returns: (datetime ohne Bruchteil oder None, Millisekunden als 3-stelliger String)
+    """
+    endian = tiff_byte_order(tiff)
+    if endian is None:
+        return None, "000"
+    try:
+        ifd0_offset = struct.unpack_from(endian + "I", tiff, 4)[0]
+        ifd0, _ = read_ifd(tiff, ifd0_offset, endian)
+        exif_ifd: Dict[int, IfdEntry] = {}
+        exif_offset = ifd_int(tiff, endian, ifd0, TAG_EXIF_IFD)
+        if exif_offset:
+            exif_ifd, _ = read_ifd(tiff, exif_offset, endian)
+
+        raw_dt = ifd_ascii(tiff, endian, exif_ifd, TAG_DATETIME_ORIGINAL)
+        raw_subsec = ifd_ascii(tiff, endian, exif_ifd, TAG_SUBSEC_TIME_ORIGINAL)
+        if not raw_dt:
+            raw_dt = ifd_ascii(tiff, endian, ifd0, TAG_DATETIME)
+            raw_subsec = (
+                ifd_ascii(tiff, endian, exif_ifd, TAG_SUBSEC_TIME)
+                or ifd_ascii(tiff, endian, ifd0, TAG_SUBSEC_TIME)
+            )
+    except struct.error:
+        return None, "000"
+
+    if not raw_dt or len(raw_dt) < 19:
+        return None, "000"
+    try:
+        dt = datetime.strptime(raw_dt[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None, "000"
+    return dt, _normalize_subsec_to_ms(raw_subsec)
+
+
+def read_capture_datetime(path: str) -> Optional[Tuple[Optional[datetime], str]]:
+    """
+    Aufnahmezeit aus den ersten ~64 KB der Datei.
+    Returns: (datetime oder None, ms) oder None, wenn das Format hier nicht
+    lesbar ist (Aufrufer greift dann auf PIL zurück).
+    """
+    kind, tiff = read_exif_tiff_block(path)
+    if kind is None:
+        return None
+    if not tiff:
+        return None, "000"
+    result = exif_capture_datetime(tiff)
+    if result[0] is None and kind == "tiff":
+        # Werte können hinter dem gelesenen Kopf liegen: PIL entscheidet
+        return None
+    return result
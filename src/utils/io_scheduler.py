@@ -0,0 +1,101 @@
+"""
+Globale Schreib-Drosselung je Ziellaufwerk.
+
+Mehrere SD-Karten werden parallel gesichert, schreiben aber meist auf dieselbe
+Backup-Platte. Jede Datei belegt beim Kopieren einen Platz auf jedem ihrer
+Ziellaufwerke; je Laufwerk laufen höchstens WRITES_PER_DEVICE Kopien
+gleichzeitig. Wartende kommen der Reihe nach dran, damit keine Karte
+ausgehungert wird.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Zwei Ströme halten eine Platte ausgelastet, ohne dass sie nur noch Köpfe positioniert
+WRITES_PER_DEVICE = 2
+
+
+class _FairSlots:
+    """Zählende Sperre mit FIFO-Reihenfolge (threading.Semaphore ist nicht fair)."""
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters: "deque[threading.Event]" = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        waiter.wait()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # Platz direkt an den nächsten Wartenden übergeben
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
+
+
+class DestinationIOScheduler:
+    """Vergibt Schreibplätze je Ziellaufwerk (prozessweit ein Exemplar)."""
+
+    _instance: Optional["DestinationIOScheduler"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, writes_per_device: int = WRITES_PER_DEVICE):
+        self.writes_per_device = max(1, writes_per_device)
+        self._slots: Dict[str, _FairSlots] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> "DestinationIOScheduler":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def device_key(path: str) -> str:
+        """Laufwerk eines Zielpfads (st_dev des nächsten existierenden Ordners)."""
+        probe = os.path.abspath(path)
+        while True:
+            try:
+                return f"dev:{os.stat(probe).st_dev}"
+            except OSError:
+                parent = os.path.dirname(probe)
+                if parent == probe:
+                    return os.path.normcase(os.path.abspath(path))
+                probe = parent
+
+    def _slots_for(self, key: str) -> _FairSlots:
+        with self._lock:
+            slots = self._slots.get(key)
+            if slots is None:
+                slots = self._slots[key] = _FairSlots(self.writes_per_device)
+            return slots
+
+    @contextmanager
+    def reserve(self, *paths: Optional[str]):
+        """Belegt je Ziellaufwerk der paths einen Schreibplatz für die Dauer des Blocks."""
+        # Feste Reihenfolge, damit sich zwei Kopien mit mehreren Zielen nicht verklemmen
+        keys = sorted({self.device_key(path) for path in paths if path})
+        acquired = []
+        try:
+            for key in keys:
+                slots = self._slots_for(key)
+                slots.acquire()
+                acquired.append(slots)
+            yield
+        finally:
+            for slots in reversed(acquired):
+                slots.release()
@@ -12,10 +12,12 @@ import os
 import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
 
 from src.utils.constants import SUBPROCESS_CREATE_NO_WINDOW
+from src.utils.exif_reader import read_capture_datetime
 from src.utils.file_times import get_creation_timestamp
 
 # EXIF: DateTimeOriginal, DateTime, SubSecTimeOriginal
@@ -23,6 +25,8 @@ _EXIF_DATETIME_ORIGINAL = 36867
 _EXIF_DATETIME = 306
 _EXIF_SUBSEC_TIME_ORIGINAL = 37521
 _EXIF_SUBSEC_TIME = 37520
+# Parallele Leser für get_photo_display_epochs (I/O-gebunden)
+_EPOCH_BATCH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
 
 
 def _parse_tag_to_epoch(tag_val: str) -> Optional[float]:
@@ -123,8 +127,12 @@ def _normalize_exif_subsec_to_ms(subsec: Optional[str]) -> str:
 def get_pil_exif_capture_datetime(path: str) -> Tuple[Optional[datetime], str]:
     """
     Liest EXIF DateTimeOriginal (+ SubSecTimeOriginal) für Dateinamen.
+    JPEG/TIFF über das APP1-Segment bzw. den Dateikopf, andere Formate per PIL.
     Returns: (datetime ohne Bruchteil, Millisekunden als 3-stelliger String)
     """
+    fast = read_capture_datetime(path)
+    if fast is not None:
+        return fast
     try:
         from PIL import Image
 
@@ -163,27 +171,23 @@ def get_pil_exif_epoch(path: str) -> Optional[float]:
         return float(dt.timestamp())
 
 
-def resolve_video_display_epoch(
-    copy_path: str,
-    source_import_epoch: Optional[float] = None,
-    alternate_original_path: Optional[str] = None,
-) -> float:
-    """
-    Reihenfolge (Prio 1 = eingebettete „Aufnahme“-Zeit):
-    1. EXIF im File (PIL), falls vorhanden
-    2. Container-/Stream-Tags (ffprobe: creation_time u. ä.)
-    3. Snapshot vom Import (Dateizeit der Quelle beim Kopieren)
-    4. Dateizeit eines noch lesbaren Originalpfads (von außerhalb des Working-Folders)
-    5. Dateisystem der Kopie
-    """
-    ts = get_pil_exif_epoch(copy_path)
+def get_embedded_capture_epoch(path: str) -> Optional[float]:
+    """Eingebettete Aufnahmezeit: EXIF (PIL), sonst Container-Tags (ffprobe)."""
+    ts = get_pil_exif_epoch(path)
     if ts is not None:
         return float(ts)
-
-    ts = get_ffprobe_format_creation_epoch(copy_path)
+    ts = get_ffprobe_format_creation_epoch(path)
     if ts is not None:
         return float(ts)
+    return None
 
+
+def resolve_fallback_display_epoch(
+    copy_path: str,
+    source_import_epoch: Optional[float] = None,
+    alternate_original_path: Optional[str] = None,
+) -> float:
+    """Anzeigezeit ohne eingebettete Zeit (Schritte 3–5 von resolve_video_display_epoch)."""
     if source_import_epoch is not None:
         return float(source_import_epoch)
 
@@ -200,6 +204,25 @@ def resolve_video_display_epoch(
     return float(ts) if ts is not None else 0.0
 
 
+def resolve_video_display_epoch(
+    copy_path: str,
+    source_import_epoch: Optional[float] = None,
+    alternate_original_path: Optional[str] = None,
+) -> float:
+    """
+    Reihenfolge (Prio 1 = eingebettete „Aufnahme“-Zeit):
+    1. EXIF im File (PIL), falls vorhanden
+    2. Container-/Stream-Tags (ffprobe: creation_time u. ä.)
+    3. Snapshot vom Import (Dateizeit der Quelle beim Kopieren)
+    4. Dateizeit eines noch lesbaren Originalpfads (von außerhalb des Working-Folders)
+    5. Dateisystem der Kopie
+    """
+    ts = get_embedded_capture_epoch(copy_path)
+    if ts is not None:
+        return ts
+    return resolve_fallback_display_epoch(copy_path, source_import_epoch, alternate_original_path)
+
+
 def get_photo_display_epoch(
     photo_path: str,
     source_import_epoch: Optional[float] = None,
@@ -212,6 +235,30 @@ def get_photo_display_epoch(
     return resolve_video_display_epoch(photo_path, source_import_epoch, None)
 
 
+def get_photo_display_epochs(
+    photo_paths: Iterable[str],
+    source_import_epochs: Optional[Mapping[str, Optional[float]]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    get_photo_display_epoch für viele Fotos parallel.
+    source_import_epochs: Pfad -> Import-Snapshot (Schlüssel wie photo_paths).
+    """
+    paths = list(dict.fromkeys(photo_paths))
+    if not paths:
+        return {}
+    snaps = source_import_epochs or {}
+    workers = max(1, min(workers or _EPOCH_BATCH_WORKERS, len(paths)))
+
+    def resolve(path: str) -> Tuple[str, float]:
+        return path, get_photo_display_epoch(path, snaps.get(path))
+
+    if workers == 1:
+        return dict(resolve(p) for p in paths)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="capture-epoch") as pool:
+        return dict(pool.map(resolve, paths))
+
+
 def format_epoch_date(epoch: float) -> str:
     return time.strftime("%d.%m.%Y", time.localtime(epoch))
 
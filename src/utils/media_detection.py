@@ -0,0 +1,205 @@
+"""
+Ereignisquellen für das Erkennen neuer Wechseldatenträger.
+
+Statt alle zwei Sekunden alle Laufwerke abzufragen, wartet der SD-Karten-
+Monitor auf ein Änderungssignal. Die Quellen melden nur, dass sich etwas
+geändert hat; welches Laufwerk neu ist, ermittelt der Monitor selbst.
+
+- Linux: udev/netlink über pyudev, sonst Änderungen der Mount-Tabelle
+  (/proc/self/mounts ist per poll() beobachtbar)
+- Windows: Laufwerksbuchstaben und Medium-Status der Wechsellaufwerke
+  (Kartenleser behalten ihren Buchstaben auch ohne Karte)
+- macOS: Änderungszeit von /Volumes
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import string
+import sys
+import threading
+from typing import Callable, Optional
+
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
+try:
+    import win32api
+    import win32con
+    import win32file
+except ImportError:
+    win32api = None
+
+_MOUNT_TABLE = "/proc/self/mounts"
+SIGNATURE_POLL_SEC = 1.0
+
+
+class DriveChangeSource:
+    """Basis: ruft on_change (aus einem eigenen Thread) bei Laufwerksänderungen auf."""
+
+    name = "none"
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        """Startet die Quelle; False, wenn sie auf diesem System nicht verfügbar ist."""
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+
+class UdevDriveChangeSource(DriveChangeSource):
+    """Linux: Block-Geräte-Ereignisse per udev/netlink."""
+
+    name = "udev"
+
+    def __init__(self):
+        self._observer = None
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        if pyudev is None:
+            return False
+        try:
+            context = pyudev.Context()
+            monitor = pyudev.Monitor.from_netlink(context)
+            monitor.filter_by("block")
+
+            def handle(device):
+                if device.action in ("add", "remove", "change"):
+                    on_change()
+
+            self._observer = pyudev.MonitorObserver(monitor, callback=handle, name="udev-drives")
+            self._observer.daemon = True
+            self._observer.start()
+            return True
+        except Exception as e:
+            print(f"udev-Überwachung nicht verfügbar: {e}")
+            self._observer = None
+            return False
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            try:
+                self._observer.send_stop()
+            except Exception:
+                pass
+            self._observer = None
+
+
+class MountTableChangeSource(DriveChangeSource):
+    """Linux ohne pyudev: meldet Änderungen der Mount-Tabelle (poll auf /proc/self/mounts)."""
+
+    name = "mounts"
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        if not sys.platform.startswith("linux") or not hasattr(select, "poll"):
+            return False
+        try:
+            handle = open(_MOUNT_TABLE, "rb")
+        except OSError:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(handle, on_change), name="mount-watch", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, handle, on_change: Callable[[], None]) -> None:
+        poller = select.poll()
+        poller.register(handle.fileno(), select.POLLERR | select.POLLPRI)
+        try:
+            while not self._stop.is_set():
+                # Timeout nur, damit stop() den Thread beenden kann
+                events = poller.poll(1000)
+                if not events:
+                    continue
+                # Tabelle neu lesen, sonst meldet poll() sofort erneut
+                handle.seek(0)
+                handle.read()
+                on_change()
+        finally:
+            handle.close()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class SignaturePollChangeSource(DriveChangeSource):
+    """
+    Fragt eine billige Signatur (ohne Zugriff auf die Datenträger selbst) ab
+    und meldet, wenn sie sich ändert.
+    """
+
+    def __init__(self, name: str, signature: Callable[[], object],
+                 interval: float = SIGNATURE_POLL_SEC):
+        self.name = name
+        self._signature = signature
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        try:
+            last = self._signature()
+        except Exception:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(last, on_change), name=f"{self.name}-watch", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, last, on_change: Callable[[], None]) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                current = self._signature()
+            except Exception:
+                continue
+            if current != last:
+                last = current
+                on_change()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def _windows_drive_signature() -> tuple:
+    mask = win32api.GetLogicalDrives()
+    media = []
+    for index, letter in enumerate(string.ascii_uppercase):
+        if not mask & (1 << index):
+            continue
+        root = f"{letter}:\\"
+        if win32file.GetDriveType(root) == win32con.DRIVE_REMOVABLE:
+            # Attribut-Abfrage des Wurzelverzeichnisses, kein Verzeichnis-Listing
+            media.append((letter, os.path.exists(root)))
+    return mask, tuple(media)
+
+
+def _volumes_signature() -> int:
+    return os.stat("/Volumes").st_mtime_ns
+
+
+def create_drive_change_source(on_change: Callable[[], None]) -> Optional[DriveChangeSource]:
+    """Startet die beste verfügbare Ereignisquelle; None = nur Polling."""
+    if sys.platform.startswith("linux"):
+        candidates = [UdevDriveChangeSource(), MountTableChangeSource()]
+    elif sys.platform == "win32" and win32api is not None:
+        candidates = [SignaturePollChangeSource("drive-letters", _windows_drive_signature)]
+    elif sys.platform == "darwin":
+        candidates = [SignaturePollChangeSource("volumes", _volumes_signature)]
+    else:
+        candidates = []
+    for source in candidates:
+        if source.start(on_change):
+            print(f"Laufwerkserkennung: Ereignisquelle '{source.name}' aktiv")
+            return source
+    return None
@@ -1,32 +1,379 @@
 ﻿import os
+import queue
 import sqlite3
 import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List, Dict, Tuple
+from typing import Any, Callable, Optional, List, Dict, Iterable, Set, Tuple
 
 from src.utils.constants import CONFIG_DIR
 
 DB_PATH = os.path.join(CONFIG_DIR, 'media_history.db')
-PARTIAL_HASH_READ_BYTES = 4 * 1024 * 1024  # 4MB für Teil-Hash
+PARTIAL_HASH_READ_BYTES = 4 * 1024 * 1024  # 4MB für Teil-Hash (Identität v1)
+CONTENT_HASH_DIGEST_SIZE = 16  # BLAKE2b-128 über die ganze Datei
+# Obergrenze für Platzhalter je IN (...)-Abfrage (ältere SQLite: 999)
+_SQL_IN_CHUNK = 500
+# Schreib-Thread: Aufträge innerhalb dieses Fensters landen in einem gemeinsamen Commit
+GROUP_COMMIT_WINDOW_SEC = 0.005
+GROUP_COMMIT_MAX_OPS = 256
+
+# Identität v2: Stichproben an Anfang, Mitte und Ende (+ MP4-moov) statt 4 MB Kopf
+IDENTITY_VERSION = 2
+IDENTITY_V2_PREFIX = "v2-"
+FINGERPRINT_SAMPLE_BYTES = 64 * 1024
+FINGERPRINT_MOOV_BYTES = 64 * 1024
+FINGERPRINT_DIGEST_SIZE = 16
+_MAX_TOP_LEVEL_BOXES = 64
+# Identitäts-Memo: nur die zuletzt geschriebenen Pfade behalten (DCIM-Pfade wiederholen sich)
+IDENTITY_MEMO_MAX_ROWS = 50_000
+
+# Historie-Dialog: Seitengröße und Sortierschlüssel (NULL-Importe zuletzt, dann neueste zuerst)
+HISTORY_PAGE_SIZE = 200
+# Trigram-Index findet Teilstrings erst ab 3 Zeichen; kürzere Suchen laufen über LIKE
+_FTS_MIN_QUERY_CHARS = 3
+_SORT_KEY_SQL = (
+    "(imported_at IS NULL), COALESCE(imported_at, ''), COALESCE(backed_up_at, ''), first_seen_at, id"
+)
+_ORDER_BY_SQL = (
+    "(imported_at IS NULL), COALESCE(imported_at, '') DESC, COALESCE(backed_up_at, '') DESC, "
+    "first_seen_at DESC, id DESC"
+)
+
+_UPSERT_SQL = """
+    INSERT INTO processed_files
+        (identity_hash, filename, size_bytes, media_type, first_seen_at,
+         backed_up_at, imported_at, created_at, content_hash, identity_version)
+    VALUES (?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(identity_hash) DO UPDATE SET
+        filename = excluded.filename,
+        size_bytes = excluded.size_bytes,
+        media_type = excluded.media_type,
+        backed_up_at = COALESCE(excluded.backed_up_at, processed_files.backed_up_at),
+        imported_at = COALESCE(excluded.imported_at, processed_files.imported_at),
+        created_at = excluded.created_at,
+        content_hash = COALESCE(excluded.content_hash, processed_files.content_hash)
+"""
+
+
+@dataclass
+class MediaRecord:
+    """Ein Historie-Eintrag für upsert_many (None-Zeitstempel bleiben unverändert)."""
+    identity_hash: str
+    filename: str
+    size_bytes: int
+    media_type: str
+    backed_up_at: Optional[str] = None
+    imported_at: Optional[str] = None
+    created_at: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+# ---------------- Fingerprint v2 -----------------
+
+def _sample_ranges(size: int) -> List[Tuple[int, int]]:
+    """Byte-Bereiche (Start, Ende) für Anfang, Mitte und Ende der Datei."""
+    n = FINGERPRINT_SAMPLE_BYTES
+    mid = max(0, size // 2 - n // 2)
+    return [(0, min(n, size)), (mid, min(mid + n, size)), (max(0, size - n), size)]
+
+
+def _parse_box_header(header: bytes, box_pos: int, size: int) -> Optional[Tuple[int, bytes]]:
+    """(Boxgröße, Typ) eines ISO-BMFF-Boxkopfs oder None bei ungültigem Kopf."""
+    if len(header) < 8:
+        return None
+    box_size = int.from_bytes(header[:4], "big")
+    box_type = bytes(header[4:8])
+    header_len = 8
+    if box_size == 1:
+        if len(header) < 16:
+            return None
+        box_size = int.from_bytes(header[8:16], "big")
+        header_len = 16
+    elif box_size == 0:
+        box_size = size - box_pos
+    if box_size < header_len:
+        return None
+    return box_size, box_type
+
+
+def _moov_range(box_pos: int, box_size: int, size: int) -> Tuple[int, int]:
+    return box_pos, min(box_pos + box_size, box_pos + FINGERPRINT_MOOV_BYTES, size)
+
+
+def _fingerprint_digest(size: int, samples: List[Tuple[int, int, bytes]],
+                        moov: Optional[Tuple[int, int, bytes]]) -> str:
+    h = hashlib.blake2b(digest_size=FINGERPRINT_DIGEST_SIZE)
+    h.update(b"fingerprint-v2")
+    h.update(size.to_bytes(8, "little"))
+    for start, end, data in samples + ([moov] if moov else []):
+        h.update(start.to_bytes(8, "little"))
+        h.update(end.to_bytes(8, "little"))
+        h.update(data)
+    return IDENTITY_V2_PREFIX + h.hexdigest()
+
+
+def compute_file_fingerprint(path: str) -> Tuple[str, int]:
+    """Identität v2 einer Datei (liest nur die Stichproben, ~3 × 64 KB)."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        samples = []
+        for start, end in _sample_ranges(size):
+            f.seek(start)
+            samples.append((start, end, f.read(end - start)))
+        moov = None
+        if samples[0][2][4:8] == b"ftyp":
+            box_pos = 0
+            for _ in range(_MAX_TOP_LEVEL_BOXES):
+                if box_pos + 8 > size:
+                    break
+                f.seek(box_pos)
+                parsed = _parse_box_header(f.read(min(16, size - box_pos)), box_pos, size)
+                if parsed is None:
+                    break
+                box_size, box_type = parsed
+                if box_type == b"moov":
+                    start, end = _moov_range(box_pos, box_size, size)
+                    f.seek(start)
+                    moov = (start, end, f.read(end - start))
+                    break
+                box_pos += box_size
+    return _fingerprint_digest(size, samples, moov), size
+
+
+def compute_legacy_identity(path: str) -> Tuple[str, int]:
+    """Identität v1 (Größe + SHA-1 der ersten 4 MB) für Alt-Einträge."""
+    size = os.path.getsize(path)
+    h = hashlib.sha1(str(size).encode('utf-8'))
+    with open(path, 'rb') as f:
+        h.update(f.read(PARTIAL_HASH_READ_BYTES))
+    return h.hexdigest(), size
+
+
+class IdentityHasher:
+    """Berechnet identity_hash (wie compute_identity) und optional einen
+    Inhalts-Hash der ganzen Datei aus einem laufenden Kopier-Datenstrom.
+    Mit legacy=True entsteht zusätzlich die Identität v1 (für Alt-Einträge).
+    """
+
+    def __init__(self, size_bytes: int, content_hash: bool = True, legacy: bool = False):
+        self.size_bytes = size_bytes
+        self._pos = 0
+        # [Start, Ende, gesammelte Bytes]; der Puffer deckt immer [Start, Start + len) ab
+        self._samples = [[start, end, bytearray()] for start, end in _sample_ranges(size_bytes)]
+        self._moov = None
+        self._box_scan = True
+        self._box_pos = 0
+        self._box_header = bytearray()
+        self._boxes_seen = 0
+        self._legacy = hashlib.sha1(str(size_bytes).encode('utf-8')) if legacy else None
+        self._legacy_remaining = PARTIAL_HASH_READ_BYTES
+        self._content = hashlib.blake2b(digest_size=CONTENT_HASH_DIGEST_SIZE) if content_hash else None
+
+    def update(self, data) -> None:
+        view = memoryview(data).cast("B")
+        block_start = self._pos
+        block_end = block_start + len(view)
+        if self._box_scan:
+            self._scan_boxes(view, block_start, block_end)
+        for sample in self._samples + ([self._moov] if self._moov else []):
+            start, end, buf = sample
+            copy_from = max(start + len(buf), block_start)
+            copy_to = min(end, block_end)
+            if copy_from < copy_to:
+                buf += view[copy_from - block_start:copy_to - block_start]
+        if self._legacy is not None and self._legacy_remaining > 0:
+            head = view[:self._legacy_remaining]
+            self._legacy.update(head)
+            self._legacy_remaining -= len(head)
+        if self._content is not None:
+            self._content.update(view)
+        self._pos = block_end
+
+    def _scan_boxes(self, view, block_start: int, block_end: int) -> None:
+        """Verfolgt die obersten MP4-Boxen im Datenstrom, bis moov gefunden ist."""
+        size = self.size_bytes
+        while self._box_scan and self._box_pos < block_end:
+            target = min(16, size - self._box_pos)
+            have = self._box_pos + len(self._box_header)
+            if len(self._box_header) < target and have < block_end:
+                take_to = min(self._box_pos + target, block_end)
+                self._box_header += view[have - block_start:take_to - block_start]
+            if len(self._box_header) < target:
+                return
+            parsed = _parse_box_header(self._box_header, self._box_pos, size)
+            if parsed is None or (self._box_pos == 0 and parsed[1] != b"ftyp"):
+                self._box_scan = False
+                return
+            box_size, box_type = parsed
+            if box_type == b"moov":
+                start, end = _moov_range(self._box_pos, box_size, size)
+                # Bereits vorbeigelaufene Bytes der Box stecken im gesammelten Kopf
+                seen = max(0, min(block_start, end) - start)
+                self._moov = [start, end, bytearray(self._box_header[:seen])]
+                self._box_scan = False
+                return
+            self._box_pos += box_size
+            # Boxen unter 16 Byte: der Rest des Kopfpuffers gehört schon zur nächsten
+            # Box und kann in einem früheren Block liegen - übernehmen statt neu zu lesen
+            self._box_header = self._box_header[box_size:]
+            self._boxes_seen += 1
+            if self._boxes_seen >= _MAX_TOP_LEVEL_BOXES or self._box_pos + 8 > size:
+                self._box_scan = False
+
+    @property
+    def needs_data(self) -> bool:
+        """False, sobald weitere Blöcke keine der Hashes mehr verändern."""
+        if self._content is not None:
+            return True
+        if self._legacy is not None and self._legacy_remaining > 0:
+            return True
+        if self._box_scan:
+            return True
+        return any(start + len(buf) < end for start, end, buf in
+                   self._samples + ([self._moov] if self._moov else []))
+
+    def identity(self) -> Tuple[str, int]:
+        samples = [(start, end, bytes(buf)) for start, end, buf in self._samples]
+        moov = (self._moov[0], self._moov[1], bytes(self._moov[2])) if self._moov else None
+        return _fingerprint_digest(self.size_bytes, samples, moov), self.size_bytes
+
+    def legacy_identity(self) -> Optional[Tuple[str, int]]:
+        if self._legacy is None:
+            return None
+        return self._legacy.hexdigest(), self.size_bytes
+
+    def content_hash(self) -> Optional[str]:
+        return self._content.hexdigest() if self._content is not None else None
+
+
+class _HistoryWriter:
+    """
+    Einziger schreibender Zugriff auf die Historie-DB (eigener Thread).
+
+    Aufträge sind Funktionen conn -> Ergebnis. Was innerhalb von
+    GROUP_COMMIT_WINDOW_SEC eintrifft, läuft in einer Transaktion; jeder
+    Auftrag hat einen eigenen Savepoint, ein Fehler betrifft nur ihn selbst.
+    """
+
+    _STOP = object()
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="media-history-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, op: Callable[[sqlite3.Connection], Any]) -> Future:
+        future: Future = Future()
+        self._queue.put((op, future))
+        return future
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._queue.put(self._STOP)
+        self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is self._STOP:
+                break
+            batch = [job]
+            deadline = time.monotonic() + GROUP_COMMIT_WINDOW_SEC
+            while len(batch) < GROUP_COMMIT_MAX_OPS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if job is self._STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch) -> None:
+        results = []
+        try:
+            self._conn.execute("BEGIN")
+            for op, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._conn.execute("SAVEPOINT history_op")
+                try:
+                    result = op(self._conn)
+                    self._conn.execute("RELEASE history_op")
+                    results.append((future, result, None))
+                except Exception as e:
+                    self._conn.execute("ROLLBACK TO history_op")
+                    self._conn.execute("RELEASE history_op")
+                    results.append((future, None, e))
+            self._conn.execute("COMMIT")
+        except Exception as e:
+            print(f"MediaHistory: Schreibvorgang fehlgeschlagen: {e}")
+            try:
+                self._conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            # Alle noch offenen Aufträge scheitern lassen, auch die nie gestarteten
+            # (z. B. BEGIN fehlgeschlagen) - sonst warten _write()-Aufrufer ewig
+            results = [(future, None, e) for _, future in batch if not future.done()]
+        # Erst nach dem Commit melden: Leser sehen danach den neuen Stand
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
 
 class MediaHistoryStore:
-    """Verwaltet Historie verarbeiteter Mediendateien (Backup/Import)."""
+    """
+    Verwaltet Historie verarbeiteter Mediendateien (Backup/Import).
+
+    Schreiben läuft über einen Schreib-Thread mit Gruppen-Commits, Lesen über
+    eine eigene Verbindung je Thread (WAL), sodass lange Backups den
+    Historie-Dialog nicht blockieren.
+    """
 
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __init__(self):
         self.db_path = DB_PATH
         os.makedirs(CONFIG_DIR, exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Schreibverbindung: nur Schema-Aufbau hier, danach ausschließlich im Schreib-Thread
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
         self.conn.execute('PRAGMA journal_mode=WAL;')
         self.conn.execute('PRAGMA synchronous=NORMAL;')
         self._create_schema()
+        self._local = threading.local()
+        self._writer = _HistoryWriter(self.conn)
 
     @classmethod
     def instance(cls):
-        if cls._instance is None:
-            cls._instance = MediaHistoryStore()
-        return cls._instance
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = MediaHistoryStore()
+            return cls._instance
+
+    def _reader(self) -> sqlite3.Connection:
+        """Nur-Lese-Verbindung des aufrufenden Threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('PRAGMA query_only=ON;')
+            self._local.conn = conn
+        return conn
+
+    def _write(self, op: Callable[[sqlite3.Connection], Any], wait: bool = True) -> Any:
+        """Reicht einen Schreibauftrag ein; mit wait nach dessen Commit zurück."""
+        future = self._writer.submit(op)
+        return future.result() if wait else None
 
     def _create_schema(self):
         cur = self.conn.cursor()
@@ -41,17 +388,95 @@ class MediaHistoryStore:
                 first_seen_at TEXT NOT NULL,
                 backed_up_at TEXT NULL,
                 imported_at TEXT NULL,
-                created_at TEXT NULL
+                created_at TEXT NULL,
+                content_hash TEXT NULL,
+                identity_version INTEGER NOT NULL DEFAULT 1
             );
             """
         )
+        columns = {row[1] for row in cur.execute("PRAGMA table_info(processed_files)")}
+        if "content_hash" not in columns:
+            # Migration: Inhalts-Hash (beim Kopieren berechnet) für bestehende DBs
+            cur.execute("ALTER TABLE processed_files ADD COLUMN content_hash TEXT NULL")
+        if "identity_version" not in columns:
+            # Migration: bestehende Einträge behalten ihre Identität v1 (4-MB-Kopf) und
+            # werden beim nächsten Antreffen der Datei auf v2 umgeschlüsselt
+            cur.execute("ALTER TABLE processed_files ADD COLUMN identity_version INTEGER NOT NULL DEFAULT 1")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_processed_files_version_size "
+            "ON processed_files(identity_version, size_bytes);"
+        )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_processed_files_hash ON processed_files(identity_hash);")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_processed_files_media_type ON processed_files(media_type);")
+        # Index in exakt der Sortierung des Historie-Dialogs (Keyset-Pagination ohne Sortierschritt)
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_processed_files_sort ON processed_files({_ORDER_BY_SQL});")
+        self.fts_available = self._create_search_index(cur)
+        # Memo: Identität je Pfad, gültig solange Größe, mtime und Inode unverändert sind
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS identity_memo (
+                path TEXT PRIMARY KEY,
+                size_bytes INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                identity_hash TEXT NOT NULL
+            );
+            """
+        )
         self.conn.commit()
 
+    def _create_search_index(self, cur) -> bool:
+        """FTS5-Volltextindex (Trigram) auf filename, per Trigger synchron gehalten."""
+        try:
+            exists = cur.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='processed_files_fts'"
+            ).fetchone()
+            cur.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS processed_files_fts USING fts5("
+                "filename, content='processed_files', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError as e:
+            # SQLite ohne FTS5/Trigram: Suche bleibt bei LIKE
+            print(f"MediaHistory: Volltextindex nicht verfügbar ({e}), Suche per LIKE")
+            return False
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS processed_files_fts_insert AFTER INSERT ON processed_files BEGIN
+                INSERT INTO processed_files_fts(rowid, filename) VALUES (new.id, new.filename);
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS processed_files_fts_delete AFTER DELETE ON processed_files BEGIN
+                INSERT INTO processed_files_fts(processed_files_fts, rowid, filename)
+                VALUES ('delete', old.id, old.filename);
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS processed_files_fts_update AFTER UPDATE OF filename ON processed_files
+            WHEN old.filename IS NOT new.filename BEGIN
+                INSERT INTO processed_files_fts(processed_files_fts, rowid, filename)
+                VALUES ('delete', old.id, old.filename);
+                INSERT INTO processed_files_fts(rowid, filename) VALUES (new.id, new.filename);
+            END;
+            """
+        )
+        if not exists:
+            # Migration: Index für bereits vorhandene Einträge aufbauen
+            cur.execute("INSERT INTO processed_files_fts(processed_files_fts) VALUES ('rebuild')")
+        return True
+
     def close(self):
         try:
+            self._writer.stop()
             self.conn.close()
+            reader = getattr(self._local, "conn", None)
+            if reader is not None:
+                reader.close()
+                self._local.conn = None
         except Exception:
             pass
 
@@ -59,20 +484,116 @@ class MediaHistoryStore:
 
     def compute_identity(self, path: str) -> Optional[Tuple[str, int]]:
         """Berechnet (identity_hash, size_bytes) für eine Datei.
-        identity_hash basiert auf Größe + Teil-Hash der ersten 4MB.
+        identity_hash ist der Fingerprint v2 (Größe + Stichproben, siehe compute_file_fingerprint).
+        Bei unverändertem stat() kommt das Ergebnis ohne Lesezugriff aus dem Memo.
         """
         try:
-            size = os.path.getsize(path)
-            h = hashlib.sha1()
-            h.update(str(size).encode('utf-8'))
-            with open(path, 'rb') as f:
-                chunk = f.read(PARTIAL_HASH_READ_BYTES)
-                h.update(chunk)
-            return h.hexdigest(), size
+            st = os.stat(path)
+            memo_key = _memo_key(path)
+            row = self._reader().execute(
+                "SELECT size_bytes, mtime_ns, inode, identity_hash FROM identity_memo WHERE path=?",
+                (memo_key,),
+            ).fetchone()
+            if (row and tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino)
+                    and row[3].startswith(IDENTITY_V2_PREFIX)):
+                return row[3], st.st_size
+
+            identity = compute_file_fingerprint(path)
+            self._write_memo([(memo_key, st, identity[0])])
+            return identity
         except Exception as e:
             print(f"MediaHistory: Fehler beim Hash für {path}: {e}")
             return None
 
+    def remember_identities(self, identities: Dict[str, Tuple[str, int]]) -> None:
+        """Legt anderweitig berechnete Identitäten (z. B. beim Kopieren) im Memo ab."""
+        entries = []
+        for path, (identity_hash, size_bytes) in identities.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if st.st_size == size_bytes:
+                entries.append((_memo_key(path), st, identity_hash))
+        self._write_memo(entries)
+
+    def _write_memo(self, entries) -> None:
+        if not entries:
+            return
+        rows = [(key, st.st_size, st.st_mtime_ns, st.st_ino, identity_hash)
+                for key, st, identity_hash in entries]
+
+        def op(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO identity_memo (path, size_bytes, mtime_ns, inode, identity_hash) "
+                "VALUES (?,?,?,?,?)",
+                rows,
+            )
+            # REPLACE vergibt eine neue rowid: die ältesten rowids sind am längsten nicht geschrieben
+            conn.execute(
+                "DELETE FROM identity_memo WHERE rowid <= (SELECT MAX(rowid) FROM identity_memo) - ?",
+                (IDENTITY_MEMO_MAX_ROWS,),
+            )
+
+        # Memo ist nur ein Cache: nicht auf den Commit warten
+        self._write(op, wait=False)
+
+    def legacy_sizes(self, sizes: Iterable[int]) -> Set[int]:
+        """Dateigrößen, zu denen es noch Alt-Einträge (Identität v1) gibt."""
+        size_list = list(set(sizes))
+        found: Set[int] = set()
+        cur = self._reader().cursor()
+        for start in range(0, len(size_list), _SQL_IN_CHUNK):
+            chunk = size_list[start:start + _SQL_IN_CHUNK]
+            cur.execute(
+                "SELECT DISTINCT size_bytes FROM processed_files WHERE identity_version = 1 "
+                f"AND size_bytes IN ({','.join('?' for _ in chunk)})",
+                chunk,
+            )
+            found.update(row[0] for row in cur.fetchall())
+        return found
+
+    def upgrade_legacy_identities(self, identities: Dict[str, Tuple[str, int]],
+                                  legacy_identities: Optional[Dict[str, Tuple[str, int]]] = None) -> int:
+        """
+        Schlüsselt Alt-Einträge (Identität v1) auf den Fingerprint v2 um.
+
+        Nur Dateien, deren Größe bei einem v1-Eintrag vorkommt, werden dafür
+        (4 MB) gelesen; legacy_identities liefert bereits berechnete v1-Werte.
+
+        Args:
+            identities: Pfad -> (identity_hash v2, size_bytes)
+
+        Returns:
+            Anzahl umgeschlüsselter Einträge
+        """
+        legacy_identities = legacy_identities or {}
+        legacy_sizes = self.legacy_sizes(size for _, size in identities.values())
+        if not legacy_sizes:
+            return 0
+
+        updates = []
+        for path, (identity_hash, size_bytes) in identities.items():
+            if size_bytes not in legacy_sizes:
+                continue
+            legacy = legacy_identities.get(path)
+            if legacy is None:
+                try:
+                    legacy = compute_legacy_identity(path)
+                except OSError as e:
+                    print(f"MediaHistory: Fehler beim Hash (v1) für {path}: {e}")
+                    continue
+            updates.append((identity_hash, IDENTITY_VERSION, legacy[0]))
+        if not updates:
+            return 0
+        # OR IGNORE: existiert der v2-Eintrag schon, bleibt der Alt-Eintrag unverändert
+        cur = self._write(lambda conn: conn.executemany(
+            "UPDATE OR IGNORE processed_files SET identity_hash = ?, identity_version = ? "
+            "WHERE identity_hash = ? AND identity_version = 1",
+            updates,
+        ))
+        return max(0, cur.rowcount)
+
     # ---------------- Queries -----------------
 
     def contains(self, identity_hash: str) -> bool:
@@ -85,10 +606,32 @@ class MediaHistoryStore:
         Returns:
             True wenn vorhanden, sonst False
         """
-        cur = self.conn.cursor()
+        cur = self._reader().cursor()
         cur.execute("SELECT COUNT(*) FROM processed_files WHERE identity_hash = ?", (identity_hash,))
         return cur.fetchone()[0] > 0
 
+    def contains_many(self, identity_hashes: Iterable[str]) -> Set[str]:
+        """Wie contains() für viele Hashes; liefert die bereits bekannten."""
+        return self._select_hashes("SELECT identity_hash FROM processed_files WHERE identity_hash IN ({})",
+                                   identity_hashes)
+
+    def was_imported_many(self, identity_hashes: Iterable[str]) -> Set[str]:
+        """Wie was_imported() für viele Hashes; liefert die bereits importierten."""
+        return self._select_hashes(
+            "SELECT identity_hash FROM processed_files WHERE imported_at IS NOT NULL AND identity_hash IN ({})",
+            identity_hashes,
+        )
+
+    def _select_hashes(self, sql: str, identity_hashes: Iterable[str]) -> Set[str]:
+        hashes = list(dict.fromkeys(h for h in identity_hashes if h))
+        found: Set[str] = set()
+        cur = self._reader().cursor()
+        for start in range(0, len(hashes), _SQL_IN_CHUNK):
+            chunk = hashes[start:start + _SQL_IN_CHUNK]
+            cur.execute(sql.format(",".join("?" for _ in chunk)), chunk)
+            found.update(row[0] for row in cur.fetchall())
+        return found
+
     def was_imported(self, identity_hash: str) -> bool:
         """
         Prüft ob eine Datei bereits importiert wurde (imported_at ist gesetzt).
@@ -102,7 +645,7 @@ class MediaHistoryStore:
         Returns:
             True wenn bereits importiert, sonst False
         """
-        cur = self.conn.cursor()
+        cur = self._reader().cursor()
         cur.execute(
             "SELECT imported_at FROM processed_files WHERE identity_hash = ?",
             (identity_hash,)
@@ -113,66 +656,75 @@ class MediaHistoryStore:
 
     def upsert(self, identity_hash: str, filename: str, size_bytes: int, media_type: str,
                backed_up_at: Optional[str] = None, imported_at: Optional[str] = None,
-               created_at: Optional[str] = None):
+               created_at: Optional[str] = None, content_hash: Optional[str] = None):
         """Fügt neuen Eintrag hinzu oder aktualisiert Zeitstempel-Felder.
         first_seen_at bleibt beim ersten Insert erhalten.
         """
+        self.upsert_many([MediaRecord(
+            identity_hash, filename, size_bytes, media_type,
+            backed_up_at=backed_up_at, imported_at=imported_at,
+            created_at=created_at, content_hash=content_hash,
+        )])
+
+    def upsert_many(self, records: Iterable[MediaRecord]) -> int:
+        """Wie upsert() für viele Einträge in einer einzigen Transaktion.
+        Returns: Anzahl geschriebener Einträge.
+        """
         now_iso = datetime.utcnow().isoformat(timespec='seconds')
-        cur = self.conn.cursor()
-        # Prüfe ob existiert
-        cur.execute("SELECT id, first_seen_at, backed_up_at, imported_at FROM processed_files WHERE identity_hash=?", (identity_hash,))
-        row = cur.fetchone()
-        if row:
-            # Update nur Felder die neu übergeben wurden (nicht überschreiben mit None)
-            existing_first_seen = row[1]
-            existing_backed = row[2]
-            existing_imported = row[3]
-            new_backed = backed_up_at if backed_up_at else existing_backed
-            new_imported = imported_at if imported_at else existing_imported
-            cur.execute(
-                "UPDATE processed_files SET filename=?, size_bytes=?, media_type=?, backed_up_at=?, imported_at=?, created_at=? WHERE identity_hash=?",
-                (filename, size_bytes, media_type, new_backed, new_imported, created_at, identity_hash)
-            )
-        else:
-            cur.execute(
-                "INSERT INTO processed_files (identity_hash, filename, size_bytes, media_type, first_seen_at, backed_up_at, imported_at, created_at) VALUES (?,?,?,?,?,?,?,?)",
-                (identity_hash, filename, size_bytes, media_type, now_iso, backed_up_at, imported_at, created_at)
-            )
-        self.conn.commit()
+        rows = [
+            (r.identity_hash, r.filename, r.size_bytes, r.media_type, now_iso,
+             r.backed_up_at or None, r.imported_at or None, r.created_at, r.content_hash or None,
+             IDENTITY_VERSION)
+            for r in records
+        ]
+        if not rows:
+            return 0
+        self._write(lambda conn: conn.executemany(_UPSERT_SQL, rows))
+        return len(rows)
 
     def list_entries(self, limit: int = 1000, search: Optional[str] = None) -> List[Dict]:
         """
         Listet Einträge mit optionaler Suche nach Dateiname.
         Sortiert nach neuestem Import (imported_at), dann backed_up_at, dann first_seen_at.
         """
-        cur = self.conn.cursor()
-        if search:
-            # Suche nach Dateiname (case-insensitive via LIKE)
-            # Sortierung: imported_at DESC (mit NULL am Ende), dann backed_up_at, dann first_seen_at
-            cur.execute(
-                """SELECT id, filename, size_bytes, media_type, first_seen_at, backed_up_at, imported_at, created_at 
-                   FROM processed_files 
-                   WHERE filename LIKE ? 
-                   ORDER BY 
-                     CASE WHEN imported_at IS NULL THEN 1 ELSE 0 END,
-                     imported_at DESC,
-                     backed_up_at DESC,
-                     first_seen_at DESC
-                   LIMIT ?""",
-                (f"%{search}%", limit)
-            )
-        else:
-            cur.execute(
-                """SELECT id, filename, size_bytes, media_type, first_seen_at, backed_up_at, imported_at, created_at 
-                   FROM processed_files 
-                   ORDER BY 
-                     CASE WHEN imported_at IS NULL THEN 1 ELSE 0 END,
-                     imported_at DESC,
-                     backed_up_at DESC,
-                     first_seen_at DESC
-                   LIMIT ?""",
-                (limit,)
+        entries, _ = self.list_entries_page(limit=limit, search=search)
+        return entries
+
+    def list_entries_page(self, limit: int = HISTORY_PAGE_SIZE, search: Optional[str] = None,
+                          after: Optional[tuple] = None, media_type: Optional[str] = None,
+                          imported_since: Optional[str] = None) -> Tuple[List[Dict], Optional[tuple]]:
+        """
+        Eine Seite der Historie in Dialog-Sortierung (Keyset-Pagination).
+
+        Args:
+            limit: Maximale Anzahl Einträge der Seite
+            search: Teilstring des Dateinamens
+            after: Cursor der vorherigen Seite (None = erste Seite)
+            media_type: 'video' oder 'photo' (None = alle)
+            imported_since: ISO-Zeitstempel; nur Einträge mit imported_at >= Wert
+
+        Returns:
+            (Einträge, Cursor für die nächste Seite oder None am Ende)
+        """
+        where, params = self._entry_filters(search, media_type, imported_since)
+        if after is not None:
+            # Erstes Sortierfeld aufsteigend, alle weiteren absteigend
+            where.append(
+                "((imported_at IS NULL) > ? OR ((imported_at IS NULL) = ? AND "
+                "(COALESCE(imported_at, ''), COALESCE(backed_up_at, ''), first_seen_at, id) < (?, ?, ?, ?)))"
             )
+            params.extend([after[0], after[0], *after[1:]])
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        cur = self._reader().cursor()
+        cur.execute(
+            f"""SELECT id, filename, size_bytes, media_type, first_seen_at, backed_up_at, imported_at, created_at,
+                       {_SORT_KEY_SQL}
+                FROM processed_files
+                {where_sql}
+                ORDER BY {_ORDER_BY_SQL}
+                LIMIT ?""",
+            params + [limit],
+        )
         rows = cur.fetchall()
         result = []
         for r in rows:
@@ -186,53 +738,100 @@ class MediaHistoryStore:
                 'imported_at': r[6],
                 'created_at': r[7]
             })
-        return result
+        next_cursor = tuple(rows[-1][8:]) if len(rows) == limit else None
+        return result, next_cursor
+
+    def count_entries(self, search: Optional[str] = None, media_type: Optional[str] = None,
+                      imported_since: Optional[str] = None) -> int:
+        """Anzahl der Einträge mit denselben Filtern wie list_entries_page."""
+        where, params = self._entry_filters(search, media_type, imported_since)
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        cur = self._reader().cursor()
+        cur.execute(f"SELECT COUNT(*) FROM processed_files {where_sql}", params)
+        return cur.fetchone()[0]
+
+    def _entry_filters(self, search: Optional[str], media_type: Optional[str],
+                       imported_since: Optional[str]) -> Tuple[List[str], List]:
+        where: List[str] = []
+        params: List = []
+        if search:
+            if self.fts_available and len(search) >= _FTS_MIN_QUERY_CHARS:
+                # Suchtext als Phrase: Sonderzeichen der FTS-Syntax wirken nicht
+                phrase = '"' + search.replace('"', '""') + '"'
+                where.append(
+                    "id IN (SELECT rowid FROM processed_files_fts WHERE processed_files_fts MATCH ?)"
+                )
+                params.append(phrase)
+            else:
+                where.append("filename LIKE ?")
+                params.append(f"%{search}%")
+        if media_type:
+            where.append("media_type = ?")
+            params.append(media_type)
+        if imported_since:
+            where.append("imported_at >= ?")
+            params.append(imported_since)
+        return where, params
 
     def delete_by_ids(self, ids: List[int]):
         if not ids:
             return
-        cur = self.conn.cursor()
         placeholders = ','.join('?' for _ in ids)
-        cur.execute(f"DELETE FROM processed_files WHERE id IN ({placeholders})", ids)
-        self.conn.commit()
+        self._write(lambda conn: conn.execute(f"DELETE FROM processed_files WHERE id IN ({placeholders})", ids))
 
     def delete_by_hashes(self, identity_hashes: List[str]) -> None:
         """Entfernt Historie-Einträge anhand identity_hash (z. B. Import-Rollback)."""
         if not identity_hashes:
             return
-        cur = self.conn.cursor()
         placeholders = ",".join("?" for _ in identity_hashes)
-        cur.execute(
+        self._write(lambda conn: conn.execute(
             f"DELETE FROM processed_files WHERE identity_hash IN ({placeholders})",
             identity_hashes,
-        )
-        self.conn.commit()
+        ))
 
-    def mark_imported_batch(self, file_paths: List[str]) -> None:
-        """Setzt imported_at für erfolgreich importierte Dateien."""
-        now = datetime.utcnow().isoformat(timespec="seconds")
+    def mark_imported_batch(self, file_paths: List[str],
+                            known_identities: Optional[Dict[str, Optional[Tuple[str, int]]]] = None) -> None:
+        """Setzt imported_at für erfolgreich importierte Dateien.
+        known_identities: bereits (z. B. beim Kopieren) berechnete Identitäten je Pfad.
+        """
+        known_identities = known_identities or {}
+        identities = {}
         for path in file_paths:
-            ident = self.compute_identity(path)
-            if not ident:
-                continue
-            identity_hash, size_bytes = ident
+            ident = known_identities.get(path) or self.compute_identity(path)
+            if ident:
+                identities[path] = ident
+        self.mark_imported_many(identities)
+
+    def mark_imported_many(self, identities: Dict[str, Tuple[str, int]],
+                           imported_at: Optional[str] = None) -> int:
+        """Setzt imported_at für Pfad -> (identity_hash, size_bytes) in einer Transaktion."""
+        now = imported_at or datetime.utcnow().isoformat(timespec="seconds")
+        self.upgrade_legacy_identities(identities)
+        records = []
+        for path, (identity_hash, size_bytes) in identities.items():
             filename = os.path.basename(path)
-            media_type = get_media_type_from_filename(filename)
-            self.upsert(
+            records.append(MediaRecord(
                 identity_hash=identity_hash,
                 filename=filename,
                 size_bytes=size_bytes,
-                media_type=media_type,
+                media_type=get_media_type_from_filename(filename),
                 imported_at=now,
-            )
+            ))
+        return self.upsert_many(records)
 
     def purge_all(self):
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM processed_files")
-        self.conn.commit()
+        def op(conn):
+            conn.execute("DELETE FROM processed_files")
+            conn.execute("DELETE FROM identity_memo")
+
+        self._write(op)
 
 # Convenience Funktionen
 
+def _memo_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
 def get_media_type_from_filename(filename: str) -> str:
     lower = filename.lower()
     video_exts = ('.mp4', '.mov', '.avi', '.mkv', '.m4v', '.mpg', '.mpeg', '.wmv', '.flv', '.webm')
@@ -0,0 +1,128 @@
+"""
+Minimaler MP4/ISO-BMFF-Atom-Leser.
+
+Liest nur Box-Header (Top-Level und direkte Kinder), ohne den Clip zu dekodieren.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Sekunden zwischen 1904-01-01 (MP4-Epoche) und 1970-01-01 (Unix)
+MP4_EPOCH_OFFSET = 2082844800
+
+_BOX_HEADER_SIZE = 8
+_MAX_BOXES = 64
+
+# (Typ, Offset, Header-Größe, Box-Größe)
+Mp4Box = Tuple[bytes, int, int, int]
+
+
+def iter_boxes(handle: BinaryIO, start: int, end: int) -> Iterator[Mp4Box]:
+    """Iteriert die Boxen im Bereich [start, end) einer geöffneten Datei."""
+    offset = start
+    for _ in range(_MAX_BOXES):
+        if offset + _BOX_HEADER_SIZE > end:
+            return
+        handle.seek(offset)
+        header = handle.read(_BOX_HEADER_SIZE)
+        if len(header) < _BOX_HEADER_SIZE:
+            return
+        box_size, box_type = struct.unpack(">I4s", header)
+        header_size = _BOX_HEADER_SIZE
+        if box_size == 1:
+            large = handle.read(8)
+            if len(large) < 8:
+                return
+            box_size = struct.unpack(">Q", large)[0]
+            header_size = 16
+        elif box_size == 0:
+            box_size = end - offset
+        if box_size < header_size:
+            return
+        yield box_type, offset, header_size, box_size
+        offset += box_size
+
+
+def iter_top_level_boxes(handle: BinaryIO) -> Iterator[Mp4Box]:
+    file_size = os.fstat(handle.fileno()).st_size
+    return iter_boxes(handle, 0, file_size)
+
+
+def moov_before_mdat(file_path: str) -> bool:
+    """
+    True, wenn der moov-Atom auf oberster Ebene vor mdat liegt (faststart).
+    Nur dann ist ein teilweise kopierter Clip bereits abspielbar.
+    """
+    try:
+        with open(file_path, "rb") as handle:
+            for box_type, _, _, _ in iter_top_level_boxes(handle):
+                if box_type == b"moov":
+                    return True
+                if box_type == b"mdat":
+                    return False
+    except OSError:
+        pass
+    return False
+
+
+def find_top_level_box(file_path: str, wanted: bytes) -> Optional[Tuple[int, int]]:
+    """(Offset, Größe) der ersten Top-Level-Box vom Typ wanted oder None."""
+    try:
+        with open(file_path, "rb") as handle:
+            for box_type, offset, _, box_size in iter_top_level_boxes(handle):
+                if box_type == wanted:
+                    return offset, box_size
+    except OSError:
+        pass
+    return None
+
+
+@dataclass
+class Mp4MovieHeader:
+    """Werte aus dem mvhd-Atom."""
+
+    duration_seconds: Optional[float]
+    creation_epoch: Optional[float]
+
+
+def read_movie_header(file_path: str) -> Optional[Mp4MovieHeader]:
+    """Liest Dauer und Erstellungszeit aus moov/mvhd (wenige KB I/O)."""
+    try:
+        with open(file_path, "rb") as handle:
+            moov = None
+            for box_type, offset, header_size, box_size in iter_top_level_boxes(handle):
+                if box_type == b"moov":
+                    moov = (offset + header_size, offset + box_size)
+                    break
+            if moov is None:
+                return None
+
+            for box_type, offset, header_size, _ in iter_boxes(handle, moov[0], moov[1]):
+                if box_type != b"mvhd":
+                    continue
+                handle.seek(offset + header_size)
+                version = handle.read(4)[:1]
+                if version == b"\x01":
+                    data = handle.read(28)
+                    if len(data) < 28:
+                        return None
+                    creation, _, timescale, duration = struct.unpack(">QQIQ", data)
+                else:
+                    data = handle.read(16)
+                    if len(data) < 16:
+                        return None
+                    creation, _, timescale, duration = struct.unpack(">IIII", data)
+                duration_seconds = duration / timescale if timescale else None
+                creation_epoch = (
+                    float(creation - MP4_EPOCH_OFFSET)
+                    if creation > MP4_EPOCH_OFFSET
+                    else None
+                )
+                return Mp4MovieHeader(duration_seconds, creation_epoch)
+    except (OSError, struct.error):
+        pass
+    return None
@@ -0,0 +1,186 @@
+"""
+Foto-Metadaten für die Vorschau (Auflösung, Dateigröße, Aufnahmezeit).
+
+Das Auslesen (Bildkopf, EXIF, ggf. ffprobe) läuft in einem Worker-Pool;
+Ergebnisse landen in einer Queue, die die Oberfläche gesammelt abholt.
+Auflösung und eingebettete Aufnahmezeit werden im Thumbnail-Speicher nach
+Datei-Identität abgelegt, damit dieselben Fotos beim nächsten Mal ohne
+Dateizugriff auf den Bildinhalt bereitstehen.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from src.utils.media_datetime import (
+    format_epoch_date,
+    format_epoch_time,
+    get_embedded_capture_epoch,
+    resolve_fallback_display_epoch,
+)
+from src.utils.thumbnail_store import ThumbnailStore
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+METADATA_WORKERS = min(4, os.cpu_count() or 1)
+_WORKER_IDLE_SEC = 5.0
+
+
+@dataclass
+class PhotoMetadata:
+    filename: str
+    width: int
+    height: int
+    size_bytes: int
+    display_epoch: Optional[float]
+
+    def as_display_dict(self) -> Dict[str, str]:
+        """Formatierte Werte für die Info-Labels der Foto-Vorschau."""
+        meta = {
+            "filename": self.filename,
+            "resolution": f"{self.width} × {self.height} px" if self.width else "-",
+            "size": f"{self.size_bytes / (1024 * 1024):.2f} MB" if self.size_bytes >= 0 else "-",
+            "date": "-",
+            "time": "-",
+        }
+        if self.display_epoch is not None:
+            meta["date"] = format_epoch_date(self.display_epoch)
+            meta["time"] = format_epoch_time(self.display_epoch)
+        return meta
+
+
+def _metadata_store() -> Optional[ThumbnailStore]:
+    try:
+        return ThumbnailStore.instance()
+    except Exception:
+        return None
+
+
+def read_photo_metadata(photo_path: str, source_import_epoch: Optional[float] = None) -> PhotoMetadata:
+    """
+    Liest die Metadaten eines Fotos (blockierend, für Worker-Threads).
+    Zeitpriorität wie get_photo_display_epoch.
+    """
+    filename = os.path.basename(photo_path)
+    try:
+        size_bytes = os.path.getsize(photo_path)
+    except OSError:
+        size_bytes = -1
+
+    store = _metadata_store()
+    cached = store.get_photo_metadata(photo_path) if store is not None else None
+    if cached is not None:
+        width, height, embedded_epoch = cached
+    else:
+        width = height = 0
+        try:
+            with Image.open(photo_path) as img:
+                width, height = img.size
+        except Exception as e:
+            print(f"Fehler beim Laden der Foto-Metadaten für {photo_path}: {e}")
+        embedded_epoch = get_embedded_capture_epoch(photo_path)
+        if store is not None and width:
+            store.put_photo_metadata(photo_path, width, height, embedded_epoch)
+
+    if embedded_epoch is not None:
+        display_epoch = float(embedded_epoch)
+    else:
+        display_epoch = resolve_fallback_display_epoch(photo_path, source_import_epoch)
+    return PhotoMetadata(filename, width, height, size_bytes, display_epoch)
+
+
+class PhotoMetadataLoader:
+    """
+    Lädt Foto-Metadaten in einem Worker-Pool. Ergebnisse (Generation, Pfad,
+    PhotoMetadata) landen in results; cancel() verwirft alle offenen Aufträge.
+    Vorrangige Anfragen (aktuelles Foto) werden vor die Warteschlange gestellt.
+    """
+
+    def __init__(self, workers: int = METADATA_WORKERS):
+        self.results: "queue.Queue" = queue.Queue()
+        self._workers = max(1, workers)
+        self._threads = []
+        self._jobs: deque = deque()
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending = set()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def cancel(self) -> int:
+        """Verwirft offene Aufträge; liefert die neue Generation."""
+        with self._cond:
+            self._generation += 1
+            self._jobs.clear()
+            self._pending.clear()
+            return self._generation
+
+    def request(self, paths: Iterable[str],
+                import_epochs: Optional[Dict[str, Optional[float]]] = None,
+                *, priority: bool = False) -> None:
+        """Reiht Pfade ein; bereits angefragte werden bei priority nach vorn geholt."""
+        import_epochs = import_epochs or {}
+        with self._cond:
+            jobs = []
+            for path in paths:
+                if path in self._pending:
+                    queued = any(job[0] == path for job in self._jobs)
+                    if not (priority and queued):
+                        # Schon eingereiht oder gerade in Arbeit
+                        continue
+                    self._jobs = deque(job for job in self._jobs if job[0] != path)
+                self._pending.add(path)
+                jobs.append((path, import_epochs.get(path)))
+            if not jobs:
+                return
+            if priority:
+                self._jobs.extendleft(reversed(jobs))
+            else:
+                self._jobs.extend(jobs)
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < min(self._workers, len(self._jobs)):
+                thread = threading.Thread(target=self._run, name="photo-meta", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify_all()
+
+    def is_pending(self, path: str) -> bool:
+        with self._cond:
+            return path in self._pending
+
+    def has_pending(self) -> bool:
+        with self._cond:
+            return bool(self._pending)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._jobs:
+                    # Kurz auf neue Aufträge warten, danach endet der Thread
+                    self._cond.wait(timeout=_WORKER_IDLE_SEC)
+                    if not self._jobs:
+                        if threading.current_thread() in self._threads:
+                            self._threads.remove(threading.current_thread())
+                        return
+                path, import_epoch = self._jobs.popleft()
+                generation = self._generation
+            try:
+                meta = read_photo_metadata(path, import_epoch)
+            except Exception as e:
+                print(f"Fehler beim Laden der Foto-Metadaten für {path}: {e}")
+                meta = PhotoMetadata(os.path.basename(path), 0, 0, -1, None)
+            with self._cond:
+                if generation != self._generation:
+                    continue
+                self._pending.discard(path)
+            self.results.put((generation, path, meta))
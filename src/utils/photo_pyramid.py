@@ -0,0 +1,143 @@
+"""
+Dekodierte Fotos in mehreren Größenstufen (Bildpyramide) mit LRU-Begrenzung
+nach Bytes und Vorausladen der Nachbarfotos für die Foto-Vorschau.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.bounded_cache import SHARE_PREVIEW_PANEL, SHARE_PREVIEW_SCREEN, ByteBudgetCache
+from src.utils.photo_thumbnail import load_display_image
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+LEVEL_PANEL = "panel"
+LEVEL_SCREEN = "screen"
+# Reihenfolge von groß nach klein: kleinere Stufen lassen sich aus größeren ableiten
+_LEVELS_LARGE_FIRST = (LEVEL_SCREEN, LEVEL_PANEL)
+# Anteil je Stufe am gemeinsamen Bild-Cache-Budget
+DEFAULT_LEVEL_SHARES = {LEVEL_PANEL: SHARE_PREVIEW_PANEL, LEVEL_SCREEN: SHARE_PREVIEW_SCREEN}
+DEFAULT_PREFETCH_AHEAD = 3
+DEFAULT_PREFETCH_BEHIND = 1
+
+
+class PhotoPyramidCache:
+    """LRU dekodierter PIL-Bilder je (Pfad, Stufe) mit Byte-Budget; thread-safe."""
+
+    def __init__(self, level_shares: Optional[Dict[str, float]] = None):
+        self._levels: Dict[str, ByteBudgetCache] = {
+            level: ByteBudgetCache(f"preview_{level}", share=share)
+            for level, share in (level_shares or DEFAULT_LEVEL_SHARES).items()
+        }
+
+    def get(self, path: str, level: str):
+        return self._levels[level].get(path)
+
+    def put(self, path: str, level: str, img) -> None:
+        if img is None:
+            return
+        self._levels[level].put(path, img)
+
+    def get_or_load(self, path: str, level: str, size: Tuple[int, int]):
+        """
+        Bild der Stufe aus dem Cache; sonst aus einer größeren Stufe verkleinert,
+        sonst neu dekodiert. Ladefehler werden an den Aufrufer weitergegeben.
+        """
+        img = self.get(path, level)
+        if img is not None:
+            return img
+
+        img = None
+        for larger in _LEVELS_LARGE_FIRST:
+            if larger == level:
+                break
+            source = self.get(path, larger)
+            if source is not None:
+                img = source.copy()
+                img.thumbnail(size, Image.LANCZOS)
+                break
+        if img is None:
+            img = load_display_image(path, size[0], size[1])
+        self.put(path, level, img)
+        return img
+
+    def retain(self, paths: Iterable[str]) -> None:
+        """Entfernt Einträge, deren Pfad nicht mehr in paths vorkommt."""
+        alive = set(paths)
+        for entries in self._levels.values():
+            entries.retain(alive.__contains__)
+
+    def clear(self) -> None:
+        for entries in self._levels.values():
+            entries.clear()
+
+
+class PhotoPrefetcher:
+    """
+    Lädt Nachbarfotos in Navigationsrichtung in einem Hintergrund-Thread in den
+    PhotoPyramidCache. Jeder neue Auftrag ersetzt die noch offenen.
+    """
+
+    def __init__(self, cache: PhotoPyramidCache,
+                 ahead: int = DEFAULT_PREFETCH_AHEAD,
+                 behind: int = DEFAULT_PREFETCH_BEHIND):
+        self._cache = cache
+        self._ahead = ahead
+        self._behind = behind
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def neighbor_order(count: int, index: int, direction: int, ahead: int, behind: int) -> List[int]:
+        """Indizes der Nachbarn: zuerst in Navigationsrichtung, dann dahinter."""
+        step = -1 if direction < 0 else 1
+        order = [index + step * i for i in range(1, ahead + 1)]
+        order += [index - step * i for i in range(1, behind + 1)]
+        return [i for i in order if 0 <= i < count]
+
+    def schedule(self, paths: List[str], index: int, direction: int,
+                 level: str, size: Tuple[int, int]) -> None:
+        jobs = [
+            (paths[i], level, size)
+            for i in self.neighbor_order(len(paths), index, direction, self._ahead, self._behind)
+        ]
+        with self._lock:
+            self._queue.clear()
+            self._queue.extend(jobs)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._queue.clear()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                job = self._queue.popleft() if self._queue else None
+            if job is None:
+                # Kurz auf neue Aufträge warten, danach endet der Thread
+                if not self._wakeup.wait(timeout=5.0):
+                    with self._lock:
+                        if not self._queue:
+                            self._thread = None
+                            return
+                continue
+            path, level, size = job
+            if self._cache.get(path, level) is not None:
+                continue
+            try:
+                self._cache.get_or_load(path, level, size)
+            except Exception as e:
+                print(f"Vorausladen von {path} fehlgeschlagen: {e}")
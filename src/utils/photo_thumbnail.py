@@ -2,24 +2,76 @@
 
 from __future__ import annotations
 
+import io
+import multiprocessing
 import os
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from typing import Callable, Optional
 
+from src.utils.exif_reader import exif_thumbnail_bytes
+from src.utils.raw_preview import extract_embedded_preview, has_embedded_preview_format
+from src.utils.thumbnail_store import ThumbnailStore, get_or_build_thumbnail, size_bucket
+
 THUMB_MAX_SIZE = int(60 * 1.3)
+# draft() dekodiert mindestens so viel größer als das Ziel (Qualität beim LANCZOS-Schritt)
+_DRAFT_OVERSAMPLING = 2
+# Erlaubte Abweichung des Seitenverhältnisses beim EXIF-Thumbnail
+_EXIF_THUMB_RATIO_TOLERANCE = 0.02
+# Prozess-Pool: Obergrenze der Worker und Mindestanzahl Fotos, ab der er sich lohnt
+_MAX_PROCESS_WORKERS = 8
+PROCESS_POOL_MIN_PHOTOS = 24
 
 
-def build_pil_thumbnail(photo_path: str, max_size: int = THUMB_MAX_SIZE):
+def _exif_preview_thumbnail(img, max_size: int):
     """
-    Lädt ein Foto und erzeugt ein quadratisches PIL-Thumbnail (max. max_size px).
-    Gibt None zurück bei Fehler (wie bisher im Import-Thread).
+    EXIF-eingebettetes JPEG-Thumbnail, wenn es groß genug ist und das
+    Seitenverhältnis passt (keine schwarzen Balken). Sonst None.
     """
     from PIL import Image
 
+    thumb_bytes = exif_thumbnail_bytes(img.info.get("exif"))
+    if not thumb_bytes:
+        return None
+    try:
+        with Image.open(io.BytesIO(thumb_bytes)) as thumb:
+            if max(thumb.size) < max_size:
+                return None
+            full_ratio = img.width / max(1, img.height)
+            thumb_ratio = thumb.width / max(1, thumb.height)
+            if abs(full_ratio - thumb_ratio) > _EXIF_THUMB_RATIO_TOLERANCE * full_ratio:
+                return None
+            thumb.load()
+            thumb.thumbnail((max_size, max_size), Image.LANCZOS)
+            return thumb.copy()
+    except Exception:
+        return None
+
+
+def decode_pil_thumbnail(photo_path: str, max_size: int):
+    """
+    Dekodiert ein Foto verkleinert auf max. max_size px (ohne Thumbnail-Speicher).
+    RAW/HEIF: eingebettete Vorschau. JPEGs: zuerst das EXIF-Thumbnail, sonst
+    DCT-Skalierung per draft() (1/2..1/8), erst danach das finale LANCZOS-Resampling.
+    """
+    from PIL import Image
+
+    if has_embedded_preview_format(photo_path):
+        preview = extract_embedded_preview(photo_path, max_size)
+        if preview is not None:
+            preview.thumbnail((max_size, max_size), Image.LANCZOS)
+            return preview
+
     try:
         img = Image.open(photo_path)
         try:
+            if img.format == "JPEG":
+                preview = _exif_preview_thumbnail(img, max_size)
+                if preview is not None:
+                    return preview
+                draft_edge = max_size * _DRAFT_OVERSAMPLING
+                img.draft(img.mode, (draft_edge, draft_edge))
             img.load()
             img.thumbnail((max_size, max_size), Image.LANCZOS)
             return img.copy()
@@ -30,6 +82,41 @@ def build_pil_thumbnail(photo_path: str, max_size: int = THUMB_MAX_SIZE):
         return None
 
 
+def load_display_image(photo_path: str, max_width: int, max_height: int):
+    """
+    Lädt ein Foto für die große Vorschau/Vollbild (max. max_width x max_height).
+    RAW/HEIF über die eingebettete Vorschau, JPEGs per draft() nur so groß wie
+    nötig. Fehler werden an den Aufrufer weitergegeben.
+    """
+    from PIL import Image
+
+    if has_embedded_preview_format(photo_path):
+        preview = extract_embedded_preview(photo_path, max(max_width, max_height))
+        if preview is not None:
+            preview.thumbnail((max_width, max_height), Image.LANCZOS)
+            return preview
+
+    with Image.open(photo_path) as img:
+        if img.format == "JPEG":
+            img.draft(img.mode, (max_width, max_height))
+        img.load()
+        result = img.copy()
+    result.thumbnail((max_width, max_height), Image.LANCZOS)
+    return result
+
+
+def build_pil_thumbnail(photo_path: str, max_size: int = THUMB_MAX_SIZE):
+    """
+    Liefert ein quadratisches PIL-Thumbnail (max. max_size px), bevorzugt aus dem
+    persistenten Thumbnail-Speicher. Gibt None zurück bei Fehler.
+    """
+    return get_or_build_thumbnail(
+        photo_path,
+        max_size,
+        lambda edge: decode_pil_thumbnail(photo_path, edge),
+    )
+
+
 def _should_emit_progress(completed: int, total: int) -> bool:
     if completed >= total:
         return True
@@ -120,3 +207,139 @@ def build_pil_thumbnails_parallel(
                 pending.cancel()
 
     return result
+
+
+def thumbnail_process_worker_count() -> int:
+    """Prozess-Worker für Thumbnails: alle Kerne bis auf einen (UI/Import-Thread)."""
+    cpu_count = multiprocessing.cpu_count()
+    return max(1, min(_MAX_PROCESS_WORKERS, cpu_count - 1))
+
+
+def _decode_thumbnail_payload(photo_path: str, edge: int):
+    """
+    Läuft im Worker-Prozess: dekodiert das Thumbnail und gibt es kompakt zurück.
+
+    Returns:
+        (mode, size, Rohpixel) oder None
+    """
+    img = decode_pil_thumbnail(photo_path, edge)
+    if img is None:
+        return None
+    if img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGB")
+    return img.mode, img.size, img.tobytes()
+
+
+def build_pil_thumbnails_multiprocess(
+    paths: list[str],
+    max_size: int = THUMB_MAX_SIZE,
+    workers: Optional[int] = None,
+    *,
+    cancel_check: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[int, int, str], None]] = None,
+) -> dict[str, object]:
+    """
+    Wie build_pil_thumbnails_parallel, dekodiert aber in einem Prozess-Pool
+    (ohne GIL-Engpass). Treffer im Thumbnail-Speicher werden direkt übernommen,
+    nur fehlende Fotos gehen an die Worker. Bei Problemen mit dem Pool wird auf
+    Threads zurückgefallen.
+
+    Args:
+        workers: Prozess-Anzahl; None = thumbnail_process_worker_count()
+
+    Returns:
+        Dict path -> PIL.Image für erfolgreich erzeugte Thumbnails
+    """
+    from PIL import Image
+
+    if not paths:
+        return {}
+    if cancel_check and cancel_check():
+        return {}
+
+    total = len(paths)
+    result: dict[str, object] = {}
+    completed = 0
+
+    def _report_progress(last_basename: str) -> None:
+        if on_progress is not None and _should_emit_progress(completed, total):
+            on_progress(completed, total, last_basename)
+
+    try:
+        store = ThumbnailStore.instance()
+    except Exception as e:
+        print(f"Thumbnail-Speicher nicht verfügbar: {e}")
+        store = None
+
+    missing = []
+    for photo_path in paths:
+        if cancel_check and cancel_check():
+            return result
+        thumb = store.get(photo_path, max_size) if store else None
+        if thumb is None:
+            missing.append(photo_path)
+            continue
+        result[photo_path] = thumb
+        completed += 1
+        _report_progress(os.path.basename(photo_path))
+
+    if not missing:
+        return result
+
+    edge = size_bucket(max_size)
+    worker_count = max(1, min(int(workers or thumbnail_process_worker_count()), len(missing)))
+    done = set()
+    executor = None
+    try:
+        # spawn statt fork: der Import-Prozess hat Tk und weitere Threads
+        executor = ProcessPoolExecutor(
+            max_workers=worker_count,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        futures = {
+            executor.submit(_decode_thumbnail_payload, photo_path, edge): photo_path
+            for photo_path in missing
+        }
+        for future in as_completed(futures):
+            if cancel_check and cancel_check():
+                return result
+
+            photo_path = futures[future]
+            done.add(photo_path)
+            try:
+                payload = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                print(f"Fehler bei Thumbnail-Erzeugung (Prozess) für {photo_path}: {e}")
+                payload = None
+
+            if payload is not None:
+                mode, size, data = payload
+                thumb = Image.frombytes(mode, size, data)
+                if store:
+                    store.put(photo_path, max_size, thumb)
+                result[photo_path] = ThumbnailStore._fit(thumb, max_size)
+
+            completed += 1
+            _report_progress(os.path.basename(photo_path))
+    except (BrokenProcessPool, OSError, RuntimeError) as e:
+        print(f"Prozess-Pool für Thumbnails nicht nutzbar ({e}), nutze Threads.")
+        rest = [p for p in missing if p not in done]
+
+        def _progress_rest(rest_completed: int, _total: int, basename: str) -> None:
+            if on_progress is not None:
+                on_progress(completed + rest_completed, total, basename)
+
+        result.update(build_pil_thumbnails_parallel(
+            rest,
+            max_size,
+            workers=4,
+            cancel_check=cancel_check,
+            on_progress=_progress_rest,
+        ))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return result
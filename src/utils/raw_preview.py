@@ -0,0 +1,297 @@
+"""
+Eingebettete Vorschaubilder aus RAW- und HEIF-Dateien.
+
+TIFF-basierte RAW-Formate (CR2, NEF, ARW, DNG, ...) enthalten fertige JPEG-
+Vorschauen, die über die IFD-Struktur gefunden und direkt gelesen werden.
+Bei HEIC/HEIF wird das Thumbnail-Item (pillow-heif, falls installiert) oder
+das JPEG-Thumbnail aus dem Exif-Item verwendet. Eine volle RAW-Dekodierung
+ist so für Kacheln und Vorschau nie nötig.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import struct
+from typing import List, Optional, Tuple
+
+from src.utils.exif_reader import (
+    TAG_JPEG_INTERCHANGE_FORMAT,
+    TAG_JPEG_INTERCHANGE_FORMAT_LENGTH,
+    exif_thumbnail_bytes,
+    ifd_int,
+    ifd_values,
+    read_ifd,
+    tiff_byte_order,
+)
+from src.utils.mp4_atoms import iter_boxes, iter_top_level_boxes
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import pillow_heif
+except ImportError:
+    pillow_heif = None
+
+RAW_PREVIEW_EXTENSIONS = frozenset({".raw", ".cr2", ".nef", ".arw", ".dng"})
+HEIF_EXTENSIONS = frozenset({".heic", ".heif"})
+EMBEDDED_PREVIEW_EXTENSIONS = RAW_PREVIEW_EXTENSIONS | HEIF_EXTENSIONS
+
+# IFDs liegen am Dateianfang; die Vorschau-Bytes selbst werden gezielt gelesen
+_TIFF_HEAD_BYTES = 1024 * 1024
+_MAX_IFDS = 32
+_MAX_HEIF_META_BYTES = 4 * 1024 * 1024
+_MAX_PREVIEW_FILE_RATIO = 0.5
+
+TAG_COMPRESSION = 0x0103
+TAG_PHOTOMETRIC = 0x0106
+TAG_STRIP_OFFSETS = 0x0111
+TAG_STRIP_BYTE_COUNTS = 0x0117
+TAG_SUB_IFDS = 0x014A
+_JPEG_COMPRESSIONS = (6, 7)
+# CFA- bzw. LinearRaw-Daten (DNG): verlustfreies JPEG, keine Vorschau
+_RAW_PHOTOMETRICS = (32803, 34892)
+
+if pillow_heif is not None:
+    try:
+        pillow_heif.register_heif_opener()
+    except Exception:
+        pillow_heif = None
+
+
+def has_embedded_preview_format(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in EMBEDDED_PREVIEW_EXTENSIONS
+
+
+# ---------------- TIFF-basierte RAWs -----------------
+
+def _tiff_preview_ranges(head: bytes, file_size: int) -> List[Tuple[int, int]]:
+    """(Offset, Länge) aller JPEG-Vorschauen in IFD-Kette und SubIFDs."""
+    endian = tiff_byte_order(head)
+    if endian is None:
+        return []
+
+    ranges: List[Tuple[int, int]] = []
+    pending = [struct.unpack_from(endian + "I", head, 4)[0]]
+    visited = set()
+    while pending and len(visited) < _MAX_IFDS:
+        offset = pending.pop(0)
+        if not offset or offset in visited:
+            continue
+        visited.add(offset)
+        entries, next_offset = read_ifd(head, offset, endian)
+        if next_offset:
+            pending.append(next_offset)
+        sub_ifds = entries.get(TAG_SUB_IFDS)
+        if sub_ifds is not None:
+            pending.extend(ifd_values(head, endian, sub_ifds))
+
+        start = ifd_int(head, endian, entries, TAG_JPEG_INTERCHANGE_FORMAT)
+        length = ifd_int(head, endian, entries, TAG_JPEG_INTERCHANGE_FORMAT_LENGTH)
+        if not (start and length):
+            compression = ifd_int(head, endian, entries, TAG_COMPRESSION)
+            photometric = ifd_int(head, endian, entries, TAG_PHOTOMETRIC)
+            strip_offsets = entries.get(TAG_STRIP_OFFSETS)
+            strip_counts = entries.get(TAG_STRIP_BYTE_COUNTS)
+            if (
+                compression in _JPEG_COMPRESSIONS
+                and photometric not in _RAW_PHOTOMETRICS
+                and strip_offsets is not None
+                and strip_counts is not None
+                and strip_offsets[1] == 1
+            ):
+                start = ifd_int(head, endian, entries, TAG_STRIP_OFFSETS)
+                length = ifd_int(head, endian, entries, TAG_STRIP_BYTE_COUNTS)
+        if start and length and start + length <= file_size:
+            ranges.append((start, length))
+    return ranges
+
+
+def _tiff_preview_ranges_for_file(path: str) -> List[Tuple[int, int]]:
+    """
+    Vorschau-Bereiche eines TIFF-basierten RAWs, kleinste zuerst. Bereiche über
+    der halben Dateigröße sind die Sensordaten selbst und werden ausgelassen.
+    """
+    try:
+        with open(path, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            head = f.read(_TIFF_HEAD_BYTES)
+    except OSError:
+        return []
+    try:
+        ranges = _tiff_preview_ranges(head, file_size)
+    except struct.error:
+        return []
+    return sorted(
+        {r for r in ranges if r[1] <= file_size * _MAX_PREVIEW_FILE_RATIO},
+        key=lambda r: r[1],
+    )
+
+
+def _read_ranges(path: str, ranges: List[Tuple[int, int]]):
+    """Liest die Bereiche nacheinander (lazy), nur echte JPEG-Daten."""
+    try:
+        with open(path, "rb") as f:
+            for start, length in ranges:
+                f.seek(start)
+                data = f.read(length)
+                if data.startswith(b"\xff\xd8"):
+                    yield data
+    except OSError:
+        return
+
+
+# ---------------- HEIF -----------------
+
+def _read_uint(data: bytes, pos: int, size: int) -> Tuple[int, int]:
+    if size == 0:
+        return 0, pos
+    fmt = {1: ">B", 2: ">H", 4: ">I", 8: ">Q"}[size]
+    return struct.unpack_from(fmt, data, pos)[0], pos + size
+
+
+def _heif_exif_item_ids(iinf: bytes) -> List[int]:
+    version = iinf[0]
+    pos = 4
+    if version == 0:
+        count, pos = _read_uint(iinf, pos, 2)
+    else:
+        count, pos = _read_uint(iinf, pos, 4)
+    exif_ids = []
+    for _ in range(count):
+        if pos + 8 > len(iinf):
+            break
+        box_size, box_type = struct.unpack_from(">I4s", iinf, pos)
+        if box_size < 8:
+            break
+        if box_type == b"infe":
+            infe_version = iinf[pos + 8]
+            body = pos + 12
+            if infe_version >= 2:
+                id_size = 4 if infe_version == 3 else 2
+                item_id, body = _read_uint(iinf, body, id_size)
+                item_type = iinf[body + 2:body + 6]
+                if item_type == b"Exif":
+                    exif_ids.append(item_id)
+        pos += box_size
+    return exif_ids
+
+
+def _heif_item_extents(iloc: bytes, wanted_id: int) -> List[Tuple[int, int]]:
+    """Datei-Extents (Offset, Länge) eines Items aus iloc (construction_method 0)."""
+    version = iloc[0]
+    offset_size = iloc[4] >> 4
+    length_size = iloc[4] & 0x0F
+    base_offset_size = iloc[5] >> 4
+    index_size = iloc[5] & 0x0F if version in (1, 2) else 0
+    pos = 6
+    count, pos = _read_uint(iloc, pos, 2 if version < 2 else 4)
+    for _ in range(count):
+        item_id, pos = _read_uint(iloc, pos, 2 if version < 2 else 4)
+        construction_method = 0
+        if version in (1, 2):
+            value, pos = _read_uint(iloc, pos, 2)
+            construction_method = value & 0x0F
+        pos += 2  # data_reference_index
+        base_offset, pos = _read_uint(iloc, pos, base_offset_size)
+        extent_count, pos = _read_uint(iloc, pos, 2)
+        extents = []
+        for _ in range(extent_count):
+            _, pos = _read_uint(iloc, pos, index_size)
+            extent_offset, pos = _read_uint(iloc, pos, offset_size)
+            extent_length, pos = _read_uint(iloc, pos, length_size)
+            extents.append((base_offset + extent_offset, extent_length))
+        if item_id == wanted_id:
+            return extents if construction_method == 0 else []
+    return []
+
+
+def _heif_exif_thumbnail(path: str) -> Optional[bytes]:
+    """JPEG-Thumbnail aus dem Exif-Item einer HEIF-Datei."""
+    try:
+        with open(path, "rb") as f:
+            meta = None
+            for box_type, offset, header_size, box_size in iter_top_level_boxes(f):
+                if box_type == b"meta":
+                    meta = (offset + header_size + 4, offset + box_size)
+                    break
+            if meta is None or meta[1] - meta[0] > _MAX_HEIF_META_BYTES:
+                return None
+
+            children = {}
+            for box_type, offset, header_size, box_size in iter_boxes(f, meta[0], meta[1]):
+                if box_type in (b"iinf", b"iloc"):
+                    f.seek(offset + header_size)
+                    children[box_type] = f.read(box_size - header_size)
+            if b"iinf" not in children or b"iloc" not in children:
+                return None
+
+            for item_id in _heif_exif_item_ids(children[b"iinf"]):
+                extents = _heif_item_extents(children[b"iloc"], item_id)
+                data = b""
+                for extent_offset, extent_length in extents:
+                    f.seek(extent_offset)
+                    data += f.read(extent_length)
+                if len(data) < 4:
+                    continue
+                tiff_start = 4 + struct.unpack_from(">I", data, 0)[0]
+                thumb = exif_thumbnail_bytes(data[tiff_start:])
+                if thumb:
+                    return thumb
+    except (OSError, struct.error, IndexError, KeyError):
+        return None
+    return None
+
+
+def _heif_thumbnail_image(path: str, min_edge: int):
+    """Kleinstes HEIF-Thumbnail-Item mit mindestens min_edge px (pillow-heif)."""
+    if pillow_heif is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            thumb = pillow_heif.thumbnail(img, min_box=min_edge)
+            if thumb is img:
+                # Kein passendes Thumbnail-Item; volle Dekodierung dem Aufrufer überlassen
+                return None
+            thumb.load()
+            return thumb.copy()
+    except Exception:
+        return None
+
+
+# ---------------- Öffentliche API -----------------
+
+def extract_embedded_preview(path: str, min_edge: int = 0):
+    """
+    Liefert die kleinste eingebettete Vorschau mit mindestens min_edge px
+    (längere Kante) als PIL-Bild, sonst die größte vorhandene. None, wenn die
+    Datei keine nutzbare Vorschau enthält.
+    """
+    if Image is None:
+        return None
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext in HEIF_EXTENSIONS:
+        img = _heif_thumbnail_image(path, min_edge)
+        if img is not None:
+            return img
+        candidates = [data for data in [_heif_exif_thumbnail(path)] if data]
+    elif ext in RAW_PREVIEW_EXTENSIONS:
+        candidates = _read_ranges(path, _tiff_preview_ranges_for_file(path))
+    else:
+        return None
+
+    best = None
+    for data in candidates:
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        except Exception:
+            continue
+        best = img
+        if max(img.size) >= min_edge:
+            break
+    return best
@@ -28,7 +28,7 @@ try:
 except ImportError:
     PYUDEV_AVAILABLE = False
     if sys.platform == "linux":
-        print("Hinweis: pyudev nicht verfügbar. Es wird der psutil-basierte Linux-Fallback verwendet.")
+        print("Hinweis: pyudev nicht verfügbar. Es wird die Mount-Tabelle überwacht.")
 
 try:
     import psutil
@@ -38,7 +38,13 @@ except ImportError:
 
 LINUX_API_AVAILABLE = True
 
-from src.utils.media_history import MediaHistoryStore, get_media_type_from_filename
+from src.utils.media_history import (
+    IDENTITY_VERSION,
+    IdentityHasher,
+    MediaHistoryStore,
+    MediaRecord,
+    get_media_type_from_filename,
+)
 from src.utils.dji_media_paths import (
     expand_files_for_sd_clear,
     filter_media_paths_for_backup,
@@ -50,8 +56,24 @@ from src.utils.dji_media_paths import (
     write_backup_manifest,
 )
 from src.utils.file_utils import normalize_server_path
+from src.utils.tee_copy import tee_copy_file
+from src.utils.media_detection import create_drive_change_source
+from src.utils.io_scheduler import DestinationIOScheduler
+from src.utils.backup_journal import BackupJournal, compute_card_fingerprint, relative_card_path
 from src.utils.constants import SUBPROCESS_CREATE_NO_WINDOW
 
+# Reines Polling (keine Ereignisquelle): 2 s, im Leerlauf verdoppelt bis 30 s
+DRIVE_POLL_MIN_SEC = 2.0
+DRIVE_POLL_MAX_SEC = 30.0
+# Mit Ereignisquelle nur noch als Sicherheitsnetz
+DRIVE_EVENT_SAFETY_POLL_SEC = 60.0
+# Nach einem Ereignis wird das Einhängen des Laufwerks kurz engmaschig abgewartet
+DRIVE_SETTLE_POLL_SEC = 0.5
+DRIVE_SETTLE_WINDOW_SEC = 10.0
+# Fertige Kopien gruppenweise per fsync sichern und gemeinsam im Backup-Journal eintragen
+JOURNAL_SYNC_FILES = 32
+JOURNAL_SYNC_SEC = 5.0
+
 
 class SDCardMonitor:
     """Überwacht SD-Karten und führt automatische Backups durch"""
@@ -68,11 +90,13 @@ class SDCardMonitor:
                                - success: True bei Erfolg, False bei Fehler
                                - error_message: Fehlermeldung bei Fehler, None bei Erfolg
             on_progress_update: Callback für Progress-Updates während Backup
-                               Wird aufgerufen mit (current_mb, total_mb, speed_mbps)
+                               Wird aufgerufen mit (current_mb, total_mb, speed_mbps, drive)
             on_status_change: Callback wenn sich der Status ändert
                              Wird aufgerufen mit (status_type, data)
                              status_type kann sein: 'monitoring_started', 'sd_detected',
                              'backup_started', 'backup_finished'
+
+        Mehrere Karten werden parallel gesichert (ein Ingest-Worker je Laufwerk).
         """
         self.config = config_manager
         self.on_backup_complete = on_backup_complete
@@ -81,13 +105,26 @@ class SDCardMonitor:
         self.monitoring = False
         self.monitor_thread = None
         self.known_drives = set()
-        self.backup_in_progress = False
+        self.drive_source = None
+        self._drive_changed = threading.Event()
+        # Laufende Ingest-Worker: Laufwerk -> Thread
+        self.active_ingests = {}
+        self._ingest_lock = threading.Lock()
+        self.io_scheduler = DestinationIOScheduler.instance()
         self.history = MediaHistoryStore.instance()  # NEU
 
         # NEU: Event-System für Größen-Limit-Dialog
         self.size_limit_decision_event = threading.Event()
         self.size_limit_decision = None  # Wird vom Haupt-Thread gesetzt
         self.pending_files_info = None  # Gespeicherte Datei-Infos für Dialog
+        # Es gibt nur einen Dialog: parallele Karten fragen nacheinander
+        self._size_limit_lock = threading.Lock()
+
+    @property
+    def backup_in_progress(self):
+        """True solange mindestens eine Karte gesichert wird."""
+        with self._ingest_lock:
+            return bool(self.active_ingests)
 
     def start_monitoring(self):
         """Startet die Überwachung von SD-Karten"""
@@ -112,9 +149,10 @@ class SDCardMonitor:
             return
 
         self.monitoring = True
-        # Initialisiere nur mit bereiten Laufwerken
-        all_drives = self._get_available_drives()
-        self.known_drives = {drive for drive in all_drives if self._is_drive_ready(drive)}
+        # Initialisiere nur mit bereiten Wechseldatenträgern
+        self.known_drives = self._get_ready_removable_drives()
+        self._drive_changed.clear()
+        self.drive_source = create_drive_change_source(self._drive_changed.set)
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         print("SD-Karten Überwachung gestartet")
@@ -126,6 +164,11 @@ class SDCardMonitor:
     def stop_monitoring(self):
         """Stoppt die Überwachung"""
         self.monitoring = False
+        if self.drive_source:
+            self.drive_source.stop()
+            self.drive_source = None
+        # Wartende Schleife sofort aufwecken
+        self._drive_changed.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
         print("SD-Karten Überwachung gestoppt")
@@ -219,47 +262,115 @@ class SDCardMonitor:
         except:
             return False
 
-    def _monitor_loop(self):
-        """Hauptschleife für die Überwachung"""
-        while self.monitoring:
-            try:
-                current_drives = self._get_available_drives()
+    def _get_ready_removable_drives(self):
+        """
+        Bereite Wechseldatenträger. Nur für diese wird das Verzeichnis gelesen;
+        Systemplatten werden nicht angefasst (und nicht aus dem Ruhezustand geweckt).
+        """
+        return {
+            drive for drive in self._get_available_drives()
+            if self._is_removable_drive(drive) and self._is_drive_ready(drive)
+        }
+
+    def _scan_drives(self):
+        """
+        Gleicht die bereiten Wechseldatenträger mit known_drives ab und
+        behandelt neue Action-Cam SD-Karten.
+
+        Returns:
+            True, wenn sich die Menge der Laufwerke geändert hat
+        """
+        ready_drives = self._get_ready_removable_drives()
 
-                # Filtere nur bereite Laufwerke (auf die zugegriffen werden kann)
-                ready_drives = {drive for drive in current_drives if self._is_drive_ready(drive)}
+        # Neue Laufwerke sind nur solche, die bereit UND noch nicht bekannt sind
+        new_drives = ready_drives - self.known_drives
+        changed = ready_drives != self.known_drives
 
-                # Neue Laufwerke sind nur solche, die bereit UND noch nicht bekannt sind
-                new_drives = ready_drives - self.known_drives
+        for drive in new_drives:
+            if self._is_action_cam_sd_card(drive):
+                print(f"Action-Cam SD-Karte erkannt: {drive}")
 
-                # Prüfe neue Laufwerke
-                for drive in new_drives:
-                    if self._is_removable_drive(drive):
-                        if self._is_action_cam_sd_card(drive):
-                            print(f"Action-Cam SD-Karte erkannt: {drive}")
+                # Status-Callback: SD erkannt
+                if self.on_status_change:
+                    self.on_status_change('sd_detected', drive)
 
-                            # Status-Callback: SD erkannt
-                            if self.on_status_change:
-                                self.on_status_change('sd_detected', drive)
+                self._start_ingest(drive)
 
-                            # Warte kurz damit das Laufwerk vollständig bereit ist
-                            time.sleep(1)
-                            self._handle_new_sd_card(drive)
+        # Laufwerke, die nicht mehr bereit sind, werden automatisch entfernt
+        self.known_drives = ready_drives
+        return changed
 
-                # Aktualisiere known_drives nur mit bereiten Laufwerken
-                # Laufwerke, die nicht mehr bereit sind, werden automatisch entfernt
-                self.known_drives = ready_drives
-                time.sleep(2)  # Prüfe alle 2 Sekunden
+    def _monitor_loop(self):
+        """
+        Hauptschleife für die Überwachung.
+
+        Wartet auf ein Signal der Ereignisquelle (udev, Mount-Tabelle, ...) und
+        prüft erst dann die Laufwerke. Ohne Ereignisquelle wird gepollt; das
+        Intervall verdoppelt sich im Leerlauf bis DRIVE_POLL_MAX_SEC.
+        """
+        poll_interval = DRIVE_POLL_MIN_SEC
+        settle_until = 0.0
+        while self.monitoring:
+            try:
+                if time.monotonic() < settle_until:
+                    timeout = DRIVE_SETTLE_POLL_SEC
+                elif self.drive_source is not None:
+                    timeout = DRIVE_EVENT_SAFETY_POLL_SEC
+                else:
+                    timeout = poll_interval
+
+                triggered = self._drive_changed.wait(timeout)
+                if not self.monitoring:
+                    break
+                self._drive_changed.clear()
+                if triggered:
+                    # udev meldet das Gerät vor dem Einhängen: kurz engmaschig nachsehen
+                    settle_until = time.monotonic() + DRIVE_SETTLE_WINDOW_SEC
+
+                changed = self._scan_drives()
+                if changed:
+                    # Laufwerk ist da, engmaschiges Nachsehen beenden
+                    settle_until = 0.0
+                if changed or triggered:
+                    poll_interval = DRIVE_POLL_MIN_SEC
+                else:
+                    poll_interval = min(poll_interval * 2, DRIVE_POLL_MAX_SEC)
 
             except Exception as e:
                 print(f"Fehler in SD-Karten Monitor: {e}")
-                time.sleep(2)
+                time.sleep(DRIVE_POLL_MIN_SEC)
 
-    def _handle_new_sd_card(self, drive):
-        """Behandelt eine neu eingesteckte SD-Karte"""
-        if self.backup_in_progress:
-            print("Backup läuft bereits, überspringe...")
-            return
+    def _start_ingest(self, drive):
+        """
+        Startet einen eigenen Ingest-Worker für die Karte, damit weitere Karten
+        (z. B. im Mehrfach-Kartenleser) nicht auf das Ende dieses Backups warten.
+
+        Returns:
+            False, wenn diese Karte bereits gesichert wird
+        """
+        with self._ingest_lock:
+            if drive in self.active_ingests:
+                print(f"Backup von {drive} läuft bereits, überspringe...")
+                return False
+            worker = threading.Thread(
+                target=self._run_ingest, args=(drive,), name=f"sd-ingest {drive}", daemon=True
+            )
+            self.active_ingests[drive] = worker
+        worker.start()
+        return True
 
+    def _run_ingest(self, drive):
+        """Thread-Ziel eines Ingest-Workers."""
+        try:
+            # Warte kurz damit das Laufwerk vollständig bereit ist
+            time.sleep(1)
+            self._handle_new_sd_card(drive)
+        finally:
+            with self._ingest_lock:
+                self.active_ingests.pop(drive, None)
+
+    def _handle_new_sd_card(self, drive):
+        """Behandelt eine neu eingesteckte SD-Karte (läuft im Ingest-Worker der Karte)"""
         settings = self.config.get_settings()
         backup_folder = settings.get("sd_backup_folder", "")
 
@@ -267,8 +378,6 @@ class SDCardMonitor:
             print(f"Ungültiger Backup-Ordner: {backup_folder}")
             return
 
-        self.backup_in_progress = True
-
         # Status-Callback: Backup gestartet
         if self.on_status_change:
             self.on_status_change('backup_started', drive)
@@ -347,24 +456,16 @@ class SDCardMonitor:
             if self.on_backup_complete:
                 self.on_backup_complete(None, False, error_message, None)
         finally:
-            # Setze backup_in_progress IMMER zurück (auch bei Fehler oder SD-Entfernung)
-            self.backup_in_progress = False
-
             # Status-Callback: Backup beendet (auch bei Fehler/Abbruch)
-            # Übergebe backup_type und Anzahl der Dateien als Data
+            # Übergebe backup_type, Anzahl der Dateien und Laufwerk als Data
             if self.on_status_change:
                 self.on_status_change('backup_finished', {
                     'type': backup_type,
-                    'file_count': len(selected_files) if selected_files else None
+                    'file_count': len(selected_files) if selected_files else None,
+                    'drive': drive,
                 })
-
-            # Entferne Drive aus known_drives, damit es beim nächsten Einstecken neu erkannt wird
-            try:
-                if drive in self.known_drives:
-                    self.known_drives.discard(drive)
-                    print(f"Drive {drive} aus known_drives entfernt")
-            except:
-                pass
+            # known_drives pflegt die Überwachungsschleife: die Karte gilt erst nach
+            # dem Herausziehen wieder als neu und wird nicht doppelt gesichert
 
     def _check_size_limit_and_select_files(self, drive, settings):
         """
@@ -429,28 +530,30 @@ class SDCardMonitor:
                 return None  # Unter Limit, normal fortfahren
 
             # Über Limit - benachrichtige Haupt-Thread via Callback
-            print(f"⚠️ Größen-Limit überschritten! Warte auf User-Entscheidung...")
-
-            # Speichere Datei-Infos für späteren Zugriff
-            self.pending_files_info = files_info
-
-            # Reset Event und Decision
-            self.size_limit_decision_event.clear()
-            self.size_limit_decision = None
-
-            # Sende Callback an Haupt-Thread
-            if self.on_status_change:
-                self.on_status_change('size_limit_exceeded', {
-                    'files_info': files_info,
-                    'total_size_mb': total_size_mb,
-                    'limit_mb': limit_mb
-                })
+            print(f"⚠️ Größen-Limit überschritten ({drive})! Warte auf User-Entscheidung...")
+
+            with self._size_limit_lock:
+                # Speichere Datei-Infos für späteren Zugriff
+                self.pending_files_info = files_info
+
+                # Reset Event und Decision
+                self.size_limit_decision_event.clear()
+                self.size_limit_decision = None
+
+                # Sende Callback an Haupt-Thread
+                if self.on_status_change:
+                    self.on_status_change('size_limit_exceeded', {
+                        'files_info': files_info,
+                        'total_size_mb': total_size_mb,
+                        'limit_mb': limit_mb,
+                        'drive': drive,
+                    })
 
-            # Warte auf User-Entscheidung (kein Timeout - User entscheidet!)
-            print("Warte auf User-Entscheidung...")
-            self.size_limit_decision_event.wait()  # Kein Timeout, warte unbegrenzt
+                # Warte auf User-Entscheidung (kein Timeout - User entscheidet!)
+                print("Warte auf User-Entscheidung...")
+                self.size_limit_decision_event.wait()  # Kein Timeout, warte unbegrenzt
 
-            decision = self.size_limit_decision
+                decision = self.size_limit_decision
             print(f"User-Entscheidung erhalten: {decision}")
 
             return decision
@@ -472,12 +575,37 @@ class SDCardMonitor:
         self.size_limit_decision_event.set()
         print(f"Size-Limit-Entscheidung gesetzt: {type(decision).__name__}")
 
+    def _record_backup_history(self, records, memo_identities=None, legacy_identities=None):
+        """Schreibt die Historie eines Backups in einer Transaktion."""
+        try:
+            if legacy_identities:
+                # Alt-Einträge (v1) derselben Dateien auf den Fingerprint v2 umschlüsseln
+                self.history.upgrade_legacy_identities(
+                    {path: memo_identities[path] for path in legacy_identities},
+                    legacy_identities,
+                )
+                legacy_identities.clear()
+            if records:
+                self.history.upsert_many(records)
+            if memo_identities:
+                # Quelle und Backup-Kopie: spätere Prüfungen ohne erneutes Hashen
+                self.history.remember_identities(memo_identities)
+        except Exception as e:
+            print(f"  ⚠️ Historie konnte nicht gespeichert werden: {e}")
+        records.clear()
+        if memo_identities:
+            memo_identities.clear()
+
 
     def _create_backup(self, drive, backup_folder, selected_files=None):
         """
         Erstellt ein Backup von der SD-Karte
         Kopiert nur vollwertige Mediendateien direkt in den Backup-Ordner (flache Struktur)
 
+        Ein Journal im Backup-Ordner hält den Fortschritt fest. Wurde ein Backup
+        derselben Karte abgebrochen (Karte gezogen, Kamera aus), wird es im selben
+        Ordner fortgesetzt und nur Fehlendes kopiert.
+
         Args:
             drive: Laufwerksbuchstabe
             backup_folder: Zielordner
@@ -494,26 +622,38 @@ class SDCardMonitor:
         backup_path = None
         copied_source_files = []
         server_cleanup = None
+        journal = None
+        # Fertige, noch nicht im Journal eingetragene Kopien: (Zieldatei, src_rel, Eintrag)
+        pending_done = []
         try:
             settings = self.config.get_settings()
-            raw_pc_name = (settings.get("sd_pc_name") or "").strip()
-            safe_pc_name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", raw_pc_name)[:32]
-            pc_part = f"[{safe_pc_name}]" if safe_pc_name else ""
-            short_hash = secrets.token_hex(2)
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            backup_dir_name = f"SD_Backup_{timestamp}{pc_part}_{short_hash}"
-            backup_path = os.path.join(backup_folder, backup_dir_name)
-
-            print(f"Starte Backup von {drive} nach {backup_path}...")
-            if selected_files:
-                print(f"  → Nur {len(selected_files)} ausgewählte Dateien werden kopiert")
-
             dcim_source = resolve_drive_dcim_path(drive)
             if not os.path.isdir(dcim_source):
                 error_msg = f"DCIM Ordner nicht gefunden: {dcim_source}"
                 print(error_msg)
                 return None, error_msg, [], None
 
+            # Dieselbe Karte erkennen: Volume-Seriennummer + Dateiliste im DCIM-Ordner
+            card_serial = self._get_volume_serial(drive)
+            card_fingerprint = compute_card_fingerprint(dcim_source, MEDIA_EXTENSIONS)
+            journal = BackupJournal.find_resumable(backup_folder, card_serial, card_fingerprint)
+            if journal:
+                backup_path = journal.backup_path
+                backup_dir_name = os.path.basename(backup_path)
+                print(f"Setze abgebrochenes Backup fort ({len(journal.completed)} Dateien bereits gesichert)")
+            else:
+                raw_pc_name = (settings.get("sd_pc_name") or "").strip()
+                safe_pc_name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", raw_pc_name)[:32]
+                pc_part = f"[{safe_pc_name}]" if safe_pc_name else ""
+                short_hash = secrets.token_hex(2)
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
+                backup_dir_name = f"SD_Backup_{timestamp}{pc_part}_{short_hash}"
+                backup_path = os.path.join(backup_folder, backup_dir_name)
+
+            print(f"Starte Backup von {drive} nach {backup_path}...")
+            if selected_files:
+                print(f"  → Nur {len(selected_files)} ausgewählte Dateien werden kopiert")
+
             os.makedirs(backup_path, exist_ok=True)
 
             valid_video_extensions = VIDEO_EXTENSIONS
@@ -548,37 +688,54 @@ class SDCardMonitor:
                 print(error_msg)
                 return None, error_msg, [], None
 
+            resumed_entries = []
+            if journal:
+                media_files, resumed_entries = self._split_resumed_files(
+                    media_files, dcim_source, journal
+                )
+
             skip_processed = settings.get("sd_skip_processed", False)
             filtered_files = []
             skipped_count = 0
             if skip_processed:
                 print("Duplikat-Filter aktiv: Prüfe bereits verarbeitete Dateien...")
+                source_identities = {}
                 for src_file in media_files:
                     ident = self.history.compute_identity(src_file)
-                    if not ident:
-                        filtered_files.append(src_file)
-                        continue
-                    identity_hash, _ = ident
-                    if self.history.contains(identity_hash):
+                    if ident:
+                        source_identities[src_file] = ident
+                self.history.upgrade_legacy_identities(source_identities)
+                source_hashes = {path: ident[0] for path, ident in source_identities.items()}
+                known_hashes = self.history.contains_many(source_hashes.values())
+                for src_file in media_files:
+                    if source_hashes.get(src_file) in known_hashes:
                         skipped_count += 1
                     else:
                         filtered_files.append(src_file)
             else:
                 filtered_files = media_files
 
-            if not filtered_files:
+            if not filtered_files and not resumed_entries:
                 error_msg = f"Keine neuen Dateien zum Sichern. Übersprungen: {skipped_count}"
                 print(error_msg)
                 return None, error_msg, [], None
 
             total_size = 0
+            file_sizes = []
             for file_path in filtered_files:
                 try:
-                    total_size += os.path.getsize(file_path)
+                    file_sizes.append(os.path.getsize(file_path))
+                    total_size += file_sizes[-1]
                 except Exception:
                     pass
+            # Nur bei passender Größe zu einem Alt-Eintrag zusätzlich Identität v1 mitrechnen
+            legacy_sizes = self.history.legacy_sizes(file_sizes)
             total_mb = total_size / (1024 * 1024)
             print(f"Gefunden: {len(media_files)} Mediendateien ({total_mb:.1f} MB), neu: {len(filtered_files)}, übersprungen: {skipped_count}")
+            if resumed_entries:
+                print(f"  → {len(resumed_entries)} Dateien aus dem abgebrochenen Backup übernommen")
+            if journal is None:
+                journal = BackupJournal.create(backup_path, card_serial, card_fingerprint)
 
             server_backup_enabled = bool(settings.get("sd_server_backup_enabled", False))
             server_backup_mode = settings.get("sd_server_backup_mode", "direct_dual_write")
@@ -601,72 +758,141 @@ class SDCardMonitor:
             copied_size = 0
             copied_count = 0
             start_time = time.time()
-            used_filenames = set()
+            # Namen aus dem abgebrochenen Backup bleiben reserviert
+            used_filenames = {entry["dest"].lower() for entry in resumed_entries}
+            used_filenames.update(dest.lower() for dest, _ in journal.partials.values() if dest)
             local_to_server_map = []
-            manifest_entries = []
+            # Übernommene Dateien fehlen evtl. noch auf dem Server (Abbruch vor dem Upload)
+            resumed_uploads = [
+                (os.path.join(backup_path, entry["dest"]), entry["dest"]) for entry in resumed_entries
+            ]
+            manifest_entries = list(resumed_entries)
+            copied_source_files = [entry["src"] for entry in resumed_entries]
+            history_records = []
+            memo_identities = {}
+            legacy_identities = {}
+            last_journal_sync = time.monotonic()
 
             for src_file in filtered_files:
+                src_rel = relative_card_path(src_file, dcim_source)
+                dst_filename = None
                 try:
                     original_name = os.path.basename(src_file)
-                    dst_filename = original_name
-                    counter = 1
-                    name_without_ext, ext = os.path.splitext(original_name)
-                    while dst_filename.lower() in used_filenames:
-                        dst_filename = f"{name_without_ext}_{counter}{ext}"
-                        counter += 1
-                    used_filenames.add(dst_filename.lower())
+                    partial_dest, partial_offset = journal.partials.get(src_rel, (None, 0))
+                    if partial_dest:
+                        # Abgebrochene Kopie unter demselben Namen fortsetzen
+                        dst_filename = partial_dest
+                    else:
+                        dst_filename = original_name
+                        counter = 1
+                        name_without_ext, ext = os.path.splitext(original_name)
+                        while dst_filename.lower() in used_filenames:
+                            dst_filename = f"{name_without_ext}_{counter}{ext}"
+                            counter += 1
+                        used_filenames.add(dst_filename.lower())
 
                     local_dst_file = os.path.join(backup_path, dst_filename)
                     file_size = os.path.getsize(src_file)
-                    shutil.copy2(src_file, local_dst_file)
-                    copied_source_files.append(src_file)
-                    manifest_entries.append({
-                        "dest": dst_filename,
-                        "src": src_file,
-                        "media_type": get_media_type_from_filename(original_name),
-                    })
-                    copied_size += file_size
-                    copied_count += 1
-
-                    if server_backup_enabled and server_backup_mode == "direct_dual_write" and server_backup_path:
-                        try:
-                            server_dst_file = os.path.join(server_backup_path, dst_filename)
-                            shutil.copy2(src_file, server_dst_file)
-                            server_success = True
-                        except Exception as server_copy_error:
+                    # Identität und Inhalts-Hash entstehen beim Kopieren, die Karte wird nur einmal gelesen
+                    hasher = IdentityHasher(file_size, legacy=file_size in legacy_sizes)
+                    dual_write = bool(
+                        server_backup_enabled and server_backup_mode == "direct_dual_write" and server_backup_path
+                    )
+                    resume_offset = 0
+                    if partial_dest and not dual_write:
+                        # Bereits gesicherten Anfang nur von der lokalen Platte in den Hash lesen
+                        resume_offset = self._resumable_offset(local_dst_file, partial_offset, file_size)
+                        if resume_offset:
+                            self._hash_existing_prefix(local_dst_file, resume_offset, hasher)
+                    if dual_write:
+                        # Parallel lokal + auf den Server schreiben
+                        server_dst_file = os.path.join(server_backup_path, dst_filename)
+                        with self.io_scheduler.reserve(backup_path, server_backup_path):
+                            server_errors = tee_copy_file(
+                                src_file, local_dst_file, [server_dst_file], on_block=hasher.update
+                            )
+                        if server_errors:
                             server_warning_message = (
-                                f"Server-Backup teilweise fehlgeschlagen: {server_copy_error}"
+                                f"Server-Backup teilweise fehlgeschlagen: {server_errors[server_dst_file]}"
                             )
                             server_backup_enabled = False
-                    elif server_backup_enabled and server_backup_mode == "local_then_server":
-                        local_to_server_map.append((local_dst_file, dst_filename))
+                        else:
+                            server_success = True
+                    else:
+                        # Andere Karten, die auf dieselbe Platte sichern, warten hier
+                        with self.io_scheduler.reserve(backup_path):
+                            tee_copy_file(
+                                src_file, local_dst_file, on_block=hasher.update, start_offset=resume_offset
+                            )
+                        if server_backup_enabled and server_backup_mode == "local_then_server":
+                            local_to_server_map.append((local_dst_file, dst_filename))
+                    identity_hash, size_bytes = hasher.identity()
+                    content_hash = hasher.content_hash()
+                    media_type = get_media_type_from_filename(original_name)
+                    journal_entry = {
+                        "dest": dst_filename,
+                        "media_type": media_type,
+                        "size_bytes": size_bytes,
+                        "identity_hash": identity_hash,
+                        "identity_version": IDENTITY_VERSION,
+                        "content_hash": content_hash,
+                    }
+                    pending_done.append((local_dst_file, src_rel, journal_entry))
+                    if (len(pending_done) >= JOURNAL_SYNC_FILES
+                            or time.monotonic() - last_journal_sync >= JOURNAL_SYNC_SEC):
+                        self._flush_completed(journal, pending_done)
+                        last_journal_sync = time.monotonic()
+                    copied_source_files.append(src_file)
+                    manifest_entries.append(dict(journal_entry, src=src_file))
+                    copied_size += file_size
+                    copied_count += 1
 
-                    ident = self.history.compute_identity(src_file)
-                    if ident:
-                        identity_hash, size_bytes = ident
-                        media_type = get_media_type_from_filename(original_name)
-                        self.history.upsert(
-                            identity_hash, original_name, size_bytes, media_type,
-                            backed_up_at=time.strftime('%Y-%m-%dT%H:%M:%S')
-                        )
+                    memo_identities[src_file] = (identity_hash, size_bytes)
+                    memo_identities[local_dst_file] = (identity_hash, size_bytes)
+                    if hasher.legacy_identity():
+                        legacy_identities[src_file] = hasher.legacy_identity()
+                    history_records.append(MediaRecord(
+                        identity_hash, original_name, size_bytes, media_type,
+                        backed_up_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        content_hash=content_hash,
+                    ))
 
                     if self.on_progress_update and total_size > 0:
                         current_mb = copied_size / (1024 * 1024)
                         elapsed_time = time.time() - start_time
                         speed_mbps = current_mb / elapsed_time if elapsed_time > 0 else 0
-                        self.on_progress_update(current_mb, total_mb, speed_mbps)
+                        self.on_progress_update(current_mb, total_mb, speed_mbps, drive)
 
                 except (IOError, OSError, FileNotFoundError) as e:
-                    error_msg = f"SD-Karte wurde während des Backups entfernt: {str(e)}"
+                    self._flush_completed(journal, pending_done)
+                    if dst_filename:
+                        self._record_partial_copy(
+                            journal, src_rel, dst_filename, os.path.join(backup_path, dst_filename)
+                        )
+                    error_msg = (
+                        f"SD-Karte wurde während des Backups entfernt: {str(e)}\n"
+                        f"Beim erneuten Einstecken derselben Karte wird das Backup fortgesetzt."
+                    )
                     print(f"  ⚠️ {error_msg}")
+                    # Bereits kopierte Dateien trotzdem in der Historie vermerken
+                    self._record_backup_history(history_records, memo_identities, legacy_identities)
                     return None, error_msg, copied_source_files, None
                 except Exception as e:
                     print(f"  ⚠️ Fehler beim Kopieren von {src_file}: {e}")
 
-            if server_backup_enabled and server_backup_mode == "local_then_server" and server_backup_path:
-                for local_file, dst_filename in local_to_server_map:
+            if server_backup_enabled and server_backup_path:
+                uploads = list(resumed_uploads)
+                if server_backup_mode == "local_then_server":
+                    uploads += local_to_server_map
+                for local_file, dst_filename in uploads:
+                    server_file = os.path.join(server_backup_path, dst_filename)
                     try:
-                        shutil.copy2(local_file, os.path.join(server_backup_path, dst_filename))
+                        if self._same_file_size(local_file, server_file):
+                            # Beim abgebrochenen Versuch bereits übertragen
+                            server_success = True
+                            continue
+                        with self.io_scheduler.reserve(server_backup_path):
+                            shutil.copy2(local_file, server_file)
                         server_success = True
                     except Exception as server_copy_error:
                         server_warning_message = (
@@ -678,6 +904,8 @@ class SDCardMonitor:
                 # Fall: aktiv, aber keine Datei kopiert (z. B. keine neuen Dateien). Kein harter Fehler.
                 server_success = False
 
+            self._flush_completed(journal, pending_done)
+            self._record_backup_history(history_records, memo_identities, legacy_identities)
             print(f"Backup abgeschlossen: {copied_count} neue Mediendateien kopiert")
             if manifest_entries:
                 session_active = resolve_timelapse_session_active_for_paths(
@@ -690,6 +918,10 @@ class SDCardMonitor:
                     manifest_entries,
                     timelapse_session_active=session_active,
                 )
+            try:
+                journal.mark_complete()
+            except OSError as e:
+                print(f"  ⚠️ Backup-Journal konnte nicht abgeschlossen werden: {e}")
             backup_info = {
                 "server_backup_enabled": bool(settings.get("sd_server_backup_enabled", False)),
                 "server_backup_mode": server_backup_mode,
@@ -702,7 +934,10 @@ class SDCardMonitor:
         except Exception as e:
             error_msg = f"Fehler beim Erstellen des Backups: {str(e)}"
             print(error_msg)
-            if backup_path and os.path.isdir(backup_path):
+            if journal:
+                self._flush_completed(journal, pending_done)
+            # Ordner mit bereits gesicherten Dateien bleibt zum Fortsetzen erhalten
+            if backup_path and os.path.isdir(backup_path) and not (journal and journal.completed):
                 try:
                     shutil.rmtree(backup_path)
                 except Exception:
@@ -715,6 +950,114 @@ class SDCardMonitor:
                 except Exception:
                     pass
 
+    def _split_resumed_files(self, media_files, dcim_source, journal):
+        """
+        Trennt Dateien ab, die laut Journal bereits vollständig gesichert sind.
+
+        Returns:
+            (noch zu kopierende Dateien, Manifest-Einträge der übernommenen Dateien)
+        """
+        remaining = []
+        resumed = []
+        for src_file in media_files:
+            entry = journal.completed.get(relative_card_path(src_file, dcim_source))
+            if entry and self._same_file_size(
+                os.path.join(journal.backup_path, entry.get("dest", "")), entry.get("size_bytes")
+            ):
+                resumed.append(dict(entry, src=src_file))
+            else:
+                remaining.append(src_file)
+        return remaining, resumed
+
+    @staticmethod
+    def _same_file_size(path, other):
+        """True, wenn path existiert und so groß ist wie other (Pfad oder Größe in Bytes)."""
+        try:
+            expected = other if isinstance(other, int) else os.path.getsize(other)
+            return os.path.getsize(path) == expected
+        except (OSError, TypeError):
+            return False
+
+    @staticmethod
+    def _resumable_offset(local_dst_file, offset, file_size):
+        """Offset, ab dem eine abgebrochene Kopie fortgesetzt werden kann (0 = neu kopieren)."""
+        if not 0 < offset < file_size:
+            return 0
+        try:
+            return offset if os.path.getsize(local_dst_file) >= offset else 0
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _hash_existing_prefix(path, length, hasher, block_size=1024 * 1024):
+        """Speist die ersten length Bytes einer vorhandenen Teilkopie in den Hasher."""
+        with open(path, "rb") as handle:
+            remaining = length
+            while remaining:
+                block = handle.read(min(block_size, remaining))
+                if not block:
+                    raise OSError(f"Teilkopie kürzer als erwartet: {path}")
+                hasher.update(memoryview(block))
+                remaining -= len(block)
+
+    @staticmethod
+    def _fsync_file(path):
+        """Schreibt eine Datei dauerhaft auf die Platte."""
+        with open(path, "r+b") as handle:
+            os.fsync(handle.fileno())
+
+    def _flush_completed(self, journal, pending_done):
+        """
+        Schreibt fertige Kopien per fsync dauerhaft und trägt sie danach gemeinsam
+        im Journal ein. Nicht gesicherte Dateien bleiben draußen und werden beim
+        Fortsetzen erneut kopiert.
+        """
+        if not pending_done:
+            return
+        entries = []
+        for local_dst_file, src_rel, journal_entry in pending_done:
+            try:
+                self._fsync_file(local_dst_file)
+            except OSError as e:
+                print(f"  ⚠️ Kopie konnte nicht dauerhaft geschrieben werden ({local_dst_file}): {e}")
+                continue
+            entries.append((src_rel, journal_entry))
+        pending_done.clear()
+        try:
+            journal.record_completed_many(entries)
+        except OSError as e:
+            print(f"  ⚠️ Backup-Journal konnte nicht geschrieben werden: {e}")
+
+    def _record_partial_copy(self, journal, src_rel, dst_filename, local_dst_file):
+        """Hält nach einem Abbruch fest, wie viel der aktuellen Datei bereits gesichert ist."""
+        try:
+            if os.path.isfile(local_dst_file):
+                self._fsync_file(local_dst_file)
+                journal.record_partial(src_rel, dst_filename, os.path.getsize(local_dst_file))
+        except OSError as e:
+            print(f"  ⚠️ Teilkopie konnte nicht im Journal vermerkt werden: {e}")
+
+    def _get_volume_serial(self, drive):
+        """Seriennummer bzw. UUID des Dateisystems der Karte (None, wenn nicht ermittelbar)."""
+        try:
+            if sys.platform == "win32" and WINDOWS_API_AVAILABLE:
+                serial = win32api.GetVolumeInformation(drive + "\\")[1]
+                return f"{serial & 0xFFFFFFFF:08X}"
+            if sys.platform == "linux" and PSUTIL_AVAILABLE:
+                device = next(
+                    (part.device for part in psutil.disk_partitions(all=False) if part.mountpoint == drive),
+                    None,
+                )
+                by_uuid = "/dev/disk/by-uuid"
+                if device and os.path.isdir(by_uuid):
+                    device = os.path.realpath(device)
+                    for uuid in os.listdir(by_uuid):
+                        if os.path.realpath(os.path.join(by_uuid, uuid)) == device:
+                            return uuid
+        except Exception:
+            pass
+        return None
+
     def _prepare_server_backup_target(self, server_target_root, backup_dir_name, settings):
         """Bereitet den Zielordner für optionales Server-Backup vor."""
         normalized_path, is_network_path, _ = normalize_server_path(server_target_root)
@@ -874,16 +1217,12 @@ class SDCardMonitor:
 
     def manual_backup(self, drive_letter=None):
         """
-        Führt ein manuelles Backup durch
+        Startet ein manuelles Backup (im Ingest-Worker der Karte)
 
         Args:
             drive_letter: Optional - spezifisches Laufwerk (z.B. "E:")
                          Wenn None, wird das erste gefundene Action-Cam Laufwerk verwendet
         """
-        if self.backup_in_progress:
-            print("Backup läuft bereits")
-            return False
-
         # Finde Laufwerk
         if drive_letter:
             drives = [drive_letter]
@@ -897,5 +1236,4 @@ class SDCardMonitor:
 
         # Verwende erstes gefundenes Laufwerk
         drive = drives[0]
-        self._handle_new_sd_card(drive)
-        return True
+        return self._start_ingest(drive)
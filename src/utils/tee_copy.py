@@ -0,0 +1,209 @@
+"""
+Kopieren einer Quelle in mehrere Ziele mit nur einem Lesevorgang.
+
+Die Quelle (z. B. SD-Karte) wird blockweise in wiederverwendbare Puffer gelesen;
+je Ziel schreibt ein eigener Thread aus einer begrenzten Queue. So wird jede
+Datei nur einmal von der Karte gelesen, auch wenn sie lokal und auf den
+Server geschrieben wird. Fehler oder Hänger eines Zusatzziels (Server) führen
+nur zum Abschalten dieses Ziels; die lokale Kopie läuft weiter.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_QUEUE_DEPTH = 8
+# Zusatzziel, das so lange keinen Block annimmt, gilt als ausgefallen
+DEFAULT_STALL_TIMEOUT_SEC = 30.0
+
+_END = None
+
+
+class _Block:
+    __slots__ = ("buffer", "length", "refs")
+
+    def __init__(self, buffer: bytearray, length: int, refs: int):
+        self.buffer = buffer
+        self.length = length
+        self.refs = refs
+
+
+class _DestinationWriter:
+    """Schreibt Blöcke aus seiner Queue in eine Zieldatei (eigener Thread)."""
+
+    def __init__(self, path: str, depth: int, release: Callable[[_Block], None], offset: int = 0):
+        self.path = path
+        self.offset = offset
+        self.queue: "queue.Queue" = queue.Queue(maxsize=depth)
+        self.error: Optional[BaseException] = None
+        self._release = release
+        self._thread = threading.Thread(target=self._run, name="tee-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def _run(self) -> None:
+        handle = None
+        try:
+            if self.offset:
+                # Fortsetzen: vorhandene Bytes behalten, Rest ab offset überschreiben
+                handle = open(self.path, "r+b")
+                handle.seek(self.offset)
+                handle.truncate()
+            else:
+                handle = open(self.path, "wb")
+        except OSError as e:
+            self.error = e
+        while True:
+            block = self.queue.get()
+            if block is _END:
+                break
+            if self.error is None:
+                try:
+                    handle.write(memoryview(block.buffer)[:block.length])
+                except OSError as e:
+                    self.error = e
+            # Puffer auch nach einem Fehler freigeben, damit der Leser nicht blockiert
+            self._release(block)
+        if handle is not None:
+            try:
+                handle.close()
+            except OSError as e:
+                if self.error is None:
+                    self.error = e
+
+    def join(self) -> None:
+        self._thread.join()
+
+
+def tee_copy_file(
+    src: str,
+    primary_dst: str,
+    secondary_dsts: Sequence[str] = (),
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
+    stall_timeout: float = DEFAULT_STALL_TIMEOUT_SEC,
+    on_block: Optional[Callable[[memoryview], None]] = None,
+    start_offset: int = 0,
+) -> Dict[str, BaseException]:
+    """
+    Kopiert src nach primary_dst und alle secondary_dsts (inkl. Zeitstempel wie copy2).
+
+    on_block erhält jeden gelesenen Block (z. B. für Hash oder Fortschritt).
+    Lese- oder Schreibfehler am Hauptziel werden als OSError weitergegeben;
+    die bis dahin gelesenen Blöcke stehen dann vollständig in primary_dst,
+    angefangene Zusatzziele werden gelöscht.
+    start_offset > 0 setzt eine abgebrochene Kopie in primary_dst fort
+    (nur ohne Zusatzziele; on_block erhält dann nur die restlichen Blöcke).
+
+    Returns:
+        Zusatzziele, die fehlgeschlagen sind: Pfad -> Fehler
+    """
+    if start_offset and secondary_dsts:
+        raise ValueError("Fortsetzen ist nur ohne Zusatzziele möglich")
+    free_buffers: "queue.Queue" = queue.Queue()
+    release_lock = threading.Lock()
+
+    def release(block: _Block) -> None:
+        with release_lock:
+            block.refs -= 1
+            done = block.refs == 0
+        if done:
+            free_buffers.put(block.buffer)
+
+    primary = _DestinationWriter(primary_dst, queue_depth, release, start_offset)
+    secondaries: List[_DestinationWriter] = [
+        _DestinationWriter(path, queue_depth, release) for path in secondary_dsts
+    ]
+    failed: Dict[str, BaseException] = {}
+
+    def mark_failed(writer: _DestinationWriter, error: BaseException) -> None:
+        if writer.path not in failed:
+            failed[writer.path] = writer.error or error
+            print(f"Zusatzziel abgeschaltet ({writer.path}): {failed[writer.path]}")
+
+    copied = False
+    try:
+        with open(src, "rb") as source:
+            if start_offset:
+                source.seek(start_offset)
+            while True:
+                if primary.failed:
+                    raise primary.error
+                try:
+                    buffer = free_buffers.get_nowait()
+                except queue.Empty:
+                    # Puffer hängen bei einem abgeschalteten Ziel fest: neu anlegen.
+                    # Die begrenzten Queues halten die Anzahl trotzdem klein.
+                    buffer = bytearray(block_size)
+                length = source.readinto(buffer)
+                if not length:
+                    free_buffers.put(buffer)
+                    break
+                if on_block is not None:
+                    on_block(memoryview(buffer)[:length])
+
+                active = [w for w in secondaries if w.path not in failed and not w.failed]
+                for writer in secondaries:
+                    if writer.failed:
+                        mark_failed(writer, writer.error)
+                block = _Block(buffer, length, 1 + len(active))
+                primary.queue.put(block)
+                for writer in active:
+                    try:
+                        writer.queue.put(block, timeout=stall_timeout)
+                    except queue.Full:
+                        mark_failed(writer, TimeoutError(
+                            f"Ziel reagiert seit {stall_timeout:.0f} s nicht"
+                        ))
+                        release(block)
+        copied = True
+    finally:
+        for writer in [primary] + secondaries:
+            _put_end(writer, stall_timeout)
+        primary.join()
+        for writer in secondaries:
+            if writer.path not in failed:
+                writer.join()
+        if not copied or primary.failed:
+            # Lese- oder Hauptzielfehler: keine halben Kopien auf den Zusatzzielen lassen
+            for writer in secondaries:
+                _remove_partial(writer.path)
+
+    if primary.failed:
+        raise primary.error
+    shutil.copystat(src, primary_dst)
+
+    for writer in secondaries:
+        if writer.path in failed or writer.failed:
+            mark_failed(writer, writer.error)
+            _remove_partial(writer.path)
+            continue
+        try:
+            shutil.copystat(src, writer.path)
+        except OSError:
+            pass
+    return failed
+
+
+def _put_end(writer: _DestinationWriter, timeout: float) -> None:
+    try:
+        writer.queue.put(_END, timeout=timeout)
+    except queue.Full:
+        # Hängender Writer: Thread ist Daemon und wird nicht weiter abgewartet
+        pass
+
+
+def _remove_partial(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
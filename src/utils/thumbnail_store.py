@@ -0,0 +1,398 @@
+"""
+Persistenter Thumbnail-Speicher (CONFIG_DIR/thumbs).
+
+Thumbnails werden nach Datei-Identität (Fingerprint v2 der Medien-Historie,
+samt deren stat-basiertem Memo) und Größenstufe abgelegt, damit dieselbe Datei
+auf SD-Karte, Backup oder im Arbeitsordner denselben Eintrag trifft. Ein kleiner
+SQLite-Index führt Größe und letzte Nutzung; ältere Einträge werden über dem
+Byte-Budget verdrängt (LRU).
+Dieselbe Datenbank hält die Foto-Metadaten der Vorschau (Auflösung, eingebettete
+Aufnahmezeit) unter derselben Datei-Identität.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from src.utils.constants import CONFIG_DIR
+from src.utils.media_history import IDENTITY_V2_PREFIX, MediaHistoryStore
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+    features = None
+
+THUMBS_DIR = os.path.join(CONFIG_DIR, 'thumbs')
+DEFAULT_THUMB_STORE_BUDGET_MB = 256
+
+# Gespeicherte Kantenlängen; Anfragen werden auf die nächstgrößere Stufe gerundet
+THUMB_SIZE_BUCKETS = (128, 256, 512)
+# Höchstzahl im Speicher gemerkter Identitäten (LRU), reicht für mehrere volle Karten
+_IDENTITY_MEMO_MAX_ENTRIES = 8192
+# Nach Verdrängung auf diesen Anteil des Budgets zurück
+_EVICT_TARGET_RATIO = 0.9
+# Letzte Nutzung gesammelt schreiben: spätestens nach so vielen Sekunden bzw. Einträgen
+_TOUCH_FLUSH_SEC = 5.0
+_TOUCH_FLUSH_MAX = 256
+# Foto-Metadaten: höchstens so viele Einträge (LRU), je Eintrag nur einige Dutzend Bytes
+_PHOTO_META_MAX_ROWS = 100_000
+_THUMB_QUALITY = 82
+
+
+def size_bucket(max_size: int) -> int:
+    for bucket in THUMB_SIZE_BUCKETS:
+        if max_size <= bucket:
+            return bucket
+    return THUMB_SIZE_BUCKETS[-1]
+
+
+class ThumbnailStore:
+    """Thumbnail-Cache auf der Festplatte, gemeinsam für Import, Vorschau und SD-Dialog."""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, root_dir: str = THUMBS_DIR,
+                 budget_bytes: int = DEFAULT_THUMB_STORE_BUDGET_MB * 1024 * 1024,
+                 compute_identity: Optional[Callable[[str], Optional[Tuple[str, int]]]] = None):
+        self.root_dir = root_dir
+        self.budget_bytes = max(0, int(budget_bytes))
+        os.makedirs(root_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Standard: MediaHistoryStore.compute_identity (erst beim ersten Zugriff geöffnet)
+        self._compute_identity = compute_identity
+        # (Pfad, Größe, mtime_ns) -> Identität; erspart die Memo-Abfrage in der Historie-DB
+        self._identity_memo: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._identity_lock = threading.Lock()
+        # thumb_key -> letzte Nutzung, noch nicht in der DB (kein Commit je Treffer)
+        self._pending_touches: Dict[str, float] = {}
+        # Dasselbe für photo_meta (identity -> letzte Nutzung)
+        self._pending_meta_touches: Dict[str, float] = {}
+        self._last_touch_flush = time.monotonic()
+        self._use_webp = bool(features and features.check('webp'))
+        self.conn = sqlite3.connect(os.path.join(root_dir, 'index.db'), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL;')
+        self.conn.execute('PRAGMA synchronous=NORMAL;')
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thumbs (
+                thumb_key TEXT PRIMARY KEY,
+                rel_path TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_thumbs_last_used ON thumbs(last_used);")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS photo_meta (
+                identity TEXT PRIMARY KEY,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                capture_epoch REAL,
+                last_used REAL NOT NULL DEFAULT 0
+            );
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(photo_meta)")}
+        if "last_used" not in columns:
+            # Migration: Foto-Metadaten ohne Nutzungszeit werden zuerst verdrängt
+            self.conn.execute("ALTER TABLE photo_meta ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_photo_meta_last_used ON photo_meta(last_used);")
+        self.conn.commit()
+        row = self.conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM thumbs").fetchone()
+        self._total_bytes = int(row[0])
+        self._meta_rows = int(self.conn.execute("SELECT COUNT(*) FROM photo_meta").fetchone()[0])
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = ThumbnailStore()
+            return cls._instance
+
+    def close(self):
+        try:
+            with self._lock:
+                self._flush_touches_locked()
+                self.conn.commit()
+            self.conn.close()
+        except Exception:
+            pass
+
+    # ---------------- Identity -----------------
+
+    def file_identity(self, path: str) -> Optional[str]:
+        """Fingerprint v2 der Datei (wie MediaHistoryStore.compute_identity) oder None."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        memo_key = (os.path.normcase(os.path.abspath(path)), st.st_size, st.st_mtime_ns)
+        with self._identity_lock:
+            identity = self._identity_memo.get(memo_key)
+            if identity is not None:
+                self._identity_memo.move_to_end(memo_key)
+                return identity
+        compute_identity = self._compute_identity or MediaHistoryStore.instance().compute_identity
+        result = compute_identity(path)
+        if result is None:
+            return None
+        identity = result[0]
+        with self._identity_lock:
+            self._identity_memo[memo_key] = identity
+            while len(self._identity_memo) > _IDENTITY_MEMO_MAX_ENTRIES:
+                self._identity_memo.popitem(last=False)
+        return identity
+
+    # ---------------- Lesen/Schreiben -----------------
+
+    def get(self, path: str, max_size: int):
+        """Gespeichertes Thumbnail (max. max_size px) oder None."""
+        if Image is None:
+            return None
+        identity = self.file_identity(path)
+        if identity is None:
+            return None
+        return self._fit(self._load(f"{identity}_{size_bucket(max_size)}"), max_size)
+
+    def put(self, path: str, max_size: int, img) -> None:
+        """Speichert ein Thumbnail, das für size_bucket(max_size) erzeugt wurde."""
+        if Image is None or img is None:
+            return
+        identity = self.file_identity(path)
+        if identity is not None:
+            self._store(f"{identity}_{size_bucket(max_size)}", img)
+
+    def get_or_build(self, path: str, max_size: int,
+                     builder: Callable[[int], Optional[object]]):
+        """
+        Liefert ein PIL-Thumbnail (max. max_size px) aus dem Speicher oder erzeugt es.
+
+        Args:
+            builder: Erzeugt das Thumbnail für die Größenstufe (Kantenlänge) oder None.
+        """
+        if Image is None:
+            return None
+        bucket = size_bucket(max_size)
+        identity = self.file_identity(path)
+        if identity is None:
+            return self._fit(builder(max_size), max_size)
+
+        thumb_key = f"{identity}_{bucket}"
+        img = self._load(thumb_key)
+        if img is None:
+            img = builder(bucket)
+            if img is None:
+                return None
+            self._store(thumb_key, img)
+        return self._fit(img, max_size)
+
+    @staticmethod
+    def _fit(img, max_size: int):
+        if img is not None and max(img.size) > max_size:
+            img.thumbnail((max_size, max_size), Image.LANCZOS)
+        return img
+
+    def _load(self, thumb_key: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT rel_path, size_bytes FROM thumbs WHERE thumb_key=?", (thumb_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        file_path = os.path.join(self.root_dir, row[0])
+        try:
+            with Image.open(file_path) as img:
+                img.load()
+                result = img.copy()
+        except Exception:
+            self._forget(thumb_key, row[1], file_path)
+            return None
+        with self._lock:
+            self._pending_touches[thumb_key] = time.time()
+            self._maybe_flush_touches_locked()
+        return result
+
+    def _maybe_flush_touches_locked(self) -> None:
+        pending = len(self._pending_touches) + len(self._pending_meta_touches)
+        if pending >= _TOUCH_FLUSH_MAX or time.monotonic() - self._last_touch_flush >= _TOUCH_FLUSH_SEC:
+            self._flush_touches_locked()
+            self.conn.commit()
+
+    def _flush_touches_locked(self) -> None:
+        """Schreibt die gesammelten Nutzungszeiten (Lock gehalten, Commit durch Aufrufer)."""
+        if self._pending_touches:
+            self.conn.executemany(
+                "UPDATE thumbs SET last_used=? WHERE thumb_key=?",
+                [(last_used, thumb_key) for thumb_key, last_used in self._pending_touches.items()],
+            )
+            self._pending_touches.clear()
+        if self._pending_meta_touches:
+            self.conn.executemany(
+                "UPDATE photo_meta SET last_used=? WHERE identity=?",
+                [(last_used, identity) for identity, last_used in self._pending_meta_touches.items()],
+            )
+            self._pending_meta_touches.clear()
+        self._last_touch_flush = time.monotonic()
+
+    def _store(self, thumb_key: str, img) -> None:
+        ext = 'webp' if self._use_webp else 'jpg'
+        # Unterordner nach den ersten Hash-Zeichen (ohne Versionspräfix)
+        rel_path = os.path.join(thumb_key[len(IDENTITY_V2_PREFIX):][:2], f"{thumb_key}.{ext}")
+        file_path = os.path.join(self.root_dir, rel_path)
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            if self._use_webp:
+                out = img if img.mode in ('RGB', 'RGBA') else img.convert('RGB')
+                out.save(tmp_path, format='WEBP', quality=_THUMB_QUALITY, method=4)
+            else:
+                out = img if img.mode == 'RGB' else img.convert('RGB')
+                out.save(tmp_path, format='JPEG', quality=_THUMB_QUALITY)
+            os.replace(tmp_path, file_path)
+            size_bytes = os.path.getsize(file_path)
+        except Exception as e:
+            print(f"Thumbnail-Speicher: Schreiben fehlgeschlagen ({thumb_key}): {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            old = self.conn.execute(
+                "SELECT size_bytes FROM thumbs WHERE thumb_key=?", (thumb_key,)
+            ).fetchone()
+            if old:
+                self._total_bytes -= int(old[0])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO thumbs (thumb_key, rel_path, size_bytes, last_used) "
+                "VALUES (?,?,?,?)",
+                (thumb_key, rel_path, size_bytes, time.time()),
+            )
+            self._total_bytes += size_bytes
+            # Ohnehin ein Commit: gesammelte Nutzungszeiten mitschreiben, damit die
+            # Verdrängung die aktuelle Reihenfolge sieht
+            self._flush_touches_locked()
+            if self._total_bytes > self.budget_bytes:
+                self._evict_locked()
+            self.conn.commit()
+
+    def _forget(self, thumb_key: str, size_bytes: int, file_path: str) -> None:
+        with self._lock:
+            self._pending_touches.pop(thumb_key, None)
+            cur = self.conn.execute("DELETE FROM thumbs WHERE thumb_key=?", (thumb_key,))
+            if cur.rowcount:
+                self._total_bytes -= int(size_bytes)
+            self.conn.commit()
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+    def _evict_locked(self) -> None:
+        """Löscht die am längsten ungenutzten Einträge bis unter das Ziel (Lock gehalten)."""
+        target = int(self.budget_bytes * _EVICT_TARGET_RATIO)
+        rows = self.conn.execute(
+            "SELECT thumb_key, rel_path, size_bytes FROM thumbs ORDER BY last_used ASC"
+        ).fetchall()
+        removed = []
+        for thumb_key, rel_path, size_bytes in rows:
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(os.path.join(self.root_dir, rel_path))
+            except OSError:
+                pass
+            removed.append((thumb_key,))
+            self._total_bytes -= int(size_bytes)
+        if removed:
+            self.conn.executemany("DELETE FROM thumbs WHERE thumb_key=?", removed)
+            print(f"Thumbnail-Speicher: {len(removed)} alte Einträge verdrängt")
+
+    # ---------------- Foto-Metadaten -----------------
+
+    def get_photo_metadata(self, path: str) -> Optional[Tuple[int, int, Optional[float]]]:
+        """(Breite, Höhe, eingebettete Aufnahmezeit oder None) oder None, wenn unbekannt."""
+        identity = self.file_identity(path)
+        if identity is None:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT width, height, capture_epoch FROM photo_meta WHERE identity=?",
+                (identity,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._pending_meta_touches[identity] = time.time()
+            self._maybe_flush_touches_locked()
+        return int(row[0]), int(row[1]), row[2]
+
+    def put_photo_metadata(self, path: str, width: int, height: int,
+                           capture_epoch: Optional[float]) -> None:
+        identity = self.file_identity(path)
+        if identity is None:
+            return
+        with self._lock:
+            exists = self.conn.execute(
+                "SELECT 1 FROM photo_meta WHERE identity=?", (identity,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO photo_meta (identity, width, height, capture_epoch, last_used) "
+                "VALUES (?,?,?,?,?)",
+                (identity, int(width), int(height), capture_epoch, time.time()),
+            )
+            self._pending_meta_touches.pop(identity, None)
+            if not exists:
+                self._meta_rows += 1
+                if self._meta_rows > _PHOTO_META_MAX_ROWS:
+                    self._evict_meta_locked()
+            self.conn.commit()
+
+    def _evict_meta_locked(self) -> None:
+        """Löscht die am längsten ungenutzten Foto-Metadaten bis unter das Ziel (Lock gehalten)."""
+        self._flush_touches_locked()
+        excess = self._meta_rows - int(_PHOTO_META_MAX_ROWS * _EVICT_TARGET_RATIO)
+        cur = self.conn.execute(
+            "DELETE FROM photo_meta WHERE identity IN "
+            "(SELECT identity FROM photo_meta ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        )
+        self._meta_rows -= max(0, cur.rowcount)
+
+    def clear(self) -> None:
+        """Löscht alle gespeicherten Thumbnails und Foto-Metadaten."""
+        with self._lock:
+            rows = self.conn.execute("SELECT rel_path FROM thumbs").fetchall()
+            for (rel_path,) in rows:
+                try:
+                    os.remove(os.path.join(self.root_dir, rel_path))
+                except OSError:
+                    pass
+            self.conn.execute("DELETE FROM thumbs")
+            self.conn.execute("DELETE FROM photo_meta")
+            self.conn.commit()
+            self._pending_touches.clear()
+            self._pending_meta_touches.clear()
+            self._meta_rows = 0
+            self._total_bytes = 0
+
+
+def get_or_build_thumbnail(path: str, max_size: int,
+                           builder: Callable[[int], Optional[object]]):
+    """Wie ThumbnailStore.get_or_build; ohne nutzbaren Speicher direkt über builder."""
+    try:
+        store = ThumbnailStore.instance()
+    except Exception as e:
+        print(f"Thumbnail-Speicher nicht verfügbar: {e}")
+        img = builder(max_size)
+        return ThumbnailStore._fit(img, max_size) if Image is not None else img
+    return store.get_or_build(path, max_size, builder)
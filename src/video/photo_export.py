@@ -0,0 +1,201 @@
+"""
+Foto-Export in die Kundenordner (Handcam_Foto / Outside_Foto / Preview_Foto).
+
+Fotos werden in einem Worker-Pool kopiert bzw. mit Wasserzeichen gerendert.
+Ein zweites Ziel auf demselben Laufwerk wird als Reflink (Copy-on-Write) oder
+Hardlink der ersten Kopie angelegt, statt die Quelle ein weiteres Mal zu
+lesen. Das Wasserzeichen wird nur einmal geladen und je Fotoformat
+vorskaliert zwischengespeichert.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.utils.constants import IS_WINDOWS
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+WATERMARK_TARGET_HEIGHT = 720
+WATERMARK_JPEG_QUALITY = 90
+# Kopieren ist I/O-, Wasserzeichen CPU-gebunden (PIL gibt das GIL beim Resampling frei)
+PHOTO_EXPORT_WORKERS = min(4, os.cpu_count() or 1)
+# Linux: ioctl FICLONE (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+
+@dataclass
+class PhotoExportJob:
+    """Ein Quellfoto und seine Ziele (erstes Ziel = echte Kopie)."""
+    source: str
+    destinations: List[str] = field(default_factory=list)
+
+
+# ---------------- Kopieren / Verlinken -----------------
+
+def _same_volume(path_a: str, path_b: str) -> bool:
+    try:
+        return os.stat(os.path.dirname(path_a) or ".").st_dev == os.stat(
+            os.path.dirname(path_b) or "."
+        ).st_dev
+    except OSError:
+        return False
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if fcntl is None or IS_WINDOWS:
+        return False
+    try:
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        return False
+
+
+def link_or_copy(existing_copy: str, dst: str) -> str:
+    """
+    Legt dst als Reflink bzw. Hardlink von existing_copy an (gleiches Laufwerk),
+    sonst als normale Kopie. Returns: "reflink" | "hardlink" | "copy".
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if _same_volume(existing_copy, dst):
+        if _reflink(existing_copy, dst):
+            return "reflink"
+        try:
+            os.link(existing_copy, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(existing_copy, dst)
+    return "copy"
+
+
+def export_photo(job: PhotoExportJob) -> None:
+    """Kopiert die Quelle ins erste Ziel und verlinkt weitere Ziele darauf."""
+    if not job.destinations:
+        return
+    first = job.destinations[0]
+    shutil.copy2(job.source, first)
+    for dst in job.destinations[1:]:
+        link_or_copy(first, dst)
+
+
+# ---------------- Wasserzeichen -----------------
+
+class WatermarkCache:
+    """Wasserzeichen einmal laden; vorskalierte Varianten je Fotogröße (thread-safe)."""
+
+    def __init__(self, watermark_path: str, alpha_level: float = 1.0):
+        self.watermark_path = watermark_path
+        self.alpha_level = alpha_level
+        self._base = None
+        self._scaled: Dict[Tuple[int, int], object] = {}
+        self._lock = threading.Lock()
+
+    def _load_base(self):
+        if self._base is None:
+            with Image.open(self.watermark_path) as wm:
+                base = wm.convert("RGBA")
+            if self.alpha_level < 1.0:
+                r, g, b, a = base.split()
+                lut = [int(x * self.alpha_level) for x in range(256)]
+                base = Image.merge("RGBA", (r, g, b, a.point(lut)))
+            self._base = base
+        return self._base
+
+    def for_photo_size(self, photo_size: Tuple[int, int]):
+        """Größtmögliches Wasserzeichen, das vollständig ins Foto passt."""
+        with self._lock:
+            cached = self._scaled.get(photo_size)
+            if cached is not None:
+                return cached
+            base = self._load_base()
+            foto_w, foto_h = photo_size
+            wm_aspect = base.width / base.height
+            if wm_aspect > foto_w / foto_h:
+                # Wasserzeichen ist breiter (im Verhältnis) -> Breite ist limitierend
+                new_w, new_h = foto_w, int(foto_w / wm_aspect)
+            else:
+                new_w, new_h = int(foto_h * wm_aspect), foto_h
+            scaled = base.resize((max(1, new_w), max(1, new_h)), Image.Resampling.LANCZOS)
+            self._scaled[photo_size] = scaled
+            return scaled
+
+
+def render_watermarked_photo(input_path: str, output_path: str, watermarks: WatermarkCache,
+                             target_height: int = WATERMARK_TARGET_HEIGHT) -> None:
+    """Skaliert ein Foto auf target_height und legt das Wasserzeichen mittig darüber."""
+    with Image.open(input_path) as src:
+        aspect = src.width / src.height
+        target_size = (int(target_height * aspect), target_height)
+        if src.format == "JPEG":
+            # DCT-Skalierung: nur so groß dekodieren wie für 720p nötig
+            src.draft("RGB", target_size)
+        foto = src.convert("RGB").resize(target_size, Image.Resampling.LANCZOS)
+
+    wasserzeichen = watermarks.for_photo_size(foto.size)
+    paste_x = (foto.width - wasserzeichen.width) // 2
+    paste_y = (foto.height - wasserzeichen.height) // 2
+    foto.paste(wasserzeichen, (paste_x, paste_y), wasserzeichen)
+    foto.save(output_path, "JPEG", quality=WATERMARK_JPEG_QUALITY)
+
+
+# ---------------- Worker-Pool -----------------
+
+def run_photo_jobs(
+    items: List,
+    worker: Callable[[object], None],
+    *,
+    workers: int = PHOTO_EXPORT_WORKERS,
+    cancel_check: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[int, int, object, Optional[BaseException]], None]] = None,
+) -> int:
+    """
+    Führt worker(item) für alle items im Pool aus.
+    on_progress(fertig, gesamt, item, fehler) läuft im aufrufenden Thread.
+    Returns: Anzahl erfolgreicher Aufträge. Bei Abbruch werden offene Aufträge verworfen.
+    """
+    total = len(items)
+    if total == 0:
+        return 0
+    succeeded = 0
+    completed = 0
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(workers, total)), thread_name_prefix="photo-export"
+    ) as pool:
+        pending = {pool.submit(worker, item): item for item in items}
+        while pending:
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            if cancel_check and cancel_check():
+                for future in pending:
+                    future.cancel()
+                break
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                completed += 1
+                if error is None:
+                    succeeded += 1
+                if on_progress:
+                    on_progress(completed, total, item, error)
+    return succeeded
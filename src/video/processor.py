@@ -20,8 +20,15 @@ from .concat_utils import (
     write_concat_file_list,
 )
 from .logger import CancellableProgressBarLogger, CancellationError
+from .photo_export import (
+    PhotoExportJob,
+    WatermarkCache,
+    export_photo,
+    render_watermarked_photo,
+    run_photo_jobs,
+)
 from ..utils.file_utils import normalize_whitespace_to_underscore, sanitize_filename
-from src.utils.media_datetime import get_photo_display_epoch
+from src.utils.media_datetime import get_photo_display_epoch, get_photo_display_epochs
 from src.utils.dji_media_paths import is_timelapse_photo_filename
 from src.utils.constants import SUBPROCESS_CREATE_NO_WINDOW
 from src.utils.constants import HINTERGRUND_PATH
@@ -1311,26 +1318,17 @@ class VideoProcessor:
                     # 2. Preview-Verzeichnis erstellen (Ziel: base_output_dir/Preview_Foto)
                     try:
                         preview_dir = self._generate_watermark_photo_directory(base_output_dir)
-                        total_wm_photos = len(selected_photo_paths)
-
-                        # 3. Jedes ausgewählte Foto verarbeiten
-                        for wm_i, photo_path in enumerate(selected_photo_paths):
-                            self._check_for_cancellation()
-                            if os.path.exists(photo_path):
-                                self._update_status(
-                                    f"Foto-Wasserzeichen {wm_i + 1}/{total_wm_photos}: "
-                                    f"{os.path.basename(photo_path)}"
-                                )
-                                out_name = photo_rename_map.get(
-                                    photo_path, os.path.basename(photo_path)
-                                )
-                                self._create_photo_with_watermark(
-                                    photo_path, preview_dir, out_name
-                                )
-                                watermark_photo_count += 1
+                        watermark_photo_count = self._create_photos_with_watermark(
+                            [p for p in selected_photo_paths if os.path.exists(p)],
+                            preview_dir,
+                            photo_rename_map,
+                        )
+                        self._check_for_cancellation()
 
                         print(f"{watermark_photo_count} Foto(s) mit Wasserzeichen verarbeitet und in {preview_dir} gespeichert.")
 
+                    except CancellationError:
+                        raise
                     except Exception as e:
                         print(f"Fehler bei der Erstellung der Foto-Wasserzeichen: {e}")
                         self._update_status(f"Fehler bei Foto-WM: {e}")
@@ -1801,11 +1799,16 @@ class VideoProcessor:
         print(f"Fehler bei Intro-Erstellung: {last_error.stderr if last_error and hasattr(last_error, 'stderr') else last_error}")
         raise last_error
 
-    def _get_photo_capture_dt(self, photo_path):
-        """Gleiche Zeitbasis wie Video/Foto-Tabelle (EXIF, ffprobe, Import-Snapshot, Dateisystem)."""
-        snap = None
+    def _photo_import_snapshot(self, photo_path):
         if getattr(self, "_photo_import_epochs", None):
-            snap = self._photo_import_epochs.get(os.path.normpath(photo_path))
+            return self._photo_import_epochs.get(os.path.normpath(photo_path))
+        return None
+
+    def _get_photo_capture_dt(self, photo_path, epochs=None):
+        """Gleiche Zeitbasis wie Video/Foto-Tabelle (EXIF, ffprobe, Import-Snapshot, Dateisystem)."""
+        if epochs and photo_path in epochs:
+            return datetime.fromtimestamp(epochs[photo_path])
+        snap = self._photo_import_snapshot(photo_path)
         return datetime.fromtimestamp(get_photo_display_epoch(photo_path, snap))
 
     def _build_photo_rename_map(self, photo_paths):
@@ -1815,6 +1818,14 @@ class VideoProcessor:
         """
         used = set()
         mapping = {}
+        # Aufnahmezeiten vorab parallel (nur EXIF-Segment je Datei)
+        dated = [
+            p for p in photo_paths
+            if os.path.exists(p) and not is_timelapse_photo_filename(os.path.basename(p))
+        ]
+        epochs = get_photo_display_epochs(
+            dated, {p: self._photo_import_snapshot(p) for p in dated}
+        )
         for src in photo_paths:
             if not os.path.exists(src):
                 continue
@@ -1822,7 +1833,7 @@ class VideoProcessor:
             if is_timelapse_photo_filename(basename):
                 candidate = basename
             else:
-                prefix = self._get_photo_capture_dt(src).strftime("%Y%m%d%H%M%S")
+                prefix = self._get_photo_capture_dt(src, epochs).strftime("%Y%m%d%H%M%S")
                 candidate = f"{prefix}_{basename}"
             if candidate in used:
                 base, ext = os.path.splitext(candidate)
@@ -1855,35 +1866,44 @@ class VideoProcessor:
         if kunde.outside_foto:
             os.makedirs(outside_dir, exist_ok=True)
 
-        copied_files_count = 0
-        total = len(photo_paths)
-        step = max(1, total // 12) if total > 12 else 1
+        target_dirs = []
+        if kunde.handcam_foto:
+            target_dirs.append(handcam_dir)
+        if kunde.outside_foto:
+            target_dirs.append(outside_dir)
+        if not target_dirs:
+            return 0
 
-        for idx, photo_path in enumerate(photo_paths):
-            self._check_for_cancellation()
+        # Erstes Ziel = Kopie, zweites Ziel = Reflink/Hardlink darauf (gleiches Laufwerk)
+        jobs = []
+        for photo_path in photo_paths:
             if not os.path.exists(photo_path):
                 continue
-
-            if idx % step == 0 or idx == total - 1:
-                self._update_status(
-                    f"Kopiere Fotos ({idx + 1}/{total}): {os.path.basename(photo_path)}"
-                )
-
             filename = rename_map.get(photo_path, os.path.basename(photo_path))
-            copied_this_file = False
-
-            if kunde.handcam_foto:
-                destination_path = os.path.join(handcam_dir, filename)
-                shutil.copy2(photo_path, destination_path)
-                copied_this_file = True
-
-            if kunde.outside_foto:
-                destination_path = os.path.join(outside_dir, filename)
-                shutil.copy2(photo_path, destination_path)
-                copied_this_file = True
+            jobs.append(PhotoExportJob(
+                photo_path, [os.path.join(d, filename) for d in target_dirs]
+            ))
+
+        errors = []
+
+        def on_progress(done, total, job, error):
+            if error is not None:
+                errors.append((job.source, error))
+                print(f"Fehler beim Kopieren von {job.source}: {error}")
+            self._update_status(
+                f"Kopiere Fotos ({done}/{total}): {os.path.basename(job.source)}"
+            )
 
-            if copied_this_file:
-                copied_files_count += 1
+        copied_files_count = run_photo_jobs(
+            jobs,
+            export_photo,
+            cancel_check=self.cancel_event.is_set,
+            on_progress=on_progress,
+        )
+        self._check_for_cancellation()
+        if errors:
+            # Wie zuvor: ein fehlgeschlagener Kopiervorgang bricht den Export ab
+            raise errors[0][1]
 
         print(f"{copied_files_count} Foto(s) nach '{handcam_dir}' und/oder '{outside_dir}' kopiert")
         return copied_files_count
@@ -1908,15 +1928,47 @@ class VideoProcessor:
             error_msg += f"Technische Details: {str(e)}"
             raise OSError(error_msg)
 
-    def _create_photo_with_watermark(self, input_photo_path, output_dir, output_filename):
+    def _watermark_stamp_path(self):
+        return os.path.join(os.path.dirname(self.hintergrund_path), "preview_stempel.png")
+
+    def _create_photos_with_watermark(self, photo_paths, output_dir, rename_map):
+        """
+        Erstellt die Wasserzeichen-Fotos parallel; das Wasserzeichen wird einmal
+        geladen und je Fotoformat vorskaliert wiederverwendet.
+        Gibt die Anzahl erfolgreich erstellter Fotos zurück.
+        """
+        wasserzeichen_path = self._watermark_stamp_path()
+        if not os.path.exists(wasserzeichen_path):
+            print(f"Warnung: Wasserzeichen-Datei nicht gefunden: {wasserzeichen_path}")
+            return 0
+        watermarks = WatermarkCache(wasserzeichen_path)
+
+        def worker(photo_path):
+            out_name = rename_map.get(photo_path, os.path.basename(photo_path))
+            self._create_photo_with_watermark(photo_path, output_dir, out_name, watermarks)
+
+        def on_progress(done, total, photo_path, error):
+            if error is not None:
+                print(f"Fehler beim Wasserzeichen-Foto {photo_path}: {error}")
+            self._update_status(
+                f"Foto-Wasserzeichen {done}/{total}: {os.path.basename(photo_path)}"
+            )
+
+        return run_photo_jobs(
+            photo_paths,
+            worker,
+            cancel_check=self.cancel_event.is_set,
+            on_progress=on_progress,
+        )
+
+    def _create_photo_with_watermark(self, input_photo_path, output_dir, output_filename,
+                                     watermarks=None):
         """
         Verwendet PIL/Pillow, um ein einzelnes Foto auf 720p (Höhe) zu skalieren
-        und ein Wasserzeichen (80% Transparenz) darüber zu legen.
+        und das Wasserzeichen mittig darüber zu legen.
         Das Wasserzeichen wird so groß wie möglich gemacht, ohne das Seitenverhältnis zu ändern.
         """
-        from PIL import Image
-
-        wasserzeichen_path = os.path.join(os.path.dirname(self.hintergrund_path), "preview_stempel.png")
+        wasserzeichen_path = self._watermark_stamp_path()
 
         if not os.path.exists(wasserzeichen_path):
             print(f"Warnung: Wasserzeichen-Datei nicht gefunden: {wasserzeichen_path}")
@@ -1926,55 +1978,11 @@ class VideoProcessor:
             return
 
         output_path = os.path.join(output_dir, output_filename)
-
-        target_height = 720
-        alpha_level = 1  # keine Transparenz
+        if watermarks is None:
+            watermarks = WatermarkCache(wasserzeichen_path)
 
         try:
-            # Lade Foto und Wasserzeichen
-            foto = Image.open(input_photo_path).convert('RGBA')
-            wasserzeichen = Image.open(wasserzeichen_path).convert('RGBA')
-
-            # Skaliere Foto auf Zielhöhe, behalte Seitenverhältnis
-            foto_aspect_ratio = foto.width / foto.height
-            new_foto_width = int(target_height * foto_aspect_ratio)
-            foto = foto.resize((new_foto_width, target_height), Image.Resampling.LANCZOS)
-
-            # Berechne optimale Wasserzeichen-Größe:
-            # Das Wasserzeichen soll so groß wie möglich sein, aber vollständig ins Foto passen
-            wm_aspect_ratio = wasserzeichen.width / wasserzeichen.height
-            foto_aspect = foto.width / foto.height
-
-            if wm_aspect_ratio > foto_aspect:
-                # Wasserzeichen ist breiter (im Verhältnis) -> Breite ist limitierend
-                new_wm_width = foto.width
-                new_wm_height = int(new_wm_width / wm_aspect_ratio)
-            else:
-                # Wasserzeichen ist höher (im Verhältnis) -> Höhe ist limitierend
-                new_wm_height = foto.height
-                new_wm_width = int(new_wm_height * wm_aspect_ratio)
-
-            # Skaliere Wasserzeichen
-            wasserzeichen = wasserzeichen.resize((new_wm_width, new_wm_height), Image.Resampling.LANCZOS)
-
-            # Setze Transparenz des Wasserzeichens
-            if wasserzeichen.mode == 'RGBA':
-                r, g, b, a = wasserzeichen.split()
-                # Multipliziere Alpha-Kanal mit Transparenz-Faktor
-                a = a.point(lambda x: int(x * alpha_level))
-                wasserzeichen = Image.merge('RGBA', (r, g, b, a))
-
-            # Berechne Position (mittig)
-            paste_x = (foto.width - wasserzeichen.width) // 2
-            paste_y = (foto.height - wasserzeichen.height) // 2
-
-            # Erstelle Composite-Bild
-            foto.paste(wasserzeichen, (paste_x, paste_y), wasserzeichen)
-
-            # Speichere als JPEG (konvertiere von RGBA zu RGB)
-            foto_rgb = foto.convert('RGB')
-            foto_rgb.save(output_path, 'JPEG', quality=90)
-
+            render_watermarked_photo(input_photo_path, output_path, watermarks)
         except Exception as e:
             print(f"Fehler beim Erstellen des Wasserzeichen-Fotos für {output_filename}:")
             print(f"Fehler: {e}")
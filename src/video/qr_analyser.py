@@ -1,4 +1,6 @@
+import io
 import json
+import math
 import os
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -7,18 +9,31 @@ from typing import Callable, List, Optional, Tuple
 from pyzbar.pyzbar import decode
 
 from src.model.kunde import Kunde
-from src.video.qr_parallel_allocator import BidirectionalIndexAllocator
+from src.utils.exif_reader import exif_thumbnail_bytes
+from src.video.qr_parallel_allocator import BidirectionalIndexAllocator, ClipWindowAllocator
 
 _MAX_QR_DECODE_WIDTH = 1920
 _MAX_QR_VIDEO_DECODE_WIDTH = 1280
 DEFAULT_QR_VIDEO_SCAN_SECONDS = 5.0
 DEFAULT_QR_VIDEO_FRAME_STEP = 10
+# Zeitfenster-Parallelisierung: Mindestlänge eines Fensters (Sekunden)
+_MIN_QR_WINDOW_SECONDS = 1.0
+
+# Gestufte Foto-Dekodierung: JPEG-DCT-Skalierung (1/8, 1/4, 1/2) vor Vollauflösung
+_QR_PHOTO_DRAFT_SCALES = (8, 4, 2)
+_MIN_QR_DRAFT_WIDTH = 480
+_MIN_EXIF_THUMB_QR_WIDTH = 320
 
 try:
     import cv2
 except ImportError:
     cv2 = None
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
 
 def _parse_kunde_aus_qr_string(qr_daten_str: str) -> Kunde:
     """
@@ -151,10 +166,11 @@ class _ParallelProgressTracker:
             active = sorted(self._active.keys())
         self._emit(item_index, basename, active)
 
-    def item_finished(self, item_index: int, basename: str) -> None:
+    def item_finished(self, item_index: int, basename: str, *, count_completed: bool = True) -> None:
         with self._lock:
             self._active.pop(basename, None)
-            self._completed += 1
+            if count_completed:
+                self._completed += 1
             completed = self._completed
             active = sorted(self._active.keys())
             if active:
@@ -239,15 +255,36 @@ def _run_parallel_bidirectional_scan(
 
         return None, False, None
 
+    return _execute_bidirectional_workers(
+        _worker,
+        workers,
+        stop_event=stop_event,
+        cancel_check=cancel_check,
+        log_label=log_label,
+    )
+
+
+def _execute_bidirectional_workers(
+    worker: Callable[[str], Tuple[Optional[Kunde], bool, Optional[str]]],
+    workers: int,
+    *,
+    stop_event: threading.Event,
+    cancel_check: Optional[Callable[[], bool]],
+    log_label: str,
+) -> Tuple[Optional[Kunde], bool, Optional[str], bool]:
+    """
+    Startet die Worker (ab 2: einer rückwärts, die übrigen vorwärts) und wartet
+    auf den ersten Treffer oder Benutzer-Abbruch.
+    """
     executor = ThreadPoolExecutor(max_workers=workers)
     futures = []
     try:
         if workers >= 2:
-            futures.append(executor.submit(_worker, "backward"))
+            futures.append(executor.submit(worker, "backward"))
             for _ in range(workers - 1):
-                futures.append(executor.submit(_worker, "forward"))
+                futures.append(executor.submit(worker, "forward"))
         else:
-            futures.append(executor.submit(_worker, "forward"))
+            futures.append(executor.submit(worker, "forward"))
 
         for future in as_completed(futures):
             if _is_cancelled(cancel_check):
@@ -305,17 +342,22 @@ def _decode_kunde_from_prepared(prepared_frame) -> Tuple[Optional[Kunde], bool]:
     return None, False
 
 
-def _target_frame_indices(fps: float, scan_seconds: float, frame_step: int) -> List[int]:
-    """Frame-Indizes für die QR-Suche (Frame 0 immer enthalten)."""
+def _target_frame_indices(
+    fps: float,
+    scan_seconds: float,
+    frame_step: int,
+    start_seconds: float = 0.0,
+) -> List[int]:
+    """
+    Frame-Indizes für die QR-Suche (Frame 0 immer enthalten).
+    Mit start_seconds nur der Ausschnitt [start_seconds, scan_seconds) desselben
+    Rasters, damit sich Zeitfenster lückenlos und ohne Überschneidung ergänzen.
+    """
     frames_limit = max(1, int(fps * scan_seconds))
+    start_frame = max(0, int(fps * start_seconds)) if start_seconds > 0 else 0
     step = max(1, frame_step)
-    indices: List[int] = []
-    seen = set()
-    for frame_index in range(0, frames_limit, step):
-        if frame_index not in seen:
-            seen.add(frame_index)
-            indices.append(frame_index)
-    return indices
+    first_index = ((start_frame + step - 1) // step) * step
+    return list(range(first_index, frames_limit, step))
 
 
 def _try_decode_frame(frame) -> Tuple[Optional[Kunde], bool]:
@@ -354,8 +396,9 @@ def _scan_sequential_frames(
     scan_seconds: float,
     frame_step: int,
     cancel_check: Optional[Callable[[], bool]],
+    start_frame: int = 0,
 ) -> Tuple[Optional[Kunde], bool]:
-    """Fallback: sequentielles Lesen mit Frame-Abstand (ohne Seek)."""
+    """Fallback: sequentielles Lesen mit Frame-Abstand (ohne Seek), geprüft ab start_frame."""
     frames_limit = max(1, int(fps * scan_seconds))
     step = max(1, frame_step)
     cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
@@ -368,7 +411,7 @@ def _scan_sequential_frames(
         if not erfolg:
             break
 
-        if frame_zaehler % step == 0:
+        if frame_zaehler >= start_frame and frame_zaehler % step == 0:
             kunde, ok = _try_decode_frame(frame)
             if ok and kunde:
                 print(
@@ -477,6 +520,73 @@ def analysiere_ersten_clip(
     return None, False
 
 
+def analysiere_clip_zeitfenster(
+    video_pfad: str,
+    start_seconds: float,
+    end_seconds: float,
+    *,
+    cancel_check: Optional[Callable[[], bool]] = None,
+    frame_step: int = DEFAULT_QR_VIDEO_FRAME_STEP,
+) -> Tuple[Optional[Kunde], bool]:
+    """
+    Analysiert nur das Zeitfenster [start_seconds, end_seconds) eines Clips.
+    Die Frames liegen auf demselben Raster wie bei analysiere_ersten_clip, sodass
+    mehrere Fenster zusammen genau dieselben Frames prüfen.
+    Frames hinter dem Clip-Ende werden ausgelassen; ein Fenster ganz hinter
+    dem Ende liefert sofort keinen Treffer.
+
+    Returns:
+        (Kunde oder None, Erfolg)
+    """
+    if cv2 is None:
+        print("Fehler: OpenCV (cv2) ist nicht installiert. Bitte 'opencv-python' installieren.")
+        return None, False
+
+    if not os.path.isfile(video_pfad):
+        print(f"Fehler: Videodatei existiert nicht: {video_pfad}")
+        return None, False
+
+    cap = cv2.VideoCapture(video_pfad)
+    if not cap.isOpened():
+        print(f"Fehler: Videodatei konnte nicht geöffnet werden: {video_pfad}")
+        return None, False
+
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps <= 0:
+            fps = 30.0
+
+        target_frames = _target_frame_indices(fps, end_seconds, frame_step, start_seconds)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if frame_count > 0:
+            # Fenster hinter dem Clip-Ende (Clip kürzer als scan_seconds): kein Treffer,
+            # statt per sequentiellem Fallback den ganzen Clip zu dekodieren
+            target_frames = [index for index in target_frames if index < frame_count]
+        if not target_frames:
+            return None, False
+
+        kunde, ok, frames_read = _scan_target_frames_with_seek(
+            cap, target_frames, cancel_check
+        )
+        if ok and kunde:
+            return kunde, True
+        if frames_read == 0 and not _is_cancelled(cancel_check):
+            return _scan_sequential_frames(
+                cap,
+                fps,
+                end_seconds,
+                frame_step,
+                cancel_check,
+                start_frame=target_frames[0],
+            )
+    except Exception as e:
+        print(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
+    finally:
+        cap.release()
+
+    return None, False
+
+
 def _load_image_for_qr(foto_pfad: str):
     """Lädt ein Foto und verkleinert es für die QR-Erkennung bei Bedarf."""
     if cv2 is None:
@@ -502,6 +612,93 @@ def _decode_kunde_from_image(image) -> Tuple[Optional[Kunde], bool]:
     return _decode_kunde_from_prepared(prepared)
 
 
+def _pil_gray_for_qr(img):
+    """Graustufen-PIL-Bild, auf _MAX_QR_DECODE_WIDTH begrenzt (pyzbar akzeptiert PIL direkt)."""
+    gray = img.convert("L")
+    if gray.width > _MAX_QR_DECODE_WIDTH:
+        new_height = max(1, int(gray.height * _MAX_QR_DECODE_WIDTH / gray.width))
+        gray = gray.resize((_MAX_QR_DECODE_WIDTH, new_height), Image.BOX)
+    return gray
+
+
+def _iter_reduced_qr_images(foto_pfad: str):
+    """
+    Liefert günstige Vorstufen eines JPEGs für die QR-Suche: zuerst das EXIF-Thumbnail
+    (falls groß genug), dann DCT-skalierte Dekodierungen (1/8, 1/4, 1/2).
+
+    Yields:
+        (Graustufenbild, True wenn die Stufe bereits die volle Prüfauflösung erreicht)
+    """
+    if Image is None:
+        return
+
+    try:
+        with Image.open(foto_pfad) as img:
+            if img.format != "JPEG":
+                return
+            full_width, full_height = img.size
+            exif_raw = img.info.get("exif")
+    except Exception:
+        return
+
+    thumb_bytes = exif_thumbnail_bytes(exif_raw)
+    if thumb_bytes:
+        try:
+            with Image.open(io.BytesIO(thumb_bytes)) as thumb:
+                if thumb.width >= _MIN_EXIF_THUMB_QR_WIDTH:
+                    yield _pil_gray_for_qr(thumb), False
+        except Exception:
+            pass
+
+    for scale in _QR_PHOTO_DRAFT_SCALES:
+        draft_size = (full_width // scale, full_height // scale)
+        if draft_size[0] < _MIN_QR_DRAFT_WIDTH:
+            continue
+        try:
+            with Image.open(foto_pfad) as img:
+                img.draft("L", draft_size)
+                decoded_width = img.width
+                gray = _pil_gray_for_qr(img)
+        except Exception:
+            return
+        reaches_full = decoded_width >= min(full_width, _MAX_QR_DECODE_WIDTH)
+        yield gray, reaches_full
+        if reaches_full:
+            return
+
+
+def _decode_kunde_from_photo(
+    foto_pfad: str,
+    cancel_check: Optional[Callable[[], bool]] = None,
+) -> Tuple[Optional[Kunde], bool, bool]:
+    """
+    Gestufte Foto-Dekodierung: EXIF-Thumbnail und reduzierte JPEG-Stufen zuerst,
+    volle Dekodierung nur, wenn diese die Prüfauflösung nicht erreicht haben.
+
+    Returns:
+        (Kunde oder None, Erfolg, Bild konnte geladen werden)
+    """
+    loaded = False
+    full_resolution_checked = False
+    for gray, reaches_full in _iter_reduced_qr_images(foto_pfad):
+        loaded = True
+        kunde, ok = _decode_kunde_from_prepared(gray)
+        if ok and kunde:
+            return kunde, True, True
+        if _is_cancelled(cancel_check):
+            return None, False, True
+        full_resolution_checked = reaches_full
+
+    if full_resolution_checked:
+        return None, False, True
+
+    image = _load_image_for_qr(foto_pfad)
+    if image is None:
+        return None, False, loaded
+    kunde, ok = _decode_kunde_from_image(image)
+    return kunde, ok, True
+
+
 def analysiere_foto(foto_pfad: str) -> Tuple[Optional[Kunde], bool]:
     """
     Analysiert ein Foto auf einen QR-Code, parst diesen in das Kunde-Modell
@@ -520,21 +717,16 @@ def analysiere_foto(foto_pfad: str) -> Tuple[Optional[Kunde], bool]:
             print("Fehler: OpenCV (cv2) ist nicht installiert. Bitte 'opencv-python' installieren.")
             return None, False
 
-        image = _load_image_for_qr(foto_pfad)
-        if image is None:
+        kunde, ok, loaded = _decode_kunde_from_photo(foto_pfad)
+        if not loaded:
             print(f"Fehler: Foto konnte nicht geladen werden: {foto_pfad}")
             return None, False
 
-        kunde, ok = _decode_kunde_from_image(image)
         if ok and kunde:
             print(f"QR-Code im Foto gefunden und erfolgreich geparst: {foto_pfad}")
             return kunde, True
 
-        prepared = _prepare_frame_for_qr(image)
-        if not decode(prepared):
-            print(f"Kein QR-Code im Foto gefunden: {foto_pfad}")
-        else:
-            print(f"QR-Code(s) gefunden, aber keine gültigen Kundendaten im Foto: {foto_pfad}")
+        print(f"Kein gültiger QR-Code im Foto gefunden: {foto_pfad}")
         return None, False
 
     except Exception as e:
@@ -574,8 +766,8 @@ def analysiere_fotos_bis_erster_treffer(
                 completed_count=index - 1,
             )
 
-        image = _load_image_for_qr(foto_pfad)
-        if image is None:
+        kunde, ok, loaded = _decode_kunde_from_photo(foto_pfad, cancel_check)
+        if not loaded:
             print(f"Fehler: Foto konnte nicht geladen werden: {foto_pfad}")
             continue
 
@@ -583,7 +775,6 @@ def analysiere_fotos_bis_erster_treffer(
             print("Foto-QR-Suche vom Benutzer abgebrochen.")
             return None, False, None, True
 
-        kunde, ok = _decode_kunde_from_image(image)
         if ok and kunde:
             print(
                 f"QR-Code in Foto {index}/{total} gefunden und geparst: "
@@ -663,21 +854,104 @@ def analysiere_videos_bis_erster_treffer(
     return None, False, None, False
 
 
-def _scan_video_for_kunde(
-    video_pfad: str,
-    item_index: int,
-    total: int,
-    cancel_check: Optional[Callable[[], bool]],
+def _windows_per_clip(clip_count: int, parallel_workers: int, scan_seconds: float) -> int:
+    """
+    Anzahl Zeitfenster pro Clip, damit bei wenigen Clips alle Worker beschäftigt sind.
+    Jedes Fenster umfasst mindestens _MIN_QR_WINDOW_SECONDS.
+    """
+    workers = max(1, int(parallel_workers))
+    if clip_count <= 0 or clip_count >= workers:
+        return 1
+    wanted = math.ceil(workers / clip_count)
+    max_windows = max(1, int(scan_seconds / _MIN_QR_WINDOW_SECONDS))
+    return max(1, min(wanted, max_windows))
+
+
+def _run_parallel_window_scan(
+    video_pfade: List[str],
     *,
-    scan_seconds: float = DEFAULT_QR_VIDEO_SCAN_SECONDS,
-    frame_step: int = DEFAULT_QR_VIDEO_FRAME_STEP,
-) -> Tuple[Optional[Kunde], bool]:
-    """Scannt einen Videoclip ohne Progress-Callback (für parallele Phase)."""
-    return analysiere_ersten_clip(
-        video_pfad,
+    index_offset: int,
+    total: int,
+    scan_seconds: float,
+    frame_step: int,
+    parallel_workers: int,
+    cancel_check: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[..., None]] = None,
+    initial_completed: int = 0,
+) -> Tuple[Optional[Kunde], bool, Optional[str], bool]:
+    """
+    Parallele Suche über (Clip, Zeitfenster)-Einheiten. Bei wenigen langen Clips
+    durchsuchen mehrere Worker verschiedene Fenster desselben Clips; der erste
+    Treffer stoppt alle. Ein Clip zählt im Fortschritt als erledigt, sobald alle
+    seine Fenster geprüft sind.
+    """
+    if not video_pfade:
+        return None, False, None, False
+
+    windows = _windows_per_clip(len(video_pfade), parallel_workers, scan_seconds)
+    allocator = ClipWindowAllocator(len(video_pfade), windows)
+    workers = max(1, min(int(parallel_workers), allocator.unit_count))
+    window_seconds = scan_seconds / windows
+    parallel_tracker = _ParallelProgressTracker(
+        progress_callback,
+        total,
+        initial_completed=initial_completed,
+    )
+    windows_left = [windows] * len(video_pfade)
+    windows_lock = threading.Lock()
+    stop_event = threading.Event()
+    stop_check = _combined_stop_check(cancel_check, stop_event)
+
+    def _worker(direction: str) -> Tuple[Optional[Kunde], bool, Optional[str]]:
+        while True:
+            if stop_check():
+                return None, False, None
+
+            unit = (
+                allocator.next_backward()
+                if direction == "backward"
+                else allocator.next_forward()
+            )
+            if unit is None:
+                return None, False, None
+
+            clip_i, window_i = unit
+            video_pfad = video_pfade[clip_i]
+            item_index = index_offset + clip_i
+            start_seconds = window_i * window_seconds
+            end_seconds = scan_seconds if window_i == windows - 1 else start_seconds + window_seconds
+            label = os.path.basename(video_pfad)
+            if windows > 1:
+                label = f"{label} ({start_seconds:g}–{end_seconds:g} s)"
+
+            parallel_tracker.item_started(item_index, label)
+            try:
+                kunde, ok = analysiere_clip_zeitfenster(
+                    video_pfad,
+                    start_seconds,
+                    end_seconds,
+                    cancel_check=stop_check,
+                    frame_step=frame_step,
+                )
+                if ok and kunde:
+                    stop_event.set()
+                    return kunde, True, video_pfad
+            finally:
+                if not stop_event.is_set():
+                    with windows_lock:
+                        windows_left[clip_i] -= 1
+                        clip_done = windows_left[clip_i] == 0
+                    parallel_tracker.item_finished(item_index, label, count_completed=clip_done)
+
+    if windows > 1:
+        print(f"QR-Zeitfenster: {len(video_pfade)} Clip(s) × {windows} Fenster à {window_seconds:g} s")
+
+    return _execute_bidirectional_workers(
+        _worker,
+        workers,
+        stop_event=stop_event,
         cancel_check=cancel_check,
-        scan_seconds=scan_seconds,
-        frame_step=frame_step,
+        log_label="Clip",
     )
 
 
@@ -691,15 +965,15 @@ def _scan_foto_for_kunde(
     if _is_cancelled(cancel_check):
         return None, False
 
-    image = _load_image_for_qr(foto_pfad)
-    if image is None:
+    kunde, ok, loaded = _decode_kunde_from_photo(foto_pfad, cancel_check)
+    if not loaded:
         print(f"Fehler: Foto konnte nicht geladen werden: {foto_pfad}")
         return None, False
 
     if _is_cancelled(cancel_check):
         return None, False
 
-    return _decode_kunde_from_image(image)
+    return kunde, ok
 
 
 def analysiere_videos_hybrid_bis_erster_treffer(
@@ -712,7 +986,9 @@ def analysiere_videos_hybrid_bis_erster_treffer(
     parallel_workers: int = 2,
 ) -> Tuple[Optional[Kunde], bool, Optional[str], bool]:
     """
-    Hybrid: Clip 1 sequentiell, Clips 2..N parallel bidirektional.
+    Hybrid: Clip 1 zuerst, danach Clips 2..N parallel bidirektional.
+    Ab 2 Workern wird Clip 1 in Zeitfenster aufgeteilt, die parallel geprüft
+    werden; bei weniger Clips als Workern gilt das auch für die übrigen Clips.
     Bricht beim ersten gültigen Treffer oder bei Benutzer-Abbruch ab.
     """
     if cv2 is None:
@@ -724,17 +1000,43 @@ def analysiere_videos_hybrid_bis_erster_treffer(
 
     total = len(video_pfade)
     progress_phase = "hybrid_first" if total > 1 else "scanning"
+    scan_seconds = max(0.5, float(scan_seconds))
 
-    kunde, ok = analysiere_ersten_clip(
-        video_pfade[0],
-        cancel_check=cancel_check,
-        scan_seconds=scan_seconds,
-        frame_step=frame_step,
-        clip_index=1,
-        total_clips=total,
-        progress_callback=progress_callback,
-        progress_phase=progress_phase,
-    )
+    if _windows_per_clip(1, parallel_workers, scan_seconds) > 1:
+        if progress_callback:
+            _emit_qr_progress(
+                progress_callback,
+                1,
+                total,
+                os.path.basename(video_pfade[0]),
+                phase=progress_phase,
+                completed_count=0,
+            )
+        kunde, ok, _, cancelled = _run_parallel_window_scan(
+            video_pfade[:1],
+            index_offset=1,
+            total=total,
+            scan_seconds=scan_seconds,
+            frame_step=frame_step,
+            parallel_workers=parallel_workers,
+            cancel_check=cancel_check,
+            progress_callback=progress_callback,
+            initial_completed=0,
+        )
+        if cancelled:
+            print("Video-QR-Suche vom Benutzer abgebrochen.")
+            return None, False, None, True
+    else:
+        kunde, ok = analysiere_ersten_clip(
+            video_pfade[0],
+            cancel_check=cancel_check,
+            scan_seconds=scan_seconds,
+            frame_step=frame_step,
+            clip_index=1,
+            total_clips=total,
+            progress_callback=progress_callback,
+            progress_phase=progress_phase,
+        )
     if _is_cancelled(cancel_check):
         print("Video-QR-Suche vom Benutzer abgebrochen.")
         return None, False, None, True
@@ -751,10 +1053,11 @@ def analysiere_videos_hybrid_bis_erster_treffer(
         return None, False, None, False
 
     rest_paths = video_pfade[1:]
-    workers = max(1, min(int(parallel_workers), len(rest_paths)))
+    workers = max(1, int(parallel_workers))
+    rest_units = len(rest_paths) * _windows_per_clip(len(rest_paths), workers, scan_seconds)
 
     print(
-        f"QR-Hybrid: Clips 2–{total} mit {workers} parallelen Worker(n) "
+        f"QR-Hybrid: Clips 2–{total} mit {min(workers, rest_units)} parallelen Worker(n) "
         "(bidirektional)"
     )
 
@@ -768,30 +1071,15 @@ def analysiere_videos_hybrid_bis_erster_treffer(
             completed_count=1,
         )
 
-    def _scan_one(
-        path: str,
-        item_index: int,
-        item_total: int,
-        check: Optional[Callable[[], bool]],
-    ) -> Tuple[Optional[Kunde], bool]:
-        return _scan_video_for_kunde(
-            path,
-            item_index,
-            item_total,
-            check,
-            scan_seconds=scan_seconds,
-            frame_step=frame_step,
-        )
-
-    kunde, ok, source_path, cancelled = _run_parallel_bidirectional_scan(
+    kunde, ok, source_path, cancelled = _run_parallel_window_scan(
         rest_paths,
         index_offset=2,
         total=total,
-        scan_one=_scan_one,
+        scan_seconds=scan_seconds,
+        frame_step=frame_step,
         parallel_workers=workers,
         cancel_check=cancel_check,
         progress_callback=progress_callback,
-        log_label="Clip",
         initial_completed=1,
     )
     if cancelled:
@@ -0,0 +1,144 @@
+import os
+import threading
+from typing import Callable, Optional
+
+from src.model.kunde import Kunde
+from src.utils.mp4_atoms import moov_before_mdat
+from src.video.qr_analyser import (
+    DEFAULT_QR_VIDEO_FRAME_STEP,
+    DEFAULT_QR_VIDEO_SCAN_SECONDS,
+    analysiere_ersten_clip,
+)
+
+DEFAULT_EARLY_QR_PREFIX_MB = 64
+
+# Import-Ereignisse aus DragDropFrame._async_add_files
+IMPORT_EVENT_BATCH_STARTED = "batch_started"
+IMPORT_EVENT_VIDEO_PROGRESS = "video_progress"
+IMPORT_EVENT_VIDEO_COPIED = "video_copied"
+IMPORT_EVENT_BATCH_FINISHED = "batch_finished"
+
+
+class EarlyImportQrScan:
+    """
+    Frühe QR-Suche während des Imports.
+
+    Abonniert die Import-Ereignisse von DragDropFrame und startet die Suche auf
+    dem ersten Clip, sobald dieser vollständig im Arbeitsordner liegt oder die
+    ersten prefix_bytes (mit moov vor mdat) kopiert sind. on_hit wird im
+    Scan-Thread aufgerufen.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_hit: Callable[[Kunde, str], None],
+        scan_seconds: float = DEFAULT_QR_VIDEO_SCAN_SECONDS,
+        frame_step: int = DEFAULT_QR_VIDEO_FRAME_STEP,
+        prefix_bytes: int = DEFAULT_EARLY_QR_PREFIX_MB * 1024 * 1024,
+    ):
+        self._on_hit = on_hit
+        self._scan_seconds = scan_seconds
+        self._frame_step = frame_step
+        self._prefix_bytes = max(0, int(prefix_bytes))
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target_path: Optional[str] = None
+        self._prefix_checked = False
+        self._scanned_complete_file = False
+        self.kunde: Optional[Kunde] = None
+        self.hit_path: Optional[str] = None
+        # Wird vom Aufrufer gesetzt, sobald der Treffer ins Formular übernommen wurde
+        self.hit_applied = False
+
+    def on_import_event(self, event: str, payload: dict) -> None:
+        """Verarbeitet ein Import-Ereignis (aus dem Import-Worker-Thread)."""
+        if event == IMPORT_EVENT_BATCH_FINISHED:
+            if payload.get("cancelled"):
+                self.cancel()
+            return
+
+        path = payload.get("dest_path")
+        if not path:
+            return
+
+        with self._lock:
+            if self._target_path is None:
+                self._target_path = path
+            elif os.path.normcase(path) != os.path.normcase(self._target_path):
+                return
+            if self._thread is not None or self._cancel_event.is_set():
+                return
+
+            if event == IMPORT_EVENT_VIDEO_COPIED:
+                self._start_locked(path, complete=True)
+                return
+
+            if event != IMPORT_EVENT_VIDEO_PROGRESS or self._prefix_checked:
+                return
+            if self._prefix_bytes <= 0:
+                return
+            if int(payload.get("copied_bytes", 0)) < self._prefix_bytes:
+                return
+            self._prefix_checked = True
+            if moov_before_mdat(path):
+                self._start_locked(path, complete=False)
+
+    def _start_locked(self, path: str, *, complete: bool) -> None:
+        self._scanned_complete_file = complete
+        self._thread = threading.Thread(
+            target=self._scan,
+            args=(path, complete),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _scan(self, path: str, complete: bool) -> None:
+        scope = "vollständig kopiert" if complete else "Anfang kopiert"
+        print(f"Frühe QR-Suche während Import: {os.path.basename(path)} ({scope})")
+        try:
+            kunde, ok = analysiere_ersten_clip(
+                path,
+                cancel_check=self._cancel_event.is_set,
+                scan_seconds=self._scan_seconds,
+                frame_step=self._frame_step,
+            )
+        except Exception as e:
+            print(f"Fehler bei früher QR-Suche: {e}")
+            return
+
+        if self._cancel_event.is_set() or not (ok and kunde):
+            return
+
+        self.kunde = kunde
+        self.hit_path = path
+        try:
+            self._on_hit(kunde, path)
+        except Exception as e:
+            print(f"Fehler beim Übernehmen des frühen QR-Treffers: {e}")
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def is_running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def covers(self, path: str) -> bool:
+        """
+        True, wenn der Clip bereits endgültig geprüft wurde (Treffer oder
+        vollständige Datei). Ein Präfix-Scan ohne Treffer zählt nicht.
+        """
+        if self._thread is None or self.is_running() or self._cancel_event.is_set():
+            return False
+        if self._target_path is None:
+            return False
+        if os.path.normcase(os.path.normpath(path)) != os.path.normcase(
+            os.path.normpath(self._target_path)
+        ):
+            return False
+        return self.kunde is not None or self._scanned_complete_file
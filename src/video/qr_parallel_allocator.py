@@ -1,5 +1,5 @@
 import threading
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class BidirectionalIndexAllocator:
@@ -25,3 +25,26 @@ class BidirectionalIndexAllocator:
             index = self._backward_i
             self._backward_i -= 1
             return index
+
+
+class ClipWindowAllocator:
+    """
+    Verteilt (Clip, Zeitfenster)-Arbeitseinheiten bidirektional ohne Duplikate.
+    Vorwärts: Clip 0 / Fenster 0 zuerst; rückwärts: letzter Clip / letztes Fenster.
+    """
+
+    def __init__(self, clip_count: int, windows_per_clip: int):
+        self.windows_per_clip = max(1, int(windows_per_clip))
+        self.unit_count = max(0, int(clip_count)) * self.windows_per_clip
+        self._indices = BidirectionalIndexAllocator(0, self.unit_count - 1)
+
+    def _unit(self, index: Optional[int]) -> Optional[Tuple[int, int]]:
+        if index is None:
+            return None
+        return divmod(index, self.windows_per_clip)
+
+    def next_forward(self) -> Optional[Tuple[int, int]]:
+        return self._unit(self._indices.next_forward())
+
+    def next_backward(self) -> Optional[Tuple[int, int]]:
+        return self._unit(self._indices.next_backward())
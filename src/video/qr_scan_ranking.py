@@ -0,0 +1,222 @@
+"""
+Reihenfolge der Clips für die QR-Suche.
+
+Bewertet Kandidaten anhand günstiger Metadaten (Aufnahmezeit, Dauer, Größe,
+Position in der Dateinamen-Folge) und der lokal gespeicherten Treffer-Statistik,
+damit der QR-Clip möglichst früh geprüft wird.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.constants import CONFIG_DIR
+from src.utils.file_times import get_creation_timestamp
+from src.utils.mp4_atoms import read_movie_header
+from src.utils.natural_sort import natural_sort_key
+
+STATS_PATH = os.path.join(CONFIG_DIR, "qr_scan_stats.json")
+_STATS_VERSION = 1
+
+_SHORT_CLIP_SECONDS = 20.0
+_MEDIUM_CLIP_SECONDS = 60.0
+# Gewicht der A-priori-Quote (entspricht so vielen "virtuellen" Beobachtungen)
+_PRIOR_WEIGHT = 4.0
+# Ab so vielen Beobachtungen je Merkmal werden die Zähler halbiert (neuere Tage zählen mehr)
+_MAX_SEEN_PER_FEATURE = 500
+
+# A-priori-Trefferquoten je Merkmal und Bucket, bevor eigene Statistik vorliegt
+_PRIOR_HIT_RATES: Dict[str, Dict[str, float]] = {
+    "creation": {"first": 0.6, "second": 0.15, "last": 0.15, "middle": 0.05, "unknown": 0.2},
+    "duration": {"short": 0.5, "medium": 0.15, "long": 0.05, "unknown": 0.2},
+    "sequence": {"first": 0.5, "second": 0.15, "last": 0.15, "middle": 0.05},
+    "size": {"smallest": 0.35, "other": 0.15},
+}
+
+
+@dataclass
+class ClipFeatures:
+    """Merkmals-Buckets eines Kandidaten (Feature -> Bucket)."""
+
+    path: str
+    list_index: int
+    buckets: Dict[str, str]
+
+
+def _position_bucket(rank: int, count: int) -> str:
+    if rank == 0:
+        return "first"
+    if rank == count - 1:
+        return "last"
+    if rank == 1:
+        return "second"
+    return "middle"
+
+
+def _duration_bucket(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    if seconds < _SHORT_CLIP_SECONDS:
+        return "short"
+    if seconds < _MEDIUM_CLIP_SECONDS:
+        return "medium"
+    return "long"
+
+
+def extract_clip_features(
+    paths: List[str],
+    source_epochs: Optional[Dict[str, Optional[float]]] = None,
+) -> List[ClipFeatures]:
+    """
+    Ermittelt die Merkmale aller Kandidaten. Liest pro Clip nur den mvhd-Atom
+    und stat(); Aufnahmezeit: mvhd, sonst Import-Snapshot, sonst Dateisystem.
+    """
+    source_epochs = source_epochs or {}
+    count = len(paths)
+    epochs: List[Optional[float]] = []
+    durations: List[Optional[float]] = []
+    sizes: List[int] = []
+
+    for path in paths:
+        header = read_movie_header(path)
+        epoch = header.creation_epoch if header else None
+        if epoch is None:
+            epoch = source_epochs.get(path)
+        if epoch is None:
+            epoch = get_creation_timestamp(path)
+        epochs.append(epoch)
+        durations.append(header.duration_seconds if header else None)
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(0)
+
+    known = sorted(
+        (i for i in range(count) if epochs[i] is not None),
+        key=lambda i: (epochs[i], i),
+    )
+    creation_rank = {index: rank for rank, index in enumerate(known)}
+    by_name = sorted(range(count), key=lambda i: natural_sort_key(os.path.basename(paths[i])))
+    sequence_rank = {index: rank for rank, index in enumerate(by_name)}
+    smallest = min(sizes) if sizes else 0
+
+    features: List[ClipFeatures] = []
+    for i, path in enumerate(paths):
+        if i in creation_rank:
+            creation = _position_bucket(creation_rank[i], len(known))
+        else:
+            creation = "unknown"
+        features.append(
+            ClipFeatures(
+                path=path,
+                list_index=i,
+                buckets={
+                    "creation": creation,
+                    "duration": _duration_bucket(durations[i]),
+                    "sequence": _position_bucket(sequence_rank[i], count),
+                    "size": "smallest" if sizes[i] == smallest else "other",
+                },
+            )
+        )
+    return features
+
+
+class QrScanStats:
+    """Lokale Treffer-Statistik der QR-Suche (JSON im Config-Verzeichnis)."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: str = STATS_PATH):
+        self.path = path
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == _STATS_VERSION:
+                return data
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"version": _STATS_VERSION, "seen": {}, "hits": {}}
+
+    def _save(self, data: dict) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"QR-Statistik konnte nicht gespeichert werden: {e}")
+
+    def hit_rates(self) -> Dict[str, Dict[str, float]]:
+        """Geglättete Trefferquote je Merkmal und Bucket (A-priori-Quote + Beobachtungen)."""
+        with self._lock:
+            data = self._load()
+        rates: Dict[str, Dict[str, float]] = {}
+        for feature, priors in _PRIOR_HIT_RATES.items():
+            seen = data["seen"].get(feature, {})
+            hits = data["hits"].get(feature, {})
+            rates[feature] = {
+                bucket: (hits.get(bucket, 0) + prior * _PRIOR_WEIGHT)
+                / (seen.get(bucket, 0) + _PRIOR_WEIGHT)
+                for bucket, prior in priors.items()
+            }
+        return rates
+
+    def record_hit(self, features: List[ClipFeatures], hit_path: str) -> None:
+        """Verbucht einen Treffer: alle Kandidaten als gesehen, der Treffer-Clip als Treffer."""
+        hit_key = os.path.normcase(os.path.normpath(hit_path))
+        with self._lock:
+            data = self._load()
+            for candidate in features:
+                is_hit = os.path.normcase(os.path.normpath(candidate.path)) == hit_key
+                for feature, bucket in candidate.buckets.items():
+                    seen = data["seen"].setdefault(feature, {})
+                    seen[bucket] = seen.get(bucket, 0) + 1
+                    if is_hit:
+                        hits = data["hits"].setdefault(feature, {})
+                        hits[bucket] = hits.get(bucket, 0) + 1
+            for feature, seen in data["seen"].items():
+                if sum(seen.values()) <= _MAX_SEEN_PER_FEATURE:
+                    continue
+                hits = data["hits"].get(feature, {})
+                for bucket in list(seen):
+                    seen[bucket] = seen[bucket] / 2.0
+                    if bucket in hits:
+                        hits[bucket] = hits[bucket] / 2.0
+            self._save(data)
+
+
+def rank_clips_for_qr_scan(
+    paths: List[str],
+    *,
+    source_epochs: Optional[Dict[str, Optional[float]]] = None,
+    stats: Optional[QrScanStats] = None,
+) -> Tuple[List[str], List[ClipFeatures]]:
+    """
+    Sortiert Clips nach geschätzter QR-Wahrscheinlichkeit (höchste zuerst).
+    Bei gleicher Bewertung bleibt die ursprüngliche Reihenfolge erhalten.
+
+    Returns:
+        (sortierte Pfade, Merkmale für QrScanStats.record_hit)
+    """
+    if len(paths) < 2:
+        return list(paths), []
+
+    features = extract_clip_features(paths, source_epochs)
+    rates = (stats or QrScanStats()).hit_rates()
+
+    def _score(candidate: ClipFeatures) -> float:
+        return sum(
+            math.log(max(1e-6, rates[feature].get(bucket, 1e-6)))
+            for feature, bucket in candidate.buckets.items()
+        )
+
+    ranked = sorted(features, key=lambda c: (-_score(c), c.list_index))
+    return [c.path for c in ranked], features
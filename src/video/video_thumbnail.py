@@ -0,0 +1,122 @@
+"""
+Vorschaubilder aus Videoclips per FFmpeg.
+
+Das Bild wird als PNG über stdout gelesen (keine Temp-Datei). Mit
+-noaccurate_seek und -skip_frame nokey dekodiert FFmpeg nur den Keyframe
+an/vor der Zielzeit. Die Prozesse laufen mit niedriger Priorität und
+begrenzter Parallelität, damit die Oberfläche beim Blättern flüssig bleibt.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import subprocess
+import threading
+from typing import Callable, List, Optional
+
+from src.utils.constants import IS_WINDOWS, SUBPROCESS_CREATE_NO_WINDOW
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+VIDEO_THUMB_SEEK_SECONDS = 1.0
+_FFMPEG_TIMEOUT_SEC = 5
+# Gleichzeitige FFmpeg-Prozesse für Vorschaubilder (weitere Aufrufe warten)
+MAX_CONCURRENT_EXTRACTIONS = 2
+# nice-Wert auf Linux/macOS
+_LOW_PRIORITY_NICE = 10
+
+_extract_slots = threading.BoundedSemaphore(MAX_CONCURRENT_EXTRACTIONS)
+
+
+def _thumbnail_command(path: str, edge: int, seek_seconds: float) -> List[str]:
+    return [
+        'ffmpeg',
+        '-hide_banner',
+        '-loglevel', 'error',
+        '-noaccurate_seek',
+        '-ss', f'{seek_seconds:g}',
+        '-skip_frame', 'nokey',  # Nur Keyframes dekodieren
+        '-i', path,
+        '-map', '0:v:0',
+        '-frames:v', '1',
+        '-vf', f'scale={edge}:{edge}:force_original_aspect_ratio=decrease',
+        '-c:v', 'png',
+        '-compression_level', '1',
+        '-f', 'image2pipe',
+        'pipe:1',
+    ]
+
+
+def _creation_flags() -> int:
+    flags = SUBPROCESS_CREATE_NO_WINDOW
+    if IS_WINDOWS:
+        flags |= subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    return flags
+
+
+def _lower_priority(proc: subprocess.Popen) -> None:
+    if IS_WINDOWS or not hasattr(os, 'setpriority'):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, proc.pid, _LOW_PRIORITY_NICE)
+    except OSError:
+        pass
+
+
+def _run_ffmpeg_frame(cmd: List[str]) -> Optional[bytes]:
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        creationflags=_creation_flags(),
+    )
+    _lower_priority(proc)
+    try:
+        data, _ = proc.communicate(timeout=_FFMPEG_TIMEOUT_SEC)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        return None
+    return data or None
+
+
+def extract_video_thumbnail(
+    path: str,
+    edge: int,
+    *,
+    seek_seconds: float = VIDEO_THUMB_SEEK_SECONDS,
+    cancel_check: Optional[Callable[[], bool]] = None,
+):
+    """
+    Liefert ein PIL-Vorschaubild (max. edge px) des Keyframes bei seek_seconds.
+    Bei sehr kurzen Clips wird auf den ersten Keyframe zurückgegriffen.
+    Gibt None zurück bei Fehler oder Abbruch.
+    """
+    if Image is None:
+        return None
+
+    with _extract_slots:
+        if cancel_check and cancel_check():
+            return None
+        try:
+            data = _run_ffmpeg_frame(_thumbnail_command(path, edge, seek_seconds))
+            if data is None and seek_seconds > 0 and not (cancel_check and cancel_check()):
+                data = _run_ffmpeg_frame(_thumbnail_command(path, edge, 0))
+        except OSError as e:
+            print(f"FFmpeg-Fehler für {os.path.basename(path)}: {e}")
+            return None
+
+    if data is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            return img.copy()
+    except Exception as e:
+        print(f"Vorschaubild für {os.path.basename(path)} nicht lesbar: {e}")
+        return None
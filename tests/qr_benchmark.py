@@ -0,0 +1,320 @@
+"""
+QR-Benchmark: erzeugt synthetische Testclips/-fotos mit ffmpeg (lavfi + QR-Overlay)
+und misst die QR-Suche aus src/video/qr_analyser.py.
+
+Aufruf (im Projektordner):
+    python tests/qr_benchmark.py
+    python tests/qr_benchmark.py --codecs h264 --resolutions 1080p --repeat 3
+    python tests/qr_benchmark.py --json ergebnis.json --baseline alt.json
+
+Gemessen werden Zeit bis zum Treffer, Anzahl dekodierter Frames (pyzbar-Aufrufe)
+und CPU-Zeit des Prozesses. Mit --baseline werden Regressionen markiert.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+# Pfad zum Projekt
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import cv2  # noqa: E402
+
+from src.utils.constants import SUBPROCESS_CREATE_NO_WINDOW  # noqa: E402
+from src.video import qr_analyser  # noqa: E402
+
+BENCH_QR_PAYLOAD = "https://example.invalid/qr#" + json.dumps({
+    "Customer_ID": "bench-0001",
+    "Booking_ID": "bench-booking",
+    "vorname": "Bench",
+    "nachname": "Mark",
+    "media": "hc_fv",
+})
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+CODECS = {
+    "h264": "libx264",
+    "h265": "libx265",
+}
+CLIP_SECONDS = 6
+CLIP_FPS = 30
+
+# Regression, wenn langsamer als Baseline * Faktor
+REGRESSION_FACTOR = 1.2
+
+
+@dataclass
+class QrCase:
+    """Position, Größe (Anteil der Bildhöhe), Unschärfe und Einblendezeit des QR-Codes."""
+
+    name: str
+    x: float = 0.5
+    y: float = 0.5
+    size: float = 0.3
+    blur: float = 0.0
+    start: float = 0.0
+    end: float = 3.0
+    has_qr: bool = True
+
+
+CASES = [
+    QrCase("mitte_frueh"),
+    QrCase("ecke_klein_spaet", x=0.12, y=0.85, size=0.14, start=3.4, end=5.0),
+    QrCase("unscharf", blur=2.0),
+    QrCase("ohne_qr", has_qr=False),
+]
+
+
+@dataclass
+class BenchResult:
+    scenario: str
+    api: str
+    hit: bool
+    wall_seconds: float
+    cpu_seconds: float
+    frames_decoded: int
+    runs: List[float] = field(default_factory=list)
+
+
+class _DecodeCounter:
+    """Zählt pyzbar-Aufrufe in qr_analyser (= geprüfte Frames/Bildstufen)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self._original = None
+
+    def install(self):
+        self._original = qr_analyser.decode
+
+        def _counting_decode(*args, **kwargs):
+            with self._lock:
+                self.count += 1
+            return self._original(*args, **kwargs)
+
+        qr_analyser.decode = _counting_decode
+
+    def uninstall(self):
+        if self._original is not None:
+            qr_analyser.decode = self._original
+            self._original = None
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+
+def _run_ffmpeg(args: List[str]) -> None:
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"] + args
+    subprocess.run(cmd, check=True, creationflags=SUBPROCESS_CREATE_NO_WINDOW)
+
+
+def write_qr_png(path: str, payload: str = BENCH_QR_PAYLOAD) -> None:
+    """Erzeugt das QR-PNG mit OpenCV (schwarze Module, weißer Rand)."""
+    encoder = cv2.QRCodeEncoder.create()
+    qr = encoder.encode(payload)
+    qr = cv2.resize(qr, (qr.shape[1] * 8, qr.shape[0] * 8), interpolation=cv2.INTER_NEAREST)
+    qr = cv2.copyMakeBorder(qr, 32, 32, 32, 32, cv2.BORDER_CONSTANT, value=255)
+    cv2.imwrite(path, qr)
+
+
+def _overlay_filter(case: QrCase, height: int) -> str:
+    qr_px = max(64, int(height * case.size))
+    qr_chain = f"[1:v]scale={qr_px}:{qr_px}:flags=neighbor"
+    if case.blur > 0:
+        qr_chain += f",gblur=sigma={case.blur:g}"
+    qr_chain += "[qr]"
+    x = f"(W-w)*{case.x:g}"
+    y = f"(H-h)*{case.y:g}"
+    enable = f"between(t,{case.start:g},{case.end:g})"
+    return f"{qr_chain};[0:v][qr]overlay={x}:{y}:enable='{enable}'[v]"
+
+
+def build_clip(path: str, qr_png: str, case: QrCase, codec: str, resolution: str) -> None:
+    width, height = RESOLUTIONS[resolution]
+    source = f"testsrc2=size={width}x{height}:rate={CLIP_FPS}:duration={CLIP_SECONDS}"
+    args = ["-f", "lavfi", "-i", source]
+    if case.has_qr:
+        args += ["-loop", "1", "-i", qr_png, "-filter_complex", _overlay_filter(case, height),
+                 "-map", "[v]"]
+    args += ["-t", str(CLIP_SECONDS), "-c:v", CODECS[codec], "-preset", "ultrafast",
+             "-pix_fmt", "yuv420p", "-movflags", "+faststart", path]
+    _run_ffmpeg(args)
+
+
+def build_photo(path: str, qr_png: str, case: QrCase) -> None:
+    """Einzelbild 4000x3000 als JPEG (Foto-Pfad mit Draft-Stufen)."""
+    source = "testsrc2=size=4000x3000:rate=1:duration=1"
+    args = ["-f", "lavfi", "-i", source]
+    if case.has_qr:
+        photo_case = QrCase(case.name, case.x, case.y, case.size, case.blur, 0.0, 1.0)
+        args += ["-i", qr_png, "-filter_complex", _overlay_filter(photo_case, 3000),
+                 "-map", "[v]"]
+    args += ["-frames:v", "1", "-q:v", "3", path]
+    _run_ffmpeg(args)
+
+
+def build_corpus(corpus_dir: str, codecs: List[str], resolutions: List[str]) -> Dict[str, object]:
+    """Erzeugt fehlende Korpus-Dateien (vorhandene werden wiederverwendet)."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    qr_png = os.path.join(corpus_dir, "qr.png")
+    if not os.path.exists(qr_png):
+        write_qr_png(qr_png)
+
+    clips: Dict[str, str] = {}
+    for codec in codecs:
+        for resolution in resolutions:
+            for case in CASES:
+                key = f"{codec}_{resolution}_{case.name}"
+                path = os.path.join(corpus_dir, f"{key}.mp4")
+                if not os.path.exists(path):
+                    print(f"Erzeuge {os.path.basename(path)} ...")
+                    build_clip(path, qr_png, case, codec, resolution)
+                clips[key] = path
+
+    photos: Dict[str, str] = {}
+    for case in CASES:
+        path = os.path.join(corpus_dir, f"foto_{case.name}.jpg")
+        if not os.path.exists(path):
+            print(f"Erzeuge {os.path.basename(path)} ...")
+            build_photo(path, qr_png, case)
+        photos[case.name] = path
+
+    return {"clips": clips, "photos": photos}
+
+
+def _measure(counter: _DecodeCounter, func, repeat: int):
+    walls, cpus, frames, hit = [], [], [], False
+    for _ in range(repeat):
+        counter.reset()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        hit = bool(func())
+        walls.append(time.perf_counter() - wall_start)
+        cpus.append(time.process_time() - cpu_start)
+        frames.append(counter.count)
+    return hit, statistics.median(walls), statistics.median(cpus), int(statistics.median(frames)), walls
+
+
+def run_benchmarks(corpus: Dict[str, object], repeat: int, workers: int) -> List[BenchResult]:
+    counter = _DecodeCounter()
+    counter.install()
+    results: List[BenchResult] = []
+    clips: Dict[str, str] = corpus["clips"]
+    photos: Dict[str, str] = corpus["photos"]
+    try:
+        for key, path in sorted(clips.items()):
+            hit, wall, cpu, frames, runs = _measure(
+                counter, lambda p=path: qr_analyser.analysiere_ersten_clip(p)[1], repeat
+            )
+            results.append(BenchResult(key, "analysiere_ersten_clip", hit, wall, cpu, frames, runs))
+
+        # Hybrid: drei Clips ohne QR, Treffer im letzten Clip
+        prefixes = sorted({key.rsplit("_", 2)[0] for key in clips})
+        for prefix in prefixes:
+            hit_key = f"{prefix}_ecke_klein_spaet"
+            miss_key = f"{prefix}_ohne_qr"
+            if hit_key not in clips or miss_key not in clips:
+                continue
+            paths = [clips[miss_key]] * 3 + [clips[hit_key]]
+            hit, wall, cpu, frames, runs = _measure(
+                counter,
+                lambda p=paths: qr_analyser.analysiere_videos_hybrid_bis_erster_treffer(
+                    p, parallel_workers=workers
+                )[1],
+                repeat,
+            )
+            results.append(BenchResult(
+                f"{prefix}_4clips_treffer_letzter",
+                f"analysiere_videos_hybrid_bis_erster_treffer[{workers}]",
+                hit, wall, cpu, frames, runs,
+            ))
+
+        for name, path in sorted(photos.items()):
+            hit, wall, cpu, frames, runs = _measure(
+                counter, lambda p=path: qr_analyser.analysiere_foto(p)[1], repeat
+            )
+            results.append(BenchResult(f"foto_{name}", "analysiere_foto", hit, wall, cpu, frames, runs))
+    finally:
+        counter.uninstall()
+    return results
+
+
+def print_report(results: List[BenchResult], baseline: Optional[Dict[str, dict]] = None) -> int:
+    """Gibt die Tabelle aus und liefert die Anzahl Regressionen."""
+    regressions = 0
+    print()
+    print(f"{'Szenario':42} {'API':48} {'Treffer':7} {'Zeit s':>8} {'CPU s':>8} {'Frames':>7}")
+    print("-" * 125)
+    for r in results:
+        marker = ""
+        if baseline:
+            old = baseline.get(f"{r.scenario}|{r.api}")
+            if old:
+                if old["hit"] and not r.hit:
+                    marker = "  << Treffer verloren"
+                    regressions += 1
+                elif r.wall_seconds > old["wall_seconds"] * REGRESSION_FACTOR:
+                    marker = f"  << langsamer ({old['wall_seconds']:.3f} s)"
+                    regressions += 1
+        print(
+            f"{r.scenario:42} {r.api:48} {'ja' if r.hit else 'nein':7} "
+            f"{r.wall_seconds:8.3f} {r.cpu_seconds:8.3f} {r.frames_decoded:7d}{marker}"
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="QR-Scan-Benchmark mit synthetischen Clips")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "qr_benchmark_corpus"))
+    parser.add_argument("--codecs", nargs="+", choices=sorted(CODECS), default=sorted(CODECS))
+    parser.add_argument("--resolutions", nargs="+", choices=sorted(RESOLUTIONS), default=sorted(RESOLUTIONS))
+    parser.add_argument("--repeat", type=int, default=1, help="Läufe pro Szenario (Median)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker für den Hybrid-Scan")
+    parser.add_argument("--json", dest="json_path", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--baseline", help="Früheres JSON-Ergebnis zum Vergleich")
+    parser.add_argument("--rebuild", action="store_true", help="Korpus neu erzeugen")
+    args = parser.parse_args(argv)
+
+    if shutil.which("ffmpeg") is None:
+        print("Fehler: ffmpeg nicht gefunden (wird für den Testkorpus benötigt).")
+        return 2
+
+    if args.rebuild and os.path.isdir(args.corpus_dir):
+        shutil.rmtree(args.corpus_dir)
+    corpus = build_corpus(args.corpus_dir, args.codecs, args.resolutions)
+    print(f"Korpus: {args.corpus_dir}")
+
+    results = run_benchmarks(corpus, max(1, args.repeat), max(1, args.workers))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = {f"{r['scenario']}|{r['api']}": r for r in json.load(f)}
+    regressions = print_report(results, baseline)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+        print(f"\nErgebnisse gespeichert: {args.json_path}")
+
+    if regressions:
+        print(f"\n{regressions} Regression(en) gegenüber der Baseline.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Tests für die Identität v2: gestreamter Fingerprint gegen Datei-Fingerprint
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.utils.media_history as media_history
+from src.utils.media_history import IdentityHasher, compute_file_fingerprint
+
+
+def _box(box_type: bytes, payload: bytes, largesize: bool = False) -> bytes:
+    if largesize:
+        return (1).to_bytes(4, "big") + box_type + (16 + len(payload)).to_bytes(8, "big") + payload
+    return (8 + len(payload)).to_bytes(4, "big") + box_type + payload
+
+
+def _streamed_identity(data: bytes, block_size: int):
+    hasher = IdentityHasher(len(data), content_hash=False)
+    for offset in range(0, len(data), block_size):
+        hasher.update(data[offset:offset + block_size])
+    return hasher.identity()
+
+
+def test_streamed_fingerprint_matches_file_fingerprint(tmp_path):
+    """Kleine Boxen über Blockgrenzen hinweg dürfen die moov-Suche nicht verschieben"""
+    data = (
+        _box(b"ftyp", b"isom" + b"\0" * 4)
+        + _box(b"free", b"")
+        + _box(b"mdat", os.urandom(200_000), largesize=True)
+        + _box(b"skip", b"ab")
+        + _box(b"moov", os.urandom(5000))
+    )
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(data)
+    expected = compute_file_fingerprint(str(path))
+    for block_size in (1, 3, 7, 13, 16, 17, 4096, 65536, len(data)):
+        assert _streamed_identity(data, block_size) == expected, block_size
+
+
+def test_streamed_fingerprint_without_boxes(tmp_path):
+    """Dateien ohne ftyp: nur die Stichproben zählen"""
+    data = os.urandom(300_000)
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(data)
+    expected = compute_file_fingerprint(str(path))
+    for block_size in (7, 4096, 65536):
+        assert _streamed_identity(data, block_size) == expected, block_size
+
+
+def test_identity_memo_is_capped_and_purged(tmp_path, monkeypatch):
+    """Memo behält nur die zuletzt geschriebenen Pfade; purge_all leert es mit"""
+    monkeypatch.setattr(media_history, "CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr(media_history, "DB_PATH", str(tmp_path / "history.db"))
+    monkeypatch.setattr(media_history, "IDENTITY_MEMO_MAX_ROWS", 5)
+    store = media_history.MediaHistoryStore()
+    try:
+        for index in range(12):
+            path = tmp_path / f"{index}.jpg"
+            path.write_bytes(os.urandom(100 + index))
+            assert store.compute_identity(str(path)) is not None
+        # Memo-Schreibvorgänge warten nicht: einen weiteren Auftrag abwarten
+        store._write(lambda conn: None)
+        count = store._reader().execute("SELECT COUNT(*) FROM identity_memo").fetchone()[0]
+        assert count == 5
+
+        store.purge_all()
+        count = store._reader().execute("SELECT COUNT(*) FROM identity_memo").fetchone()[0]
+        assert count == 0
+    finally:
+        store.close()
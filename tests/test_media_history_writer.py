@@ -0,0 +1,35 @@
+"""
+Tests für den Schreib-Thread der Medien-Historie
+"""
+import sqlite3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.media_history import _HistoryWriter
+
+
+def test_failed_begin_resolves_pending_futures():
+    """Scheitert BEGIN, muss jeder Auftrag einen Fehler liefern statt ewig zu warten"""
+    conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+    # Offene Transaktion: das BEGIN des Writers schlägt fehl
+    conn.execute("BEGIN")
+    writer = _HistoryWriter(conn)
+    try:
+        future = writer.submit(lambda c: 1)
+        error = future.exception(timeout=2)
+        assert isinstance(error, sqlite3.Error)
+    finally:
+        writer.stop()
+        conn.close()
+
+
+def test_successful_batch_returns_results():
+    """Normalfall: Ergebnis des Auftrags kommt beim Aufrufer an"""
+    conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+    writer = _HistoryWriter(conn)
+    try:
+        assert writer.submit(lambda c: c.execute("SELECT 41 + 1").fetchone()[0]).result(timeout=2) == 42
+    finally:
+        writer.stop()
+        conn.close()